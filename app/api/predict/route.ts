@@ -4,29 +4,54 @@ import type { PredictionData } from "@/src/App";
 // Python ML server URL
 const ML_SERVER_URL = process.env.ML_SERVER_URL || "http://localhost:8000";
 
+// Tells clients (and the load generator) whether the ML server or the
+// simulation produced the result; "rules" when the ML server was overloaded
+// and answered from the business rules alone
+const SOURCE_HEADER = "X-Prediction-Source";
+
+// Time budget for the ML server, sent as a deadline so it can answer
+// rules-only (or shed the request) instead of finishing after we gave up
+const ML_TIMEOUT_MS = Number(process.env.ML_TIMEOUT_MS || "2000");
+const DEADLINE_HEADER = "X-Request-Deadline-Ms";
+
 export async function POST(request: NextRequest) {
+  // Get the user data from the request; the body can only be read once, so
+  // the fallback below reuses it
+  let userData: PredictionData;
+  try {
+    userData = await request.json() as PredictionData;
+  } catch (error) {
+    return NextResponse.json({ error: "Invalid JSON" }, { status: 400 });
+  }
+
   try {
-    // Get the user data from the request
-    const userData = await request.json() as PredictionData;
-    
     // Process the prediction using the Python SVM model API
-    const result = await predictLoanStatus(userData);
+    const { result, source } = await predictLoanStatus(userData);
     
-    return NextResponse.json(result);
+    return NextResponse.json(result, { headers: { [SOURCE_HEADER]: source } });
   } catch (error) {
+    // Invalid applicants are the caller's problem, not the ML server's:
+    // pass the field errors back instead of simulating a result
+    if (error instanceof InvalidApplicantError) {
+      return NextResponse.json(error.body, { status: 400 });
+    }
+    // A shed request is retried later rather than simulated, so that
+    // overload does not turn into a burst of made-up decisions
+    if (error instanceof ServerBusyError) {
+      return NextResponse.json(error.body, {
+        status: 503,
+        headers: error.retryAfter ? { "Retry-After": error.retryAfter } : {}
+      });
+    }
     console.error("Prediction error:", error);
     
     // Fall back to the simulation if Python API fails
     try {
-      // Try to parse the request again
-      const clonedRequest = request.clone();
-      const userData = await clonedRequest.json() as PredictionData;
-      
       console.log("Falling back to simulation model...");
       const formattedData = preprocessData(userData);
       const [prediction, probability] = simulateSVMPrediction(formattedData);
       const result = formatResult(prediction, probability, userData);
-      return NextResponse.json(result);
+      return NextResponse.json(result, { headers: { [SOURCE_HEADER]: "fallback" } });
     } catch (fallbackError) {
       console.error("Fallback prediction error:", fallbackError);
       return NextResponse.json({ error: "Failed to process prediction" }, { status: 500 });
@@ -34,6 +59,20 @@ export async function POST(request: NextRequest) {
   }
 }
 
+// The ML server rejected the applicant (HTTP 400) with per-field details
+class InvalidApplicantError extends Error {
+  constructor(public body: unknown) {
+    super("Invalid applicant");
+  }
+}
+
+// The ML server shed the request (HTTP 503) and asked to retry later
+class ServerBusyError extends Error {
+  constructor(public body: unknown, public retryAfter: string | null) {
+    super("ML server busy");
+  }
+}
+
 async function predictLoanStatus(data: PredictionData) {
   // Call the Python Flask API with the SVM model
   console.log(`Calling ML server at ${ML_SERVER_URL}/predict`);
@@ -43,21 +82,34 @@ async function predictLoanStatus(data: PredictionData) {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        [DEADLINE_HEADER]: String(ML_TIMEOUT_MS),
       },
       body: JSON.stringify(data),
       // Add this to ensure cookies are sent and CORS works properly
       credentials: 'include',
+      signal: AbortSignal.timeout(ML_TIMEOUT_MS),
     });
     
+    if (response.status === 400) {
+      throw new InvalidApplicantError(await response.json());
+    }
+    
+    if (response.status === 503) {
+      throw new ServerBusyError(await response.json(), response.headers.get("Retry-After"));
+    }
+    
     if (!response.ok) {
       const errorText = await response.text();
       console.error(`ML server error: ${response.status} - ${errorText}`);
       throw new Error(`ML server returned ${response.status}: ${errorText}`);
     }
     
-    return response.json();
+    const source = response.headers.get(SOURCE_HEADER) || "model";
+    return { result: await response.json(), source };
   } catch (error) {
-    console.error("Error connecting to ML server:", error);
+    if (!(error instanceof InvalidApplicantError || error instanceof ServerBusyError)) {
+      console.error("Error connecting to ML server:", error);
+    }
     throw error;
   }
 }
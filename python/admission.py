@@ -0,0 +1,151 @@
+import threading
+import time
+
+# Weight of the newest observation in the per-path latency estimates
+LATENCY_EWMA_ALPHA = 0.1
+
+# A path whose estimate has not been refreshed for this long admits one
+# request that the estimate would turn away, so a stale estimate (e.g. from a
+# slow model since replaced, or a burst of load) cannot shut the model out
+PROBE_INTERVAL_SECONDS = 1.0
+
+class Admission:
+    """
+    Outcome of AdmissionController.admit: action is "model" (admitted; call
+    release() when done), "degrade" (answer rules-only) or "reject" (503),
+    and reason says why for the last two. An admitted request's reason is
+    "probe" when it was let through to refresh a stale estimate
+    """
+
+    __slots__ = ("action", "reason", "path")
+
+    def __init__(self, action, path, reason=None):
+        self.action = action
+        self.path = path
+        self.reason = reason
+
+class AdmissionController:
+    """
+    Bounds how many requests may use the model at once and decides, before
+    any model work, whether a request can still meet its deadline.
+
+    Nothing waits for a slot: a request over the limit, or whose deadline
+    is closer than the estimated cost of the model path, is answered at
+    once, either with a rules-only decision (overload_mode "degrade") or
+    rejected with a retry hint ("reject"). Requests already past their
+    deadline are always rejected. The cost estimate is a moving average
+    of observed model-path latency per row, kept separately per path.
+    Only admitted requests refresh it, so when it has not been refreshed
+    for probe_interval seconds the next request it would turn away is
+    admitted as a probe
+    """
+
+    MODES = ("degrade", "reject")
+
+    def __init__(self, max_inflight, overload_mode="degrade", retry_after=1,
+                 probe_interval=PROBE_INTERVAL_SECONDS):
+        if overload_mode not in self.MODES:
+            raise ValueError(f"Unknown overload mode {overload_mode!r}; expected one of {self.MODES}")
+        self.max_inflight = max_inflight
+        self.overload_mode = overload_mode
+        self.retry_after = retry_after
+        self.probe_interval = probe_interval
+        self.lock = threading.Lock()
+        self.inflight = 0
+        self.peak_inflight = 0
+        self.row_seconds = {}
+        # Per path, when the estimate was last refreshed or probed
+        self.refreshed = {}
+        self.counts = {"model": 0, "probes": 0, "degraded": {}, "rejected": {}}
+
+    def estimate(self, path, rows=1):
+        """
+        Expected seconds on the model path for rows rows (0 until observed)
+        """
+        return self.row_seconds.get(path, 0.0) * rows
+
+    def admit(self, path, now, deadline=None, rows=1, degradable=True):
+        """
+        Decide how to serve a request arriving at now (time.perf_counter)
+        with an optional absolute deadline on the same clock. Requests with
+        no rules-only answer (degradable False) are rejected instead of
+        degraded
+        """
+        with self.lock:
+            if deadline is not None and deadline <= now:
+                return self._shed(Admission("reject", path, "deadline_expired"))
+            if self.inflight >= self.max_inflight:
+                reason = "overload"
+            elif deadline is not None and deadline - now < self.estimate(path, rows):
+                if self._probe(path, now):
+                    return self._admit(Admission("model", path, "probe"))
+                reason = "deadline"
+            else:
+                return self._admit(Admission("model", path))
+            action = "degrade" if self.overload_mode == "degrade" and degradable else "reject"
+            return self._shed(Admission(action, path, reason))
+
+    def _admit(self, admission):
+        # Callers hold the lock
+        self.inflight += 1
+        self.peak_inflight = max(self.peak_inflight, self.inflight)
+        self.counts["model"] += 1
+        return admission
+
+    def _probe(self, path, now):
+        # Callers hold the lock
+        if now - self.refreshed.get(path, now) < self.probe_interval:
+            return False
+        self.refreshed[path] = now
+        self.counts["probes"] += 1
+        return True
+
+    def _shed(self, admission):
+        # Callers hold the lock
+        key = "degraded" if admission.action == "degrade" else "rejected"
+        self.counts[key][admission.reason] = self.counts[key].get(admission.reason, 0) + 1
+        return admission
+
+    def release(self, admission, seconds=None, rows=1):
+        """
+        Free the slot of an admitted request and feed its model-path time
+        into the cost estimate. A probe's time replaces the stale estimate
+        """
+        with self.lock:
+            self.inflight -= 1
+            if seconds is not None and rows:
+                per_row = seconds / rows
+                previous = self.row_seconds.get(admission.path)
+                self.row_seconds[admission.path] = (
+                    per_row if previous is None or admission.reason == "probe"
+                    else previous + LATENCY_EWMA_ALPHA * (per_row - previous)
+                )
+                self.refreshed[admission.path] = time.perf_counter()
+
+    def degraded_after_admission(self, reason):
+        """
+        Count a request that was admitted but answered rules-only anyway,
+        e.g. because its deadline passed while it waited for a micro-batch
+        """
+        with self.lock:
+            self.counts["model"] -= 1
+            self.counts["degraded"][reason] = self.counts["degraded"].get(reason, 0) + 1
+
+    def stats(self):
+        with self.lock:
+            degraded = sum(self.counts["degraded"].values())
+            rejected = sum(self.counts["rejected"].values())
+            decisions = self.counts["model"] + degraded
+            return {
+                "maxInflight": self.max_inflight,
+                "overloadMode": self.overload_mode,
+                "inflight": self.inflight,
+                "peakInflight": self.peak_inflight,
+                "admitted": self.counts["model"],
+                "probes": self.counts["probes"],
+                "degraded": dict(self.counts["degraded"]),
+                "rejected": dict(self.counts["rejected"]),
+                "degradedRate": degraded / decisions if decisions else 0.0,
+                "shed": degraded + rejected,
+                "estimatedRowSeconds": dict(self.row_seconds)
+            }
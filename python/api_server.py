@@ -1,9 +1,26 @@
-from flask import Flask, request, jsonify
-import pandas as pd
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 import numpy as np
-import pickle
 import os
+import json
+import time
+import threading
+import warnings
+import logging
+import atexit
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from flask_cors import CORS
+from model_store import ModelWatcher
+from micro_batcher import MicroBatcher, QueueFullError
+from business_rules import BusinessRules
+from prediction_cache import PredictionCache
+from metrics import MetricsRegistry, SampledLogger
+from audit_log import AuditLog
+from what_if import build_grid, evaluate_grid
+from applicant_schema import SchemaError, dumps
+from drift_monitor import DriftMonitor
+from admission import AdmissionController
+from model_registry import ModelRegistry, parse_model_list
+from shadow_scoring import ShadowScorer
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -11,76 +28,420 @@ CORS(app)  # Enable CORS for all routes
 # Load the model and feature names
 MODEL_DIR = "ml_model"
 
-# Initialize these to None initially
-model = None
-feature_names = None
+# Poll MODEL_DIR every N seconds and hot-swap newly exported models (0 disables)
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", "0"))
 
-def load_model():
-    global model, feature_names
-    try:
-        # Load the model from the pickle file
-        with open(os.path.join(MODEL_DIR, "svm_model.pkl"), "rb") as f:
-            model = pickle.load(f)
-        
-        # Load feature names
-        with open(os.path.join(MODEL_DIR, "feature_names.pkl"), "rb") as f:
-            feature_names = pickle.load(f)
-            
-        print(f"Model and feature names loaded successfully.")
-        return True
-    except Exception as e:
-        print(f"Error loading model: {str(e)}")
-        return False
+# If set, POST /admin/reload requires this value in the X-Admin-Token header
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# Risk-score, status, factor and credit-limit rules applied to every prediction
+BUSINESS_RULES_PATH = os.environ.get("BUSINESS_RULES_PATH", "business_rules.json")
+business_rules = BusinessRules.load(BUSINESS_RULES_PATH)
+
+# Results cached per (applicant, model version); PREDICTION_CACHE_SIZE=0 disables
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "300"))
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL) if PREDICTION_CACHE_SIZE > 0 else None
+
+# Every decision is appended to compressed NDJSON files in AUDIT_LOG_DIR by a
+# background thread; AUDIT_LOG_DIR= (empty) disables auditing
+AUDIT_LOG_DIR = os.environ.get("AUDIT_LOG_DIR", "audit_log")
+AUDIT_LOG_QUEUE = int(os.environ.get("AUDIT_LOG_QUEUE", "10000"))
+audit_log = AuditLog(AUDIT_LOG_DIR, max_queue=AUDIT_LOG_QUEUE) if AUDIT_LOG_DIR else None
+
+# Live inputs are compared with the model's reference_profile.json by a
+# background thread; DRIFT_MONITOR=0 disables. Recent drift covers the last
+# one to two windows of DRIFT_WINDOW applicants
+DRIFT_MONITOR = os.environ.get("DRIFT_MONITOR", "1") == "1"
+DRIFT_WINDOW = int(os.environ.get("DRIFT_WINDOW", "10000"))
+
+# Admission control: at most MAX_INFLIGHT requests use the model at once.
+# Requests over the limit, or whose DEADLINE_HEADER budget (milliseconds from
+# arrival) is shorter than the expected model time, get a rules-only decision
+# flagged in modelOutput (OVERLOAD_MODE=degrade) or a 503 with Retry-After
+# (OVERLOAD_MODE=reject). Requests already past their deadline get a 503
+MAX_INFLIGHT = int(os.environ.get("MAX_INFLIGHT", "32"))
+OVERLOAD_MODE = os.environ.get("OVERLOAD_MODE", "degrade")
+RETRY_AFTER_SECONDS = int(os.environ.get("RETRY_AFTER_SECONDS", "1"))
+DEADLINE_HEADER = "X-Request-Deadline-Ms"
+admission_control = AdmissionController(MAX_INFLIGHT, OVERLOAD_MODE, RETRY_AFTER_SECONDS)
+
+# Response header saying whether the model ("model") or the business rules
+# alone ("rules") produced a decision; the Next.js route forwards it
+SOURCE_HEADER = "X-Prediction-Source"
+
+# Rows scored per model call by the batch endpoint
+BATCH_CHUNK_SIZE = 1024
+
+# "numpy" serves the memory-mapped NumPy export (python numpy_model.py) and
+# never imports sklearn or pandas; "compressed" does the same with the reduced
+# export of train.py compress; "pickle" unpickles the sklearn pipeline
+MODEL_RUNTIME = os.environ.get("MODEL_RUNTIME", "pickle")
+
+# Largest what-if grid scored in one request; keeps /what-if within a fixed
+# latency budget (about 10k rows per 50 ms on one core)
+WHAT_IF_MAX_GRID = int(os.environ.get("WHAT_IF_MAX_GRID", "5000"))
+
+# Score with float32 support vectors (about twice as fast, ~1e-6 probability drift)
+USE_FLOAT32 = os.environ.get("SVM_FLOAT32", "0") == "1"
+
+# Model registry: MODEL_DIR is registered as MODEL_NAME and CHALLENGER_MODELS
+# ("name=dir,name=dir") are loaded alongside it. CHAMPION_MODEL names the one
+# that answers requests; POST /admin/promote changes it at runtime
+MODEL_NAME = os.environ.get("MODEL_NAME", "svm")
+CHALLENGER_MODELS = parse_model_list(os.environ.get("CHALLENGER_MODELS", ""))
+CHAMPION_MODEL = os.environ.get("CHAMPION_MODEL", MODEL_NAME)
+model_registry = ModelRegistry(
+    {MODEL_NAME: MODEL_DIR, **CHALLENGER_MODELS}, CHAMPION_MODEL, USE_FLOAT32, MODEL_RUNTIME
+)
+
+# SHADOW_SCORING=1 also scores every model-path request with each challenger
+# on SHADOW_WORKERS background threads, after the champion has answered, in
+# coalesced batches; at most SHADOW_QUEUE jobs wait, further ones are dropped
+SHADOW_SCORING = os.environ.get("SHADOW_SCORING", "0") == "1"
+SHADOW_WORKERS = int(os.environ.get("SHADOW_WORKERS", "1"))
+SHADOW_QUEUE = int(os.environ.get("SHADOW_QUEUE", "1000"))
+
+# Opt-in coalescing of concurrent /predict requests into one model call
+MICRO_BATCH = os.environ.get("MICRO_BATCH", "0") == "1"
+MICRO_BATCH_WINDOW_MS = float(os.environ.get("MICRO_BATCH_WINDOW_MS", "2"))
+MICRO_BATCH_MAX_SIZE = int(os.environ.get("MICRO_BATCH_MAX_SIZE", "32"))
+MICRO_BATCH_QUEUE_DEPTH = int(os.environ.get("MICRO_BATCH_QUEUE_DEPTH", "1024"))
+
+# Request-path debug logs are level-gated and only a sample is emitted
+logger = logging.getLogger("api_server")
+logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
+request_log = SampledLogger(logger, float(os.environ.get("LOG_SAMPLE_RATE", "0.01")))
+
+# The pipeline was fitted on a DataFrame; we feed it the encoder's plain array
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+# The active ModelBundle; replaced as a whole when a new model is loaded
+active_model = None
+drift_monitor = None
+batcher = None
+model_watcher = None
+
+# Serialises model loads so concurrent first requests load only once
+model_lock = threading.Lock()
+batcher_lock = threading.Lock()
 
-def preprocess_input(data):
+# Per-stage and per-request latency, exposed at /metrics
+metrics = MetricsRegistry()
+stage_seconds = metrics.histogram(
+    "prediction_stage_seconds",
+    "Time spent in each stage of scoring; path is single for /predict, batch for batched scoring and what_if for /what-if",
+    ("path", "stage")
+)
+request_seconds = metrics.histogram(
+    "http_request_seconds",
+    "End-to-end request handling time",
+    ("endpoint", "status")
+)
+metrics.gauge(
+    "model_info",
+    "Active model version",
+    lambda: {(active_model.version,): 1} if active_model is not None else None,
+    ("version",)
+)
+model_seconds = metrics.histogram(
+    "model_predict_seconds",
+    "Model call time per registered model; role is champion (on the request path) or shadow",
+    ("model", "role")
+)
+shadow_scorer = ShadowScorer(SHADOW_WORKERS, SHADOW_QUEUE, latency_histogram=model_seconds)
+metrics.gauge(
+    "model_registry_info",
+    "Registered models with their role and loaded version",
+    lambda: {
+        (name, info["role"], info.get("version", "")): 1 for name, info in model_registry.describe()["models"].items()
+    },
+    ("model", "role", "version")
+)
+
+def shadow_comparisons(field):
+    comparisons = shadow_scorer.comparisons()
+    return {(name,): stats[field] for name, stats in comparisons.items() if stats[field] is not None}
+
+metrics.gauge(
+    "shadow_agreement_ratio",
+    "Share of shadow-scored rows where the challenger's label matches the champion's",
+    lambda: shadow_comparisons("agreementRate"),
+    ("model",)
+)
+metrics.gauge(
+    "shadow_approval_rate_delta",
+    "Challenger approval rate minus the champion's, over the same rows",
+    lambda: shadow_comparisons("approvalRateDelta"),
+    ("model",)
+)
+metrics.callback_counter(
+    "shadow_jobs_total",
+    "Shadow scoring jobs handed to the pool, and dropped because it was full",
+    lambda: {(outcome,): shadow_scorer.stats()[outcome] for outcome in ("submitted", "dropped")},
+    ("outcome",)
+)
+
+def cache_events():
+    if prediction_cache is None:
+        return None
+    stats = prediction_cache.stats()
+    return {(event,): stats[event] for event in ("hits", "misses", "evictions", "expirations")}
+
+metrics.callback_counter(
+    "prediction_cache_events_total",
+    "Prediction cache hits, misses, evictions and expirations",
+    cache_events,
+    ("event",)
+)
+metrics.callback_counter(
+    "audit_log_records_total",
+    "Audit records written, and dropped because the queue was full",
+    lambda: {
+        (event,): audit_log.stats()[event] for event in ("written", "dropped")
+    } if audit_log is not None else None,
+    ("event",)
+)
+metrics.gauge(
+    "audit_log_queued_records",
+    "Audit records waiting to be written",
+    lambda: audit_log.stats()["queued"] if audit_log is not None else None
+)
+def drift_scores():
+    if drift_monitor is None:
+        return None
+    report = drift_monitor.report()
+    return {
+        (feature, window): scores["psi"]
+        for window in ("total", "recent")
+        for feature, scores in report[window].items()
+    }
+
+metrics.gauge(
+    "feature_drift_psi",
+    "Population stability index of each input against the training profile",
+    drift_scores,
+    ("feature", "window")
+)
+metrics.gauge(
+    "admission_inflight",
+    "Requests currently using the model, and the limit",
+    lambda: {("current",): admission_control.inflight, ("limit",): admission_control.max_inflight},
+    ("kind",)
+)
+
+def admission_events():
+    stats = admission_control.stats()
+    events = {("admitted", "model"): stats["admitted"]}
+    for outcome in ("degraded", "rejected"):
+        for reason, count in stats[outcome].items():
+            events[(outcome, reason)] = count
+    return events
+
+metrics.callback_counter(
+    "admission_decisions_total",
+    "Requests admitted to the model, answered rules-only (degraded) or shed with a 503, by reason",
+    admission_events,
+    ("outcome", "reason")
+)
+metrics.gauge(
+    "admission_degraded_ratio",
+    "Share of decisions made rules-only because of overload or deadlines",
+    lambda: admission_control.stats()["degradedRate"]
+)
+metrics.gauge(
+    "micro_batcher_queue_depth",
+    "Requests waiting for the micro-batcher",
+    lambda: batcher.queue.qsize() if batcher is not None else None
+)
+metrics.callback_counter(
+    "micro_batcher_batches_total",
+    "Micro-batches run, by batch size bucket",
+    lambda: {
+        (bucket,): count for bucket, count in batcher.stats()["batchSizeHistogram"].items()
+    } if batcher is not None else None,
+    ("size",)
+)
+
+def audit_decision(path, data, result, model_version, cached=False, model_probabilities=None):
     """
-    Preprocess the input data to match the format expected by the model,
-    exactly as done in the notebook
+    Queue an audit record of one decision; returns immediately
     """
-    # Create a single row DataFrame
-    sample_df = pd.DataFrame([data])
-    
-    # Print input data for debugging
-    print("Input data:", sample_df)
-    
-    # Load column info if available
-    column_info_path = os.path.join(MODEL_DIR, "column_info.pkl")
-    if os.path.exists(column_info_path):
-        with open(column_info_path, "rb") as f:
-            column_info = pickle.load(f)
-        
-        # Ensure all expected columns are present
-        for col in column_info.get("categorical_columns", []) + column_info.get("numeric_columns", []):
-            if col not in sample_df.columns:
-                # Use appropriate default values based on column type
-                if col in column_info.get("numeric_columns", []):
-                    sample_df[col] = 0
-                else:
-                    sample_df[col] = "Unknown"
-    
-    # Apply one-hot encoding (drop_first=True matches the notebook)
-    sample_df_encoded = pd.get_dummies(sample_df, drop_first=True)
+    if audit_log is None or "error" in result:
+        return
+    audit_log.record({
+        "path": path,
+        "modelVersion": model_version,
+        "cached": cached,
+        "input": data,
+        "riskScore": result["modelOutput"]["riskScore"],
+        "status": result["approvalStatus"],
+        "probability": result["probability"],
+        "riskLevel": result["riskLevel"],
+        "creditLimit": result["creditLimit"],
+        "modelProbabilities": model_probabilities,
+        "degraded": result["modelOutput"].get("degraded", False)
+    })
+
+def close_audit_log():
+    """
+    Write out queued audit records; call before the process exits
+    """
+    if audit_log is not None:
+        audit_log.close()
+
+atexit.register(close_audit_log)
+
+def observe_stage(path, stage, start):
+    """
+    Record the time since start for a stage and return the current time
+    """
+    now = time.perf_counter()
+    stage_seconds.observe(now - start, path, stage)
+    return now
+
+def observe_model_stages(path, timings):
+    for stage, seconds in timings.items():
+        stage_seconds.observe(seconds, path, stage)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    start = getattr(g, "request_start", None)
+    if start is not None:
+        request_seconds.observe(time.perf_counter() - start, request.endpoint or "unknown", str(response.status_code))
+    return response
+
+def load_model():
+    """
+    Load, warm and check every registered model, then atomically swap in the
+    champion. Requests already in flight keep the bundle they started with
+    """
+    with model_lock:
+        return swap_in_model()
+
+def swap_in_model():
+    # Callers must hold model_lock
+    if not model_registry.load():
+        return False
+    champion = model_registry.champion
+    if active_model is not None and (active_model.name, active_model.version) == (champion.name, champion.version):
+        # Only challengers (or nothing) changed: keep the champion's cache,
+        # drift counts and shadow comparisons
+        return True
+    return install_champion(champion)
+
+def install_champion(bundle):
+    # Callers must hold model_lock
+    global active_model, drift_monitor
+    previous = active_model
+    active_model = bundle
     
-    # Make sure all columns in the training data are present
-    # For any missing columns, add them with default values of 0
-    for col in feature_names:
-        if col not in sample_df_encoded.columns:
-            sample_df_encoded[col] = 0
+    # Drift is measured against the new model's own training profile
+    if drift_monitor is not None:
+        drift_monitor.close()
+    drift_monitor = None
+    if DRIFT_MONITOR and bundle.reference_profile is not None:
+        drift_monitor = DriftMonitor(bundle.reference_profile, DRIFT_WINDOW)
     
-    # Ensure we only have the columns in the training data
-    sample_df_encoded = sample_df_encoded[feature_names]
+    # Results from a previous model must not be served
+    if prediction_cache is not None:
+        prediction_cache.clear()
     
-    # Print processed features for debugging
-    print("Processed features:", sample_df_encoded.columns.tolist())
+    # Shadow comparisons so far were against the previous champion
+    shadow_scorer.reset()
     
-    return sample_df_encoded
+    if previous is None:
+        print(f"Model and feature names loaded successfully.")
+    else:
+        print(f"Model reloaded: {previous.version} -> {bundle.version}")
+    return True
+
+def ensure_model_loaded():
+    """
+    Load the model on first use; safe to call from concurrent requests
+    """
+    if active_model is not None:
+        return True
+    with model_lock:
+        if active_model is not None:
+            return True
+        return swap_in_model()
+
+def start_model_watcher():
+    """
+    Watch MODEL_DIR for new exports when MODEL_WATCH_INTERVAL is set. Must be
+    called in each serving process, since threads do not survive a fork
+    """
+    global model_watcher
+    if MODEL_WATCH_INTERVAL > 0 and model_watcher is None:
+        model_watcher = ModelWatcher(MODEL_DIR, MODEL_WATCH_INTERVAL, load_model).start()
+
+def get_batcher():
+    """
+    Start the micro-batcher on first use. Its worker thread is created lazily
+    so that pre-forked workers each start their own after the fork
+    """
+    global batcher
+    if batcher is None:
+        with batcher_lock:
+            if batcher is None:
+                batcher = MicroBatcher(
+                    score_micro_batch,
+                    max_batch_size=MICRO_BATCH_MAX_SIZE,
+                    max_wait_ms=MICRO_BATCH_WINDOW_MS,
+                    max_queue_depth=MICRO_BATCH_QUEUE_DEPTH
+                )
+    return batcher
+
+def score_micro_batch(items):
+    """
+    Score the (bundle, applicant) pairs /predict queued on the micro-batcher,
+    with one score_batch call per bundle, so a reload during the window does
+    not score a request with a model other than the one it resolved
+    """
+    results = [None] * len(items)
+    groups = {}
+    for i, (bundle, _) in enumerate(items):
+        groups.setdefault(id(bundle), (bundle, []))[1].append(i)
+    for bundle, indexes in groups.values():
+        # /predict already recorded the applicants for drift
+        scored = score_batch([items[i][1] for i in indexes], monitor_drift=False,
+                             bundle=bundle, audit_path="single")
+        for i, result in zip(indexes, scored):
+            results[i] = result
+    return results
+
+def shadow_score(bundle, rows, X, labels, probabilities, seconds):
+    """
+    Hand rows the champion bundle just scored, in seconds, to the
+    challengers; returns at once and does nothing unless SHADOW_SCORING is on
+    """
+    if SHADOW_SCORING:
+        shadow_scorer.submit(rows, X, bundle, labels, probabilities, model_registry.challengers(), seconds)
+
+def json_response(obj, status=200, headers=None):
+    """
+    A JSON response serialized by applicant_schema.dumps (orjson when
+    installed) instead of jsonify
+    """
+    return Response(dumps(obj), status=status, headers=headers, mimetype="application/json")
+
+def preprocess_input(data, bundle=None):
+    """
+    Preprocess the input data to match the format expected by the model,
+    exactly as done in the notebook (one-hot encoding with drop_first=True)
+    """
+    # Encode straight into a float array using the encoder compiled at load time
+    return (bundle or active_model).encoder.encode(data)
 
 @app.route('/predict', methods=['POST', 'GET'])
 def predict():
-    if not model:
-        success = load_model()
-        if not success:
-            return jsonify({"error": "Model not loaded"}), 500
+    if not ensure_model_loaded():
+        return jsonify({"error": "Model not loaded"}), 500
     
     # Handle GET requests for testing in browser
     if request.method == 'GET':
@@ -103,216 +464,525 @@ def predict():
             }
         })
     
-    # Get the request data for POST requests
-    data = request.json
+    # Use one bundle for the whole request even if a reload swaps it meanwhile
+    bundle = active_model
+    
+    deadline, error = request_deadline()
+    if error is not None:
+        return json_response({"error": error}, 400)
+    
+    # Parse, validate and encode in one pass when the model's inputs match
+    # the applicant schema; bad bodies get a 400 listing every invalid field
+    start = time.perf_counter()
+    processed_data = None
+    if bundle.decoder is not None:
+        try:
+            data, processed_data = bundle.decoder.decode_json(request.get_data())
+        except SchemaError as e:
+            return json_response({"error": "Invalid applicant", "details": e.errors}, 400)
+    else:
+        data = request.json
+    start = observe_stage("single", "json_decode", start)
+    
+    monitor = drift_monitor
+    if monitor is not None and isinstance(data, dict):
+        monitor.record(data)
+    
+    # Repeat submissions skip preprocessing and the model entirely, and are
+    # answered even under overload
+    cache_key = None
+    if prediction_cache is not None and isinstance(data, dict) and not MICRO_BATCH:
+        cache_key = prediction_cache.key(data, bundle.version)
+        cached = prediction_cache.get(cache_key)
+        if cached is not None:
+            audit_decision("single", data, cached, bundle.version, cached=True)
+            start = time.perf_counter()
+            response = json_response(cached, headers={SOURCE_HEADER: "model"})
+            observe_stage("single", "response_encode", start)
+            return response
     
+    # Decide before any model work whether this request may use the model
+    admission = admission_control.admit("single", time.perf_counter(), deadline)
+    if admission.action == "reject":
+        return shed_response(admission)
+    if admission.action == "degrade":
+        return rules_only_response("single", data, bundle, admission.reason)
+    
+    model_start = time.perf_counter()
     try:
-        # Preprocess the data
-        processed_data = preprocess_input(data)
+        if MICRO_BATCH:
+            # Score together with other requests arriving in the same window
+            try:
+                timeout = deadline - time.perf_counter() if deadline is not None else None
+                result = get_batcher().submit((bundle, data), timeout)
+            except QueueFullError as e:
+                return jsonify({"error": str(e)}), 503, {"Retry-After": str(admission_control.retry_after)}
+            except FutureTimeoutError:
+                # Its batch had not started by the deadline, so the item was
+                # dropped unscored; answer from the rules
+                admission_control.degraded_after_admission("deadline")
+                return rules_only_response("single", data, bundle, "deadline")
+            if "error" in result:
+                return json_response(result, 400)
+            return json_response(result, headers={SOURCE_HEADER: "model"})
+        
+        # Preprocess the data (already done by the schema decoder)
+        if processed_data is None:
+            start = time.perf_counter()
+            processed_data = preprocess_input(data, bundle)
+            observe_stage("single", "preprocess", start)
         
         # Make prediction
-        prediction = model.predict(processed_data)[0]
-        probabilities = model.predict_proba(processed_data)[0].tolist()
+        timings = {}
+        predictions, probabilities, _ = bundle.predictor.predict(processed_data, timings)
+        observe_model_stages("single", timings)
+        predict_seconds = sum(timings.values())
+        model_seconds.observe(predict_seconds, bundle.name, "champion")
+        shadow_score(bundle, [data], processed_data, predictions, probabilities, predict_seconds)
+        prediction = predictions[0]
+        probabilities = probabilities[0].tolist()
         
         # Format the result
+        start = time.perf_counter()
         result = format_result(prediction, probabilities, data)
+        start = observe_stage("single", "format_result", start)
+        audit_decision("single", data, result, bundle.version, model_probabilities=probabilities)
+        
+        if cache_key is not None:
+            prediction_cache.put(cache_key, result)
         
-        return jsonify(result)
+        response = json_response(result, headers={SOURCE_HEADER: "model"})
+        observe_stage("single", "response_encode", start)
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    finally:
+        admission_control.release(admission, time.perf_counter() - model_start)
 
-def format_result(prediction, probabilities, data):
+def request_deadline():
     """
-    Format the prediction result for the frontend using business rules
-    since our model appears to have training issues
+    Absolute deadline (on the time.perf_counter clock) from the client's
+    DEADLINE_HEADER budget in milliseconds, counted from request arrival.
+    Returns (deadline or None, error message or None)
     """
-    # IMPORTANT: Override the model with business rules
-    # Since the model isn't properly distinguishing cases, we'll implement strict business rules
-    
-    # Calculate a risk score based on key factors
-    risk_score = 0
-    
-    # Major negative factors - each of these is high risk
-    if data.get("previous_loan_defaults_on_file") == "Yes":
-        risk_score += 40  # Major red flag
-    
-    if data.get("credit_score", 0) < 580:
-        risk_score += 30  # Very poor credit
-    elif data.get("credit_score", 0) < 670:
-        risk_score += 15  # Fair credit
-    
-    if data.get("person_income", 0) < data.get("loan_amnt", 0):
-        risk_score += 35  # Income less than loan amount
-    
-    if data.get("loan_percent_income", 0) > 50:
-        risk_score += 20  # Very high debt-to-income ratio
-    
-    if data.get("person_age", 0) < 21:
-        risk_score += 25  # Too young
-    
-    if data.get("person_emp_exp", 0) < 1:
-        risk_score += 15  # No employment history
-    
-    if data.get("cb_person_cred_hist_length", 0) < 2:
-        risk_score += 15  # Limited credit history
-    
-    if data.get("loan_int_rate", 0) > 20:
-        risk_score += 10  # Very high interest rate
-    
-    # Positive factors - reduce risk score
-    if data.get("credit_score", 0) > 750:
-        risk_score -= 15  # Excellent credit
-    
-    if data.get("person_income", 0) > data.get("loan_amnt", 0) * 3:
-        risk_score -= 15  # Income much higher than loan
-    
-    if data.get("person_emp_exp", 0) > 5:
-        risk_score -= 10  # Stable employment history
-    
-    if data.get("person_education") in ["Master", "Doctorate"]:
-        risk_score -= 5  # Higher education
-    
-    # Convert risk score to approval decision
-    if risk_score >= 50:  # High risk - clear rejection
-        approval_status = "rejected"
-        risk_level = "high"
-        probability = max(5, min(30, 100 - risk_score))  # Between 5-30% based on risk
-        direct_prediction = 0
-    elif risk_score >= 25:  # Medium risk - manual review
-        approval_status = "manual-review"
-        risk_level = "medium"
-        probability = max(30, min(60, 100 - risk_score))  # Between 30-60% based on risk
-        direct_prediction = 0 if risk_score > 40 else 1
-    else:  # Low risk - approval
-        approval_status = "approved"
-        risk_level = "low" if risk_score < 10 else "medium"
-        probability = max(60, min(95, 100 - risk_score))  # Between 60-95% based on risk
-        direct_prediction = 1
-    
-    # Generate factors lists for UI
-    positive_factors = []
-    negative_factors = []
-    
-    # Credit score
-    if data.get("credit_score", 0) >= 700:
-        positive_factors.append("Good credit score")
-    elif data.get("credit_score", 0) < 600:
-        negative_factors.append("Low credit score")
-    
-    # Previous defaults
-    if data.get("previous_loan_defaults_on_file") == "No":
-        positive_factors.append("No history of defaults")
-    else:
-        negative_factors.append("Previous loan defaults")
-    
-    # Income to loan ratio
-    if data.get("person_income", 0) > data.get("loan_amnt", 0) * 3:
-        positive_factors.append("Income significantly higher than loan amount")
-    elif data.get("person_income", 0) < data.get("loan_amnt", 0):
-        negative_factors.append("Income lower than loan amount")
-    
-    # Credit history
-    if data.get("cb_person_cred_hist_length", 0) > 5:
-        positive_factors.append("Established credit history")
-    elif data.get("cb_person_cred_hist_length", 0) < 2:
-        negative_factors.append("Limited credit history")
-    
-    # Employment experience
-    if data.get("person_emp_exp", 0) > 5:
-        positive_factors.append("Stable employment history")
-    elif data.get("person_emp_exp", 0) < 1:
-        negative_factors.append("Limited employment experience")
-    
-    # Loan to income percentage
-    if data.get("loan_percent_income", 0) > 50:
-        negative_factors.append("High loan to income percentage")
-    elif data.get("loan_percent_income", 0) < 20:
-        positive_factors.append("Low loan to income percentage")
-        
-    # Override probabilities for the model output
-    probabilities = [1 - (probability/100), probability/100]
+    value = request.headers.get(DEADLINE_HEADER)
+    if value is None:
+        return None, None
+    try:
+        budget_ms = float(value)
+    except ValueError:
+        return None, f"Invalid {DEADLINE_HEADER}: expected milliseconds"
+    if not budget_ms == budget_ms:
+        return None, f"Invalid {DEADLINE_HEADER}: expected milliseconds"
+    return g.request_start + budget_ms / 1000.0, None
+
+def shed_response(admission):
+    """
+    Fast 503 for a request that is not served at all, with a retry hint
+    """
+    messages = {
+        "deadline_expired": "Deadline already passed",
+        "overload": "Server is at its in-flight limit",
+        "deadline": "Deadline too short for a model prediction"
+    }
+    return json_response(
+        {"error": messages[admission.reason], "reason": admission.reason},
+        503,
+        headers={"Retry-After": str(admission_control.retry_after)}
+    )
+
+def rules_only_response(path, data, bundle, reason):
+    """
+    Decide with the business rules alone, skipping encoding and the model,
+    and flag the result as degraded in modelOutput
+    """
+    result = business_rules.format_batch([data])[0]
+    if "error" in result:
+        return json_response(result, 400)
+    result["modelOutput"]["degraded"] = True
+    result["modelOutput"]["degradedReason"] = reason
+    audit_decision(path, data, result, bundle.version)
+    return json_response(result, headers={SOURCE_HEADER: "rules"})
+
+def score_batch(rows, audit=True, monitor_drift=True, degraded=None, bundle=None, audit_path="batch"):
+    """
+    Score a chunk of applicants with one encoding pass and one model call.
+    Returns one entry per input row, in order: either the formatted result
+    or {"error": ...} for rows that could not be scored. Decisions are
+    audited under audit_path unless audit is False. With degraded set (the
+    reason), the model is skipped and results are rules-only, flagged in
+    modelOutput. bundle defaults to the active model
+    """
+    bundle = bundle or active_model
+    monitor = drift_monitor if monitor_drift else None
+    results = [None] * len(rows)
+    cache_keys = {}
+    
+    # Rows that are not JSON objects or that the encoder cannot encode are
+    # rejected individually; cached rows are answered without scoring
+    valid = []
+    for i, data in enumerate(rows):
+        if not isinstance(data, dict):
+            results[i] = {"error": "Expected a JSON object for each applicant"}
+            continue
+        error = bundle.encoder.validate(data)
+        if error is not None:
+            results[i] = {"error": error}
+            continue
+        if monitor is not None:
+            monitor.record(data)
+        if prediction_cache is not None:
+            cache_keys[i] = prediction_cache.key(data, bundle.version)
+            results[i] = prediction_cache.get(cache_keys[i])
+        if results[i] is None:
+            valid.append(i)
+        elif audit:
+            audit_decision(audit_path, data, results[i], bundle.version, cached=True)
+    
+    if valid:
+        # Encode the whole chunk into one matrix and call the model once
+        valid_rows = [rows[i] for i in valid]
+        probabilities = None
+        if degraded is None:
+            start = time.perf_counter()
+            processed_data = bundle.encoder.encode_batch(valid_rows)
+            observe_stage("batch", "preprocess", start)
+            
+            # The model is scored for every row, but its output is currently
+            # overridden by the business rules (see format_result)
+            timings = {}
+            labels, probabilities, _ = bundle.predictor.predict(processed_data, timings)
+            observe_model_stages("batch", timings)
+            predict_seconds = sum(timings.values())
+            model_seconds.observe(predict_seconds, bundle.name, "champion")
+            shadow_score(bundle, valid_rows, processed_data, labels, probabilities, predict_seconds)
         
-    print(f"Applied business rules: Risk Score={risk_score}, Status={approval_status}, Probability={probability}%")
+        # Business rules decide the result, evaluated for the whole chunk at once
+        start = time.perf_counter()
+        formatted = business_rules.format_batch(valid_rows)
+        observe_stage("batch", "format_result", start)
+        for row, (i, result) in enumerate(zip(valid, formatted)):
+            results[i] = result
+            if degraded is not None:
+                if "error" not in result:
+                    result["modelOutput"]["degraded"] = True
+                    result["modelOutput"]["degradedReason"] = degraded
+            elif i in cache_keys and "error" not in result:
+                prediction_cache.put(cache_keys[i], result)
+            if audit:
+                audit_decision(audit_path, rows[i], result, bundle.version,
+                               model_probabilities=probabilities[row].tolist() if probabilities is not None else None)
     
-    # Calculate recommended credit limit if approved
-    credit_limit = 0
-    if approval_status == "approved":
-        credit_limit = round((data.get("person_income", 0) * 0.3) / 1000) * 1000
+    return results
+
+@app.route('/what-if', methods=['POST'])
+def what_if():
+    """
+    Score one applicant over a grid of loan_amnt / loan_int_rate /
+    loan_percent_income values in one vectorized pass and return the
+    approval surface and the best approvable combination
+    """
+    if not ensure_model_loaded():
+        return jsonify({"error": "Model not loaded"}), 500
     
-    return {
-        "approvalStatus": approval_status,
-        "probability": round(probability),
-        "riskLevel": risk_level,
-        "creditLimit": credit_limit,
-        "positiveFactors": positive_factors,
-        "negativeFactors": negative_factors,
-        "modelOutput": {
-            "prediction": direct_prediction,
-            "probabilities": [float(p) for p in probabilities]
-        }
-    }
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({"error": "Expected a JSON object with applicant and ranges"}), 400
+    accept = body.get("accept", ["approved"])
+    if not isinstance(accept, list):
+        return jsonify({"error": "accept must be a list of statuses"}), 400
     
-    # Generate factors
-    positive_factors = []
-    negative_factors = []
+    deadline, error = request_deadline()
+    if error is not None:
+        return json_response({"error": error}, 400)
     
-    # Credit score
-    if data.get("credit_score", 0) >= 700:
-        positive_factors.append("Good credit score")
-    elif data.get("credit_score", 0) < 600:
-        negative_factors.append("Low credit score")
+    bundle = active_model
+    start = time.perf_counter()
+    try:
+        grid = build_grid(body.get("ranges"), WHAT_IF_MAX_GRID)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    grid_size = int(np.prod([len(axis) for axis in grid[1]]))
     
-    # Previous defaults
-    if data.get("previous_loan_defaults_on_file") == "No":
-        positive_factors.append("No history of defaults")
-    else:
-        negative_factors.append("Previous loan defaults")
-    
-    # Income to loan ratio
-    if data.get("person_income", 0) > data.get("loan_amnt", 0) * 3:
-        positive_factors.append("Income significantly higher than loan amount")
-    elif data.get("person_income", 0) < data.get("loan_amnt", 0):
-        negative_factors.append("Income lower than loan amount")
-    
-    # Credit history
-    if data.get("cb_person_cred_hist_length", 0) > 5:
-        positive_factors.append("Established credit history")
-    elif data.get("cb_person_cred_hist_length", 0) < 2:
-        negative_factors.append("Limited credit history")
-    
-    # Employment experience
-    if data.get("person_emp_exp", 0) > 5:
-        positive_factors.append("Stable employment history")
-    elif data.get("person_emp_exp", 0) < 1:
-        negative_factors.append("Limited employment experience")
-    
-    # Calculate recommended credit limit if approved
-    credit_limit = 0
-    if approval_status == "approved":
-        credit_limit = round((data.get("person_income", 0) * 0.3) / 1000) * 1000
+    # The grid is one model call over every combination, with no rules-only
+    # answer, so requests the model cannot take are shed with a 503
+    admission = admission_control.admit("what_if", start, deadline, rows=grid_size, degradable=False)
+    if admission.action != "model":
+        return shed_response(admission)
+    timings = {}
+    seconds = None
+    try:
+        result = evaluate_grid(
+            bundle, business_rules, body.get("applicant"), grid, body.get("maximize"), accept, timings
+        )
+        seconds = time.perf_counter() - start
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        admission_control.release(admission, seconds, grid_size)
+    observe_model_stages("what_if", timings)
+    elapsed = observe_stage("what_if", "total", start) - start
     
-    return {
-        "approvalStatus": approval_status,
-        "probability": round(approval_prob),
-        "riskLevel": risk_level,
-        "creditLimit": credit_limit,
-        "positiveFactors": positive_factors,
-        "negativeFactors": negative_factors,
-        "modelOutput": {
-            "prediction": int(prediction),
-            "probabilities": [float(p) for p in probabilities]
+    return jsonify({**result, "modelVersion": bundle.version, "seconds": elapsed})
+
+def iter_ndjson_rows(stream):
+    """
+    Yield (row, error) pairs from a newline-delimited JSON request body
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line), None
+        except ValueError as e:
+            yield None, f"Invalid JSON: {e}"
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Score many applicants in one request. Accepts a JSON array and returns
+    results in input order, or streams NDJSON in and out when the request
+    is sent as application/x-ndjson
+    """
+    if not ensure_model_loaded():
+        return jsonify({"error": "Model not loaded"}), 500
+    
+    deadline, error = request_deadline()
+    if error is not None:
+        return json_response({"error": error}, 400)
+    
+    if request.mimetype == "application/x-ndjson":
+        # The row count is unknown up front, so only the in-flight limit and
+        # an already expired deadline apply
+        admission = admission_control.admit("stream", time.perf_counter(), deadline, rows=0)
+        if admission.action == "reject":
+            return shed_response(admission)
+        return Response(
+            stream_with_context(stream_batch(iter_ndjson_rows(request.stream), admission)),
+            mimetype="application/x-ndjson"
+        )
+    
+    rows = request.get_json(silent=True)
+    if not isinstance(rows, list):
+        return jsonify({"error": "Expected a JSON array of applicants"}), 400
+    
+    admission = admission_control.admit("batch", time.perf_counter(), deadline, rows=len(rows))
+    if admission.action == "reject":
+        return shed_response(admission)
+    degraded = admission.reason if admission.action == "degrade" else None
+    
+    start = time.perf_counter()
+    results = []
+    try:
+        for offset in range(0, len(rows), BATCH_CHUNK_SIZE):
+            results.extend(score_batch(rows[offset:offset + BATCH_CHUNK_SIZE], degraded=degraded))
+    finally:
+        if admission.action == "model":
+            admission_control.release(admission, time.perf_counter() - start, len(rows))
+    elapsed = time.perf_counter() - start
+    
+    return jsonify({
+        "results": results,
+        "count": len(results),
+        "errors": sum(1 for result in results if "error" in result),
+        "seconds": elapsed,
+        "rowsPerSecond": len(results) / elapsed if elapsed > 0 else None
+    })
+
+def stream_batch(parsed_rows, admission=None):
+    """
+    Score (row, error) pairs chunk by chunk, yielding one NDJSON line per row
+    followed by a summary line. An admitted stream holds its in-flight slot
+    until it ends; a degraded one is answered rules-only
+    """
+    degraded = admission.reason if admission is not None and admission.action == "degrade" else None
+    try:
+        yield from _stream_batch(parsed_rows, degraded)
+    finally:
+        if admission is not None and admission.action == "model":
+            admission_control.release(admission)
+
+def _stream_batch(parsed_rows, degraded):
+    start = time.perf_counter()
+    count = 0
+    errors = 0
+    chunk = []
+    
+    def emit(chunk):
+        nonlocal count, errors
+        scored = iter(score_batch([row for row, error in chunk if error is None], degraded=degraded))
+        for row, error in chunk:
+            result = {"error": error} if error is not None else next(scored)
+            if "error" in result:
+                errors += 1
+            yield json.dumps({"index": count, **result}) + "\n"
+            count += 1
+    
+    for item in parsed_rows:
+        chunk.append(item)
+        if len(chunk) >= BATCH_CHUNK_SIZE:
+            yield from emit(chunk)
+            chunk = []
+    if chunk:
+        yield from emit(chunk)
+    
+    elapsed = time.perf_counter() - start
+    yield json.dumps({
+        "summary": {
+            "count": count,
+            "errors": errors,
+            "seconds": elapsed,
+            "rowsPerSecond": count / elapsed if elapsed > 0 else None
         }
-    }
+    }) + "\n"
+
+def format_result(prediction, probabilities, data):
+    """
+    Format the prediction result for the frontend using business rules
+    since our model appears to have training issues
+    """
+    # IMPORTANT: Override the model with business rules
+    # Since the model isn't properly distinguishing cases, we apply the
+    # rule table in business_rules.json
+    result = business_rules.format_batch([data])[0]
+    if "error" in result:
+        raise ValueError(result["error"])
+    
+    request_log.debug(
+        "business_rules_applied",
+        status=result["approvalStatus"],
+        probability=result["probability"]
+    )
+    
+    return result
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """
+    Stage latency histograms and server gauges in Prometheus text format
+    """
+    return Response(metrics.render(), content_type=MetricsRegistry.CONTENT_TYPE)
+
+@app.route('/batching-stats', methods=['GET'])
+def batching_stats():
+    """
+    Batch-size distribution and added latency of the micro-batcher
+    """
+    if batcher is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **batcher.stats()})
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """
+    Hit/miss counts and occupancy of the prediction cache
+    """
+    if prediction_cache is None:
+        return jsonify({"enabled": False})
+    model_version = active_model.version if active_model is not None else None
+    return jsonify({"enabled": True, "modelVersion": model_version, **prediction_cache.stats()})
+
+@app.route('/audit-stats', methods=['GET'])
+def audit_stats():
+    """
+    Audit records written, dropped and queued, and files and fsyncs so far
+    """
+    if audit_log is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, "directory": os.path.abspath(AUDIT_LOG_DIR), **audit_log.stats()})
+
+@app.route('/admission-stats', methods=['GET'])
+def admission_stats():
+    """
+    In-flight requests, admitted/degraded/rejected counts and the model-path
+    cost estimates used for deadlines
+    """
+    return jsonify(admission_control.stats())
+
+@app.route('/drift', methods=['GET'])
+def drift():
+    """
+    Per-feature drift (PSI, and KS for numeric inputs) of live applicants
+    against the active model's training profile, in this worker process
+    """
+    monitor = drift_monitor
+    if monitor is None:
+        reason = "disabled" if not DRIFT_MONITOR else "no reference_profile.json for the active model"
+        return jsonify({"enabled": False, "reason": reason})
+    model_version = active_model.version if active_model is not None else None
+    return json_response({"enabled": True, "modelVersion": model_version, "pid": os.getpid(), **monitor.report()})
 
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({"status": "healthy"})
+    """
+    Liveness plus the active model's version, load time and artifact hashes
+    """
+    bundle = active_model
+    return jsonify({
+        "status": "healthy",
+        "model": bundle.describe() if bundle is not None else None
+    })
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """
+    Load the artifacts currently in MODEL_DIR and swap them in. Predictions
+    keep being served by the old model until the new one has passed its checks
+    """
+    if ADMIN_TOKEN and request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        return jsonify({"error": "Forbidden"}), 403
+    
+    if not load_model():
+        bundle = active_model
+        return jsonify({
+            "error": "Reload failed; the previous model is still active",
+            "model": bundle.describe() if bundle is not None else None
+        }), 500
+    return jsonify({"status": "reloaded", "model": active_model.describe()})
+
+@app.route('/models', methods=['GET'])
+def models():
+    """
+    Registered models with their role, version and load errors, and the
+    shadow comparison of each challenger against the champion
+    """
+    return jsonify({
+        **model_registry.describe(),
+        "shadow": {"enabled": SHADOW_SCORING, "pid": os.getpid(), **shadow_scorer.stats()}
+    })
+
+@app.route('/admin/promote', methods=['POST'])
+def admin_promote():
+    """
+    Make a loaded challenger the champion, e.g. after its shadow comparison
+    """
+    if ADMIN_TOKEN and request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        return jsonify({"error": "Forbidden"}), 403
+    if not ensure_model_loaded():
+        return jsonify({"error": "Model not loaded"}), 500
+    
+    body = request.get_json(silent=True)
+    name = body.get("model") if isinstance(body, dict) else None
+    with model_lock:
+        previous = model_registry.champion_name
+        try:
+            bundle = model_registry.promote(name)
+        except KeyError:
+            loaded = [model_name for model_name, info in model_registry.describe()["models"].items() if info["loaded"]]
+            return jsonify({"error": f"Unknown or unloaded model {name!r}; loaded models are {', '.join(loaded)}"}), 400
+        install_champion(bundle)
+    print(f"Champion promoted: {previous} -> {name}")
+    return jsonify({"status": "promoted", "previous": previous, "model": bundle.describe()})
 
 @app.route('/test-cases', methods=['GET'])
 def test_cases():
     """
     Endpoint to test various scenarios: rejection, approval, and borderline
     """
+    if not ensure_model_loaded():
+        return jsonify({"error": "Model not loaded"}), 500
+    
     # Rejection case
     rejection_case = {
         "person_age": 20.0,
@@ -347,20 +1017,12 @@ def test_cases():
         "previous_loan_defaults_on_file": "No"
     }
     
-    # Process both cases
-    rejection_processed = preprocess_input(rejection_case)
-    approval_processed = preprocess_input(approval_case)
-    
-    # Make predictions
-    rejection_prediction = model.predict(rejection_processed)[0]
-    rejection_probs = model.predict_proba(rejection_processed)[0].tolist()
-    
-    approval_prediction = model.predict(approval_processed)[0]
-    approval_probs = model.predict_proba(approval_processed)[0].tolist()
-    
-    # Format results
-    rejection_result = format_result(rejection_prediction, rejection_probs, rejection_case)
-    approval_result = format_result(approval_prediction, approval_probs, approval_case)
+    # Score both cases together; repeat calls are served from the cache
+    # Canned examples, not real decisions or live inputs, so they are
+    # neither audited nor counted for drift
+    rejection_result, approval_result = score_batch(
+        [rejection_case, approval_case], audit=False, monitor_drift=False
+    )
     
     return jsonify({
         "rejection_case": {
@@ -374,8 +1036,11 @@ def test_cases():
     })
 
 if __name__ == '__main__':
+    logging.basicConfig(format="%(message)s")
+    
     # Load the model on startup
     load_model()
+    start_model_watcher()
     
     # Run the app
     app.run(host='localhost', port=8000, debug=True)
\ No newline at end of file
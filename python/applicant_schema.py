@@ -0,0 +1,161 @@
+import json
+import math
+import sys
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The 13 applicant fields /predict accepts. Numbers may be ints or floats
+# (not booleans) within [min, max]; categories must be one of the listed values
+APPLICANT_SCHEMA = {
+    "person_age": {"type": "number", "min": 0, "max": 150},
+    "person_gender": {"type": "category", "values": ["male", "female"]},
+    "person_education": {"type": "category", "values": ["High School", "Associate", "Bachelor", "Master", "Doctorate"]},
+    "person_income": {"type": "number", "min": 0},
+    "person_emp_exp": {"type": "number", "min": 0, "max": 100},
+    "person_home_ownership": {"type": "category", "values": ["RENT", "OWN", "MORTGAGE", "OTHER"]},
+    "loan_amnt": {"type": "number", "min": 0},
+    "loan_intent": {
+        "type": "category",
+        "values": ["EDUCATION", "PERSONAL", "MEDICAL", "VENTURE", "HOMEIMPROVEMENT", "DEBTCONSOLIDATION"]
+    },
+    "loan_int_rate": {"type": "number", "min": 0, "max": 100},
+    "loan_percent_income": {"type": "number", "min": 0},
+    "cb_person_cred_hist_length": {"type": "number", "min": 0, "max": 100},
+    "credit_score": {"type": "number", "min": 300, "max": 850},
+    "previous_loan_defaults_on_file": {"type": "category", "values": ["Yes", "No"]}
+}
+
+# Placeholder for absent fields, distinct from an explicit null
+MISSING = object()
+
+class SchemaError(ValueError):
+    """
+    An applicant failed validation; errors lists {"field", "error"} for every
+    problem found, not just the first
+    """
+
+    def __init__(self, errors):
+        super().__init__("; ".join(f"{e['field']}: {e['error']}" if e["field"] else e["error"] for e in errors))
+        self.errors = errors
+
+def loads(body):
+    """
+    Parse a JSON request body, with orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+def dumps(obj):
+    """
+    Serialize a response body to bytes, with orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+def _number_field(spec, position):
+    low = spec.get("min", -sys.float_info.max)
+    high = spec.get("max", sys.float_info.max)
+    message = f"Must be between {low:g} and {high:g}" if "max" in spec else f"Must be at least {low:g}"
+
+    def decode(value, row):
+        # bool is an int subclass but never a valid number here
+        if type(value) is not float and type(value) is not int:
+            return f"Expected a number, got {type(value).__name__ if value is not None else 'null'}"
+        # Also false for NaN and infinities, since both bounds are finite.
+        # Ints are always finite, and math.isfinite overflows on ints too
+        # large for a float
+        if not low <= value <= high:
+            return message if type(value) is int or math.isfinite(value) else "Expected a finite number"
+        if position is not None:
+            row[position] = value
+        return None
+    return decode
+
+def _category_field(spec, positions):
+    allowed = set(spec["values"])
+    expected = ", ".join(spec["values"])
+
+    def decode(value, row):
+        if not isinstance(value, str) or value not in allowed:
+            return f"Unknown value {value!r}; expected one of {expected}"
+        # The dropped (reference) level has no column and stays all-zero
+        position = positions.get(value)
+        if position is not None:
+            row[position] = 1.0
+        return None
+    return decode
+
+class ApplicantDecoder:
+    """
+    APPLICANT_SCHEMA compiled against a model's FeatureEncoder: one check per
+    field, each writing its value straight into the encoder's output row, so
+    a request is parsed, validated and encoded in one pass over its fields
+    """
+
+    def __init__(self, encoder, schema=APPLICANT_SCHEMA):
+        numeric_positions = dict(encoder.numeric_positions)
+        uncovered = [
+            col for col in list(numeric_positions) + list(encoder.category_positions) if col not in schema
+        ]
+        if uncovered:
+            raise ValueError(f"The schema does not cover model inputs {', '.join(uncovered)}")
+
+        self.n_features = encoder.n_features
+        self.fields = []
+        for name, spec in schema.items():
+            if spec["type"] == "number":
+                self.fields.append((name, _number_field(spec, numeric_positions.get(name))))
+            elif spec["type"] == "category":
+                self.fields.append((name, _category_field(spec, encoder.category_positions.get(name, {}))))
+            else:
+                raise ValueError(f"Unknown schema type {spec['type']!r} for {name}")
+
+    def decode(self, data):
+        """
+        Validate an applicant dict and return (applicant with only the
+        schema fields, (1, n_features) encoded row), or raise SchemaError
+        """
+        if not isinstance(data, dict):
+            raise SchemaError([{"field": None, "error": "Expected a JSON object"}])
+        # Filling a list and converting it once is cheaper than item
+        # assignment into a NumPy row
+        row = [0.0] * self.n_features
+        errors = None
+        for name, decode in self.fields:
+            value = data.get(name, MISSING)
+            error = decode(value, row) if value is not MISSING else "Required field is missing"
+            if error is not None:
+                errors = errors or []
+                errors.append({"field": name, "error": error})
+        if errors:
+            raise SchemaError(errors)
+        # Every schema field is present, so only extra fields need dropping
+        applicant = data if len(data) == len(self.fields) else {name: data[name] for name, _ in self.fields}
+        return applicant, np.array([row], dtype=np.float64)
+
+    def decode_json(self, body):
+        """
+        decode() for a raw JSON request body
+        """
+        try:
+            data = loads(body)
+        except ValueError as e:
+            raise SchemaError([{"field": None, "error": f"Invalid JSON: {e}"}])
+        return self.decode(data)
+
+def compile_decoder(encoder):
+    """
+    The schema decoder for a model, or None when the model takes inputs the
+    schema does not describe (e.g. a model trained on other data)
+    """
+    try:
+        return ApplicantDecoder(encoder)
+    except ValueError:
+        return None
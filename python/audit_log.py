@@ -0,0 +1,138 @@
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+
+class AuditLog:
+    """
+    Append-only decision log. Request threads only enqueue a record (a
+    non-blocking put); a background thread serialises records in batches to
+    gzip-compressed NDJSON files, rotating them by size, and fsyncs at most
+    once per fsync_interval rather than once per record.
+
+    When the queue is full, records are dropped and counted instead of
+    blocking the request. Each process writes its own files (the pid is in
+    the file name), so pre-forked workers never interleave lines
+    """
+
+    def __init__(self, directory, max_queue=10000, batch_size=512, flush_interval=0.2,
+                 fsync_interval=1.0, max_file_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_file_bytes = max_file_bytes
+        self.lock = threading.Lock()
+        self.pid = None
+        self.thread = None
+
+    def _start(self):
+        # (Re)started lazily in the process that records, so a writer created
+        # before fork gets its own queue and thread in each worker
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.queue = queue.Queue(self.max_queue)
+            self.stopping = threading.Event()
+            self.counts = {"written": 0, "dropped": 0, "batches": 0, "fsyncs": 0, "files": 0}
+            self.file = None
+            self.file_bytes = 0
+            self.sequence = 0
+            self.thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+            self.thread.start()
+            self.pid = os.getpid()
+
+    def record(self, event):
+        """
+        Queue one record; never blocks. Returns False if it was dropped
+        """
+        if self.pid != os.getpid():
+            self._start()
+        event["ts"] = time.time()
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            with self.lock:
+                self.counts["dropped"] += 1
+            return False
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.sequence += 1
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        path = os.path.join(self.directory, f"audit-{stamp}-{os.getpid()}-{self.sequence:04d}.ndjson.gz")
+        self.raw = open(path, "ab")
+        self.file = gzip.GzipFile(fileobj=self.raw, mode="ab")
+        self.file_bytes = 0
+        self.counts["files"] += 1
+
+    def _close_file(self):
+        if self.file is not None:
+            self.file.close()
+            self.raw.flush()
+            os.fsync(self.raw.fileno())
+            self.raw.close()
+            self.counts["fsyncs"] += 1
+            self.file = None
+
+    def _sync(self):
+        # A sync flush ends the compressed stream at a decodable point, so a
+        # crash loses at most the records since the last fsync
+        self.file.flush()
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+        self.counts["fsyncs"] += 1
+
+    def _write(self, batch):
+        if self.file is None or self.file_bytes >= self.max_file_bytes:
+            self._close_file()
+            self._open()
+        data = "".join(json.dumps(event, separators=(",", ":"), default=str) + "\n" for event in batch).encode()
+        self.file.write(data)
+        self.file_bytes += len(data)
+        self.counts["written"] += len(batch)
+        self.counts["batches"] += 1
+
+    def _drain(self, batch):
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        last_sync = time.monotonic()
+        dirty = False
+        while not (self.stopping.is_set() and self.queue.empty()):
+            try:
+                batch = self._drain([self.queue.get(timeout=self.flush_interval)])
+            except queue.Empty:
+                batch = []
+            if batch:
+                self._write(batch)
+                dirty = True
+            if dirty and time.monotonic() - last_sync >= self.fsync_interval:
+                self._sync()
+                last_sync = time.monotonic()
+                dirty = False
+        self._close_file()
+
+    def close(self, timeout=10.0):
+        """
+        Write everything still queued, fsync and close the current file
+        """
+        if self.pid != os.getpid() or self.thread is None:
+            return
+        self.stopping.set()
+        self.thread.join(timeout)
+        self.pid = None
+
+    def stats(self):
+        if self.pid != os.getpid():
+            return {"queued": 0, "written": 0, "dropped": 0, "batches": 0, "fsyncs": 0, "files": 0}
+        return {"queued": self.queue.qsize(), **self.counts}
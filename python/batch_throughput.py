@@ -0,0 +1,74 @@
+import argparse
+import os
+import time
+
+# The same rows go to /predict and then /predict/batch, so cached results from
+# the first pass must not answer the second; synthetic rows are not audited
+os.environ["PREDICTION_CACHE_SIZE"] = "0"
+os.environ["AUDIT_LOG_DIR"] = ""
+
+import api_server
+
+EXAMPLE_APPLICANT = {
+    "person_age": 28.0,
+    "person_gender": "male",
+    "person_education": "Bachelor",
+    "person_income": 50000.0,
+    "person_emp_exp": 3,
+    "person_home_ownership": "RENT",
+    "loan_amnt": 15000.0,
+    "loan_intent": "EDUCATION",
+    "loan_int_rate": 12.5,
+    "loan_percent_income": 30.0,
+    "cb_person_cred_hist_length": 5.0,
+    "credit_score": 700,
+    "previous_loan_defaults_on_file": "No"
+}
+
+def make_applicants(n_rows):
+    """
+    Vary income and loan amount so rows are not identical
+    """
+    rows = []
+    for i in range(n_rows):
+        row = dict(EXAMPLE_APPLICANT)
+        row["person_income"] = 20000.0 + (i * 37) % 100000
+        row["loan_amnt"] = 1000.0 + (i * 53) % 40000
+        rows.append(row)
+    return rows
+
+def measure_throughput(n_rows):
+    """
+    Compare rows/sec of /predict (one request per row) against /predict/batch
+    """
+    api_server.load_model()
+    client = api_server.app.test_client()
+    rows = make_applicants(n_rows)
+
+    start = time.perf_counter()
+    for row in rows:
+        client.post("/predict", json=row)
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    response = client.post("/predict/batch", json=rows)
+    batch_seconds = time.perf_counter() - start
+    assert response.status_code == 200, response.data
+
+    return {
+        "rows": n_rows,
+        "single_rows_per_second": n_rows / single_seconds,
+        "batch_rows_per_second": n_rows / batch_seconds,
+        "speedup": single_seconds / batch_seconds
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare single-row and batch scoring throughput")
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    stats = measure_throughput(args.rows)
+    print(f"Rows scored:        {stats['rows']}")
+    print(f"/predict:           {stats['single_rows_per_second']:.0f} rows/sec")
+    print(f"/predict/batch:     {stats['batch_rows_per_second']:.0f} rows/sec")
+    print(f"Speedup:            {stats['speedup']:.1f}x")
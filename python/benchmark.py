@@ -0,0 +1,188 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+
+# The benchmark measures scoring, so cached results must not short-circuit it,
+# and its synthetic applicants are not decisions to audit or count for drift
+# (as with serve.warm_up and /test-cases), which would also add the monitor's
+# overhead to the measured latencies
+os.environ["PREDICTION_CACHE_SIZE"] = "0"
+os.environ["AUDIT_LOG_DIR"] = ""
+os.environ["DRIFT_MONITOR"] = "0"
+
+import api_server
+import applicant_schema
+from batch_throughput import make_applicants
+
+DEFAULT_BATCH_SIZES = (1, 10, 100, 1000, 10000)
+
+# A case is repeated until it has run for MIN_SECONDS (at least MIN_ROUNDS
+# times, at most MAX_ROUNDS), after one untimed warm-up call
+MIN_SECONDS = 0.5
+MIN_ROUNDS = 3
+MAX_ROUNDS = 1000
+
+def time_case(fn):
+    """
+    Median, min and mean seconds per call of fn, and the number of rounds
+    """
+    fn()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < MAX_ROUNDS:
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+        if len(samples) >= MIN_ROUNDS and time.perf_counter() - started >= MIN_SECONDS:
+            break
+    return {
+        "median_seconds": statistics.median(samples),
+        "min_seconds": min(samples),
+        "mean_seconds": statistics.fmean(samples),
+        "rounds": len(samples)
+    }
+
+def build_cases(bundle, client, rows):
+    """
+    {name: fn} timing one stage for every row in rows. Stages that call a
+    single-row function loop over the rows, as a request per row would
+    """
+    X = bundle.encoder.encode_batch(rows)
+    bodies = [json.dumps(row).encode() for row in rows]
+    results = api_server.business_rules.format_batch(rows)
+
+    def jsonify_results():
+        with api_server.app.app_context():
+            return [api_server.jsonify(result) for result in results]
+
+    cases = {
+        # Request body to model input: the generic path and the schema decoder
+        "decode_json_preprocess": lambda: [api_server.preprocess_input(json.loads(body), bundle) for body in bodies],
+        "preprocess_input": lambda: [api_server.preprocess_input(row, bundle) for row in rows],
+        "encode_batch": lambda: bundle.encoder.encode_batch(rows),
+        "predictor": lambda: bundle.predictor.predict(X),
+        "format_result": lambda: [api_server.format_result(None, None, row) for row in rows],
+        "business_rules_batch": lambda: api_server.business_rules.format_batch(rows),
+        "request_predict": lambda: [client.post("/predict", json=row) for row in rows],
+        "request_predict_batch": lambda: client.post("/predict/batch", json=rows),
+        "response_jsonify": jsonify_results,
+        "response_json_response": lambda: [api_server.json_response(result) for result in results]
+    }
+    if bundle.decoder is not None:
+        cases["schema_decode"] = lambda: [bundle.decoder.decode_json(body) for body in bodies]
+
+    # The exact SVC pipeline's own steps, as sklearn runs them
+    steps = getattr(bundle.model, "named_steps", {})
+    if "scaler" in steps and "svm" in steps:
+        scaler, svm = steps["scaler"], steps["svm"]
+        X_scaled = scaler.transform(X)
+        cases["scaler"] = lambda: scaler.transform(X)
+        cases["svc_decision_function"] = lambda: svm.decision_function(X_scaled)
+        cases["svc_predict_proba"] = lambda: svm.predict_proba(X_scaled)
+    return cases
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def environment(bundle):
+    import flask
+    import pandas
+    import sklearn
+
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pandas.__version__,
+        "scikit_learn": sklearn.__version__,
+        "flask": flask.__version__ if hasattr(flask, "__version__") else None,
+        "model_version": bundle.version,
+        "orjson": applicant_schema.orjson.__version__ if applicant_schema.orjson is not None else None,
+        "svm_float32": api_server.USE_FLOAT32
+    }
+
+def run_benchmarks(batch_sizes=DEFAULT_BATCH_SIZES, only=None):
+    api_server.load_model()
+    bundle = api_server.active_model
+    client = api_server.app.test_client()
+
+    results = []
+    for batch_size in batch_sizes:
+        rows = make_applicants(batch_size)
+        for name, fn in build_cases(bundle, client, rows).items():
+            if only and name not in only:
+                continue
+            timing = time_case(fn)
+            timing["rows_per_second"] = batch_size / timing["median_seconds"]
+            results.append({"name": name, "batch_size": batch_size, **timing})
+            print(f"{name:<24}{batch_size:>7}{timing['median_seconds'] * 1000:>14.3f} ms"
+                  f"{timing['rows_per_second']:>16.0f} rows/s")
+    return {"environment": environment(bundle), "results": results}
+
+def compare(current, baseline, threshold):
+    """
+    Match results by (name, batch size) and return those whose median is
+    more than threshold (a fraction) slower than the baseline
+    """
+    previous = {(r["name"], r["batch_size"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':<24}{'batch':>7}{'baseline ms':>14}{'current ms':>14}{'change':>10}")
+    for result in current["results"]:
+        before = previous.get((result["name"], result["batch_size"]))
+        if before is None:
+            continue
+        change = result["median_seconds"] / before["median_seconds"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append({**result, "baseline_median_seconds": before["median_seconds"], "change": change})
+        print(f"{result['name']:<24}{result['batch_size']:>7}{before['median_seconds'] * 1000:>14.3f}"
+              f"{result['median_seconds'] * 1000:>14.3f}{change:>+10.1%}{flag}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time every serving stage at several batch sizes")
+    parser.add_argument("--batch-sizes", default=",".join(str(size) for size in DEFAULT_BATCH_SIZES))
+    parser.add_argument("--only", help="Comma-separated case names to run")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Slowdown (fraction of the baseline median) reported as a regression")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+    only = set(args.only.split(",")) if args.only else None
+    current = run_benchmarks(batch_sizes, only)
+
+    with open(args.output, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"Results saved to {os.path.abspath(args.output)}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"No regressions over {args.threshold:.0%}")
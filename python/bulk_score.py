@@ -0,0 +1,230 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import resource
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from business_rules import BusinessRules
+from data_sources import TARGET, data_fingerprint, iter_chunks
+from model_store import ModelBundle
+
+# Output columns, in order; factors are lists of strings
+RESULT_COLUMNS = (
+    "row", "status", "probability", "risk_level", "credit_limit",
+    "positive_factors", "negative_factors", "model_prediction", "model_probability", "error"
+)
+
+def result_schema():
+    """
+    Arrow types of RESULT_COLUMNS, fixed so that every part has the same
+    schema even when a chunk's column is all missing (e.g. no errors)
+    """
+    import pyarrow as pa
+
+    factors = pa.list_(pa.string())
+    return pa.schema([
+        ("row", pa.int64()), ("status", pa.string()), ("probability", pa.float64()),
+        ("risk_level", pa.string()), ("credit_limit", pa.float64()), ("positive_factors", factors),
+        ("negative_factors", factors), ("model_prediction", pa.int64()), ("model_probability", pa.float64()),
+        ("error", pa.string())
+    ])
+
+# Set in each worker by load_worker(): the model bundle and the business rules
+worker = {}
+
+def load_worker(model_dir, rules_path, use_float32):
+    """
+    Pool initializer: load the model and rules once per worker process
+    """
+    worker["bundle"] = ModelBundle(model_dir, use_float32)
+    worker["rules"] = BusinessRules.load(rules_path)
+
+def records_from_frame(chunk):
+    """
+    Applicant dicts as the server would receive them in JSON: native Python
+    values, with missing (NaN) cells left out
+    """
+    columns = {col: chunk[col].tolist() for col in chunk.columns if col != TARGET}
+    records = []
+    for i in range(len(chunk)):
+        record = {}
+        for col, values in columns.items():
+            value = values[i]
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                continue
+            record[col] = value
+        records.append(record)
+    return records
+
+def score_chunk(first_row, chunk):
+    """
+    Score one chunk the way /predict/batch does (one encoding pass, one model
+    call, the business rules for the whole chunk) and return it as a
+    DataFrame of results. Rows the encoder rejects get an error instead of
+    failing the chunk
+    """
+    bundle = worker["bundle"]
+    rows = records_from_frame(chunk)
+    errors = [bundle.encoder.validate(row) for row in rows]
+    valid = [row for row, error in zip(rows, errors) if error is None]
+    formatted = []
+    if valid:
+        _, probabilities, _ = bundle.predictor.predict(bundle.encoder.encode_batch(valid))
+        formatted = worker["rules"].format_batch(valid)
+    labels = list(bundle.model.classes_)
+    approve = labels.index(1) if 1 in labels else len(labels) - 1
+
+    results = {column: [] for column in RESULT_COLUMNS}
+    scored = 0
+    for i, error in enumerate(errors):
+        result, model_probability = {}, float("nan")
+        if error is None:
+            result, model_probability = formatted[scored], float(probabilities[scored, approve])
+            error = result.get("error")
+            scored += 1
+        results["row"].append(first_row + i)
+        results["status"].append(result.get("approvalStatus"))
+        results["probability"].append(result.get("probability"))
+        results["risk_level"].append(result.get("riskLevel"))
+        results["credit_limit"].append(result.get("creditLimit"))
+        results["positive_factors"].append(result.get("positiveFactors", []))
+        results["negative_factors"].append(result.get("negativeFactors", []))
+        results["model_prediction"].append(None if error else result["modelOutput"]["prediction"])
+        results["model_probability"].append(model_probability)
+        results["error"].append(error)
+    return pd.DataFrame(results, columns=list(RESULT_COLUMNS))
+
+def part_path(parts_dir, index):
+    return os.path.join(parts_dir, f"part-{index:05d}.parquet")
+
+def check_manifest(parts_dir, manifest):
+    """
+    Parts from an earlier run are only reused if they came from the same
+    input, model, rules, chunk size and float32 setting
+    """
+    path = os.path.join(parts_dir, "manifest.json")
+    if os.path.exists(path):
+        with open(path) as f:
+            previous = json.load(f)
+        if previous != manifest:
+            raise ValueError(
+                f"{parts_dir} holds results of a different run "
+                "(input, model, rules, chunk size or --float32 changed); remove it to start over"
+            )
+    else:
+        os.makedirs(parts_dir, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+def write_part(parts_dir, index, frame):
+    path = part_path(parts_dir, index)
+    frame.to_parquet(path + ".tmp", index=False, schema=result_schema())
+    os.replace(path + ".tmp", path)
+
+def merge_parts(parts_dir, n_parts, output):
+    """
+    Concatenate the parts, in order, into one Parquet file; one row group
+    per part keeps memory bounded by the chunk size
+    """
+    import pyarrow.parquet as pq
+
+    writer = None
+    temporary = output + ".tmp"
+    try:
+        for index in range(n_parts):
+            table = pq.read_table(part_path(parts_dir, index))
+            if writer is None:
+                writer = pq.ParquetWriter(temporary, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(temporary, output)
+
+def peak_memory_mb():
+    # ru_maxrss is in KB on Linux; the largest worker stands in for the pool
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, children
+
+def bulk_score(source, output, model_dir="ml_model", rules_path="business_rules.json",
+               chunksize=50000, workers=None, use_float32=False):
+    """
+    Score every applicant in a CSV/Parquet source into one Parquet file with
+    a row per input row, in input order. Finished chunks are kept as parts
+    next to the output, so rerunning after an interruption only scores the
+    remaining chunks
+    """
+    start = time.perf_counter()
+    bundle = ModelBundle(model_dir)
+    with open(rules_path, "rb") as f:
+        rules_hash = hashlib.sha256(f.read()).hexdigest()
+    parts_dir = output + ".parts"
+    check_manifest(parts_dir, {
+        "source": data_fingerprint(source),
+        "model": bundle.version,
+        "rules": rules_hash,
+        "chunksize": chunksize,
+        "use_float32": use_float32
+    })
+    del bundle
+
+    workers = workers or os.cpu_count()
+    scored_rows = 0
+    n_parts = 0
+    pending = {}
+    with ProcessPoolExecutor(workers, initializer=load_worker,
+                             initargs=(model_dir, rules_path, use_float32)) as pool:
+        first_row = 0
+        for index, chunk in enumerate(iter_chunks(source, chunksize)):
+            n_parts = index + 1
+            if not os.path.exists(part_path(parts_dir, index)):
+                pending[index] = pool.submit(score_chunk, first_row, chunk)
+                scored_rows += len(chunk)
+            first_row += len(chunk)
+
+            # Keep a bounded number of chunks in flight
+            while len(pending) >= 2 * workers:
+                done = min(pending)
+                write_part(parts_dir, done, pending.pop(done).result())
+        for index in sorted(pending):
+            write_part(parts_dir, index, pending[index].result())
+
+    merge_parts(parts_dir, n_parts, output)
+    shutil.rmtree(parts_dir)
+
+    seconds = time.perf_counter() - start
+    own_mb, worker_mb = peak_memory_mb()
+    report = {
+        "rows": first_row,
+        "rows_scored": scored_rows,
+        "seconds": seconds,
+        "rows_per_second": scored_rows / seconds if seconds else 0.0,
+        "peak_memory_mb": own_mb,
+        "peak_worker_memory_mb": worker_mb,
+        "workers": workers
+    }
+    print(f"Scored {scored_rows} of {first_row} rows in {seconds:.1f}s "
+          f"({report['rows_per_second']:.0f} rows/s) into {os.path.abspath(output)}")
+    print(f"Peak memory: {own_mb:.0f} MB (main), {worker_mb:.0f} MB (largest worker)")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file of applicants into Parquet")
+    parser.add_argument("source", help="CSV/Parquet file, directory of part files or glob")
+    parser.add_argument("output", help="Parquet file to write")
+    parser.add_argument("--model-dir", default="ml_model")
+    parser.add_argument("--rules", default=os.environ.get("BUSINESS_RULES_PATH", "business_rules.json"))
+    parser.add_argument("--chunksize", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: CPU count)")
+    parser.add_argument("--float32", action="store_true", help="Score in float32, like SVM_FLOAT32=1")
+    args = parser.parse_args()
+
+    bulk_score(args.source, args.output, args.model_dir, args.rules,
+               args.chunksize, args.workers, args.float32)
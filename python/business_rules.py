@@ -0,0 +1,223 @@
+import json
+import numpy as np
+
+# Comparison operators applied to numeric fields
+NUMERIC_OPS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal
+}
+
+# Operators applied to categorical fields
+CATEGORICAL_OPS = ("==", "in")
+
+class BusinessRules:
+    """
+    Risk-score, status, factor and credit-limit rules compiled from a rule
+    table (see business_rules.json) into a NumPy evaluator that scores a
+    whole batch of applicants at once.
+
+    Missing numeric fields default to 0 and missing categorical fields to
+    None, as data.get() did in the hand-written rules.
+    """
+
+    def __init__(self, table):
+        self.numeric_fields = set()
+        self.categorical_fields = set()
+
+        self.risk_chains = [
+            [(self._compile_condition(rule.get("when")), rule["points"]) for rule in chain]
+            for chain in self._chains(table["risk_score"])
+        ]
+        self.factor_chains = [
+            [(self._compile_condition(rule.get("when")), rule.get("positive"), rule.get("negative")) for rule in chain]
+            for chain in self._chains(table["factors"])
+        ]
+
+        self.probability_base = table["probability_base"]
+        self.statuses = table["statuses"]
+        if self.statuses[-1].get("min_risk") is not None:
+            raise ValueError("The last status band must have min_risk null")
+
+        self.credit_limit = table["credit_limit"]
+        self.numeric_fields.add(self.credit_limit["income_field"])
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def _chains(rules):
+        """
+        Normalise rules into first-match chains; a plain rule is a chain of one
+        """
+        return [rule["first_match"] if "first_match" in rule else [rule] for rule in rules]
+
+    def _compile_condition(self, when):
+        if when is None:
+            return lambda columns, n: np.ones(n, dtype=bool)
+
+        field = when["field"]
+        op = when["op"]
+        if op in NUMERIC_OPS:
+            compare = NUMERIC_OPS[op]
+            self.numeric_fields.add(field)
+            if "other_field" in when:
+                other = when["other_field"]
+                multiplier = when.get("multiplier", 1)
+                self.numeric_fields.add(other)
+                if multiplier == 1:
+                    return lambda columns, n: compare(columns[field], columns[other])
+                return lambda columns, n: compare(columns[field], columns[other] * multiplier)
+            value = when["value"]
+            return lambda columns, n: compare(columns[field], value)
+
+        if op in CATEGORICAL_OPS:
+            self.categorical_fields.add(field)
+            value = when["value"]
+            if op == "==":
+                return lambda columns, n: np.fromiter((v == value for v in columns[field]), bool, n)
+            allowed = list(value)
+            return lambda columns, n: np.fromiter((v in allowed for v in columns[field]), bool, n)
+
+        raise ValueError(f"Unknown operator {op!r} in rule on {field}")
+
+    def _columns(self, rows):
+        """
+        Gather the referenced fields into column arrays. Rows with a
+        non-numeric value in a numeric field get an error message instead
+        """
+        errors = [None] * len(rows)
+        columns = {}
+        for field in self.numeric_fields:
+            values = np.zeros(len(rows), dtype=np.float64)
+            for i, data in enumerate(rows):
+                value = data.get(field, 0)
+                if isinstance(value, (int, float)):
+                    try:
+                        values[i] = value
+                    except OverflowError:
+                        if errors[i] is None:
+                            errors[i] = f"Invalid value for {field}: number out of range"
+                elif errors[i] is None:
+                    errors[i] = f"Invalid value for {field}: expected a number"
+            columns[field] = values
+        for field in self.categorical_fields:
+            columns[field] = [data.get(field) for data in rows]
+        return columns, errors
+
+    def evaluate(self, rows):
+        """
+        Evaluate every rule over a batch of applicant dicts. Returns a dict of
+        per-row arrays plus a list of per-row error messages (None if valid)
+        """
+        columns, errors = self._columns(rows)
+        return self._evaluate(columns, errors, len(rows))
+
+    def evaluate_variants(self, data, overrides, n):
+        """
+        Evaluate n variants of one applicant dict without building a dict
+        per variant: overrides maps numeric fields to length-n value arrays
+        and every other field keeps the applicant's value
+        """
+        base, errors = self._columns([data])
+        columns = {}
+        for field in self.numeric_fields:
+            columns[field] = overrides[field] if field in overrides else np.full(n, base[field][0])
+        for field in self.categorical_fields:
+            columns[field] = base[field] * n
+        return self._evaluate(columns, errors * n, n)
+
+    def _evaluate(self, columns, errors, n):
+        risk_score = np.zeros(n, dtype=np.int64)
+        for chain in self.risk_chains:
+            taken = np.zeros(n, dtype=bool)
+            for condition, points in chain:
+                hit = condition(columns, n) & ~taken
+                risk_score += points * hit
+                taken |= hit
+
+        # Assign each row to the first status band whose threshold it meets
+        band = np.full(n, len(self.statuses) - 1)
+        assigned = np.zeros(n, dtype=bool)
+        for i, status in enumerate(self.statuses[:-1]):
+            in_band = (risk_score >= status["min_risk"]) & ~assigned
+            band[in_band] = i
+            assigned |= in_band
+
+        probability = np.zeros(n, dtype=np.int64)
+        prediction = np.zeros(n, dtype=np.int64)
+        risk_level = np.empty(n, dtype=object)
+        for i, status in enumerate(self.statuses):
+            in_band = band == i
+            low, high = status["probability_range"]
+            probability[in_band] = np.clip(self.probability_base - risk_score[in_band], low, high)
+
+            prediction[in_band] = status["prediction"]
+            above = status.get("prediction_above_risk")
+            if above is not None:
+                prediction[in_band & (risk_score > above["risk"])] = above["prediction"]
+
+            risk_level[in_band] = status["risk_level"]
+            below = status.get("risk_level_below_risk")
+            if below is not None:
+                risk_level[in_band & (risk_score < below["risk"])] = below["risk_level"]
+
+        statuses = np.array([status["status"] for status in self.statuses], dtype=object)[band]
+
+        limit = self.credit_limit
+        round_to = limit["round_to"]
+        credit_limit = np.round(columns[limit["income_field"]] * limit["income_share"] / round_to) * round_to
+        credit_limit[statuses != limit["status"]] = 0
+
+        # Resolve first-match factor chains into one hit mask per rule
+        factors = []
+        for chain in self.factor_chains:
+            taken = np.zeros(n, dtype=bool)
+            for condition, positive, negative in chain:
+                hit = condition(columns, n) & ~taken
+                taken |= hit
+                factors.append((hit, positive, negative))
+
+        return {
+            "risk_score": risk_score,
+            "status": statuses,
+            "risk_level": risk_level,
+            "probability": probability,
+            "prediction": prediction,
+            "credit_limit": credit_limit,
+            "factors": factors,
+            "errors": errors
+        }
+
+    def format_batch(self, rows):
+        """
+        Evaluate a batch and build the frontend response for each row, or
+        {"error": ...} for rows that could not be evaluated
+        """
+        evaluation = self.evaluate(rows)
+        return [self.format_row(evaluation, i) for i in range(len(rows))]
+
+    @staticmethod
+    def format_row(evaluation, i):
+        """
+        The frontend response for row i of an evaluation
+        """
+        if evaluation["errors"][i] is not None:
+            return {"error": evaluation["errors"][i]}
+        probability = int(evaluation["probability"][i])
+        return {
+            "approvalStatus": evaluation["status"][i],
+            "probability": probability,
+            "riskLevel": evaluation["risk_level"][i],
+            "creditLimit": int(evaluation["credit_limit"][i]),
+            "positiveFactors": [positive for hit, positive, _ in evaluation["factors"] if positive and hit[i]],
+            "negativeFactors": [negative for hit, _, negative in evaluation["factors"] if negative and hit[i]],
+            "modelOutput": {
+                "prediction": int(evaluation["prediction"][i]),
+                "probabilities": [1 - (probability / 100), probability / 100],
+                "riskScore": int(evaluation["risk_score"][i])
+            }
+        }
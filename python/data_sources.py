@@ -0,0 +1,254 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# Label column in the credit approval data
+TARGET = "loan_status"
+
+def resolve_paths(source):
+    """
+    Expand a file, a directory of part files or a glob into a sorted list of
+    CSV/Parquet files
+    """
+    if os.path.isdir(source):
+        paths = [
+            os.path.join(source, name) for name in os.listdir(source)
+            if name.endswith((".csv", ".parquet"))
+        ]
+    else:
+        paths = glob.glob(source)
+    if not paths:
+        raise FileNotFoundError(f"No CSV or Parquet files found at {source}")
+    return sorted(paths)
+
+def iter_file_chunks(path, chunksize):
+    """
+    Yield DataFrames of at most chunksize rows from one CSV or Parquet file
+    """
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+def iter_chunks(source, chunksize=100000):
+    """
+    Stream every file of a source in order, chunk by chunk
+    """
+    for path in resolve_paths(source):
+        yield from iter_file_chunks(path, chunksize)
+
+def learn_vocabulary(source, chunksize=100000, target=TARGET):
+    """
+    First pass over a source: the numeric columns, the sorted levels of
+    each categorical column and the row count, so every chunk can be encoded
+    the same way. A column must have the same kind in every chunk where it
+    has values; otherwise its levels would depend on chunk order, so that
+    is an error
+    """
+    kinds = {}
+    levels = {}
+    rows = 0
+    for chunk in iter_chunks(source, chunksize):
+        rows += len(chunk)
+        X = chunk.drop(columns=[target])
+        for col in X.columns:
+            values = X[col].dropna()
+            if values.empty:
+                kinds.setdefault(col, None)
+                continue
+            kind = "numeric" if pd.api.types.is_numeric_dtype(values) else "categorical"
+            if kinds.get(col) not in (None, kind):
+                raise ValueError(
+                    f"Column {col} is {kinds[col]} in earlier rows but {kind} from row {rows - len(chunk)} "
+                    "on; fix or convert its values so it has one type throughout"
+                )
+            kinds[col] = kind
+            if kind == "categorical":
+                levels.setdefault(col, set()).update(values.astype(str).unique())
+    # Columns with no values anywhere are kept as numeric (encoded as 0)
+    return {
+        "numeric_columns": [col for col, kind in kinds.items() if kind != "categorical"],
+        "categorical_columns": list(levels),
+        "levels": {col: sorted(col_levels) for col, col_levels in levels.items()},
+        "rows": rows
+    }
+
+def optimize_dtypes(chunk, vocabulary):
+    """
+    Categorical columns become pandas categoricals over the vocabulary's
+    levels (so every chunk shares the same codes) and numeric columns are
+    downcast to the smallest dtype that holds them without loss
+    """
+    chunk = chunk.copy()
+    for col in vocabulary["categorical_columns"]:
+        if col in chunk:
+            levels = vocabulary["levels"][col]
+            chunk[col] = pd.Categorical(chunk[col].astype(str), categories=levels)
+    for col in chunk.columns:
+        if col not in vocabulary["numeric_columns"] and col != TARGET:
+            continue
+        if pd.api.types.is_integer_dtype(chunk[col]):
+            chunk[col] = pd.to_numeric(chunk[col], downcast="integer")
+        elif pd.api.types.is_float_dtype(chunk[col]):
+            # Only when float32 holds every value exactly, so encoding is unchanged
+            downcast = chunk[col].astype(np.float32)
+            if np.array_equal(downcast.to_numpy(np.float64), chunk[col].to_numpy(np.float64), equal_nan=True):
+                chunk[col] = downcast
+    return chunk
+
+def iter_typed_chunks(source, vocabulary, chunksize=100000):
+    """
+    Stream a source with categorical and downcast numeric dtypes
+    """
+    for chunk in iter_chunks(source, chunksize):
+        yield optimize_dtypes(chunk, vocabulary)
+
+class VocabularyEncoder:
+    """
+    One-hot encodes chunks against a fixed vocabulary, producing the same
+    columns, in the same order, as pd.get_dummies(drop_first=True) on the
+    full dataset: numeric columns first, then one column per non-first
+    (sorted) level of each categorical column
+    """
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        self.numeric_columns = vocabulary["numeric_columns"]
+        self.categorical_columns = vocabulary["categorical_columns"]
+        self.levels = vocabulary["levels"]
+        self.feature_names = list(self.numeric_columns) + [
+            f"{col}_{level}" for col in self.categorical_columns for level in self.levels[col][1:]
+        ]
+
+    @property
+    def column_info(self):
+        return {
+            "categorical_columns": list(self.categorical_columns),
+            "numeric_columns": list(self.numeric_columns)
+        }
+
+    def encode_array(self, X_raw, dtype=np.float64):
+        X = np.zeros((len(X_raw), len(self.feature_names)), dtype=dtype)
+        for i, col in enumerate(self.numeric_columns):
+            if col in X_raw:
+                X[:, i] = pd.to_numeric(X_raw[col], errors="coerce").fillna(0).to_numpy()
+        i = len(self.numeric_columns)
+        rows = np.arange(len(X_raw))
+        for col in self.categorical_columns:
+            n_dummies = len(self.levels[col]) - 1
+            if col in X_raw and isinstance(X_raw[col].dtype, pd.CategoricalDtype) \
+                    and list(X_raw[col].cat.categories) == self.levels[col]:
+                # Categorical codes index the dummy columns directly; code 0 is
+                # the dropped first level and -1 an unknown level
+                codes = X_raw[col].cat.codes.to_numpy()
+                present = codes > 0
+                X[rows[present], i + codes[present] - 1] = 1
+            elif col in X_raw:
+                values = X_raw[col].astype(str).to_numpy()
+                for j, level in enumerate(self.levels[col][1:]):
+                    X[:, i + j] = values == level
+            i += n_dummies
+        return X
+
+    def encode(self, X_raw, dtype=np.float64):
+        return pd.DataFrame(self.encode_array(X_raw, dtype), columns=self.feature_names, index=X_raw.index)
+
+# Bump when the encoding changes so cached matrices are rebuilt
+ENCODING_VERSION = 1
+
+def data_fingerprint(source):
+    """
+    Fingerprint of a source's files from their names, sizes and modification
+    times, so a repeat run can find its cache without reading the data
+    """
+    digest = hashlib.sha256()
+    for path in resolve_paths(source):
+        stat = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+class EncodedMatrixCache:
+    """
+    On-disk cache of one-hot encoded feature matrices and labels, stored as
+    .npy files and loaded memory-mapped, keyed by the data fingerprint and
+    the encoding version. Entries are written to a temporary directory and
+    renamed into place, so a partially written entry is never loaded
+    """
+
+    def __init__(self, cache_dir="data_cache", chunksize=100000, target=TARGET):
+        self.cache_dir = cache_dir
+        self.chunksize = chunksize
+        self.target = target
+
+    def key(self, source):
+        encoding = f"v{ENCODING_VERSION}|{self.target}|float64"
+        return hashlib.sha256(f"{data_fingerprint(source)}|{encoding}".encode()).hexdigest()[:16]
+
+    def load(self, source):
+        """
+        (X, y, metadata) for a source, building the cache entry on a miss. X
+        and y are read-only memmaps
+        """
+        entry = os.path.join(self.cache_dir, self.key(source))
+        if not os.path.exists(os.path.join(entry, "meta.json")):
+            print(f"Encoding {source} into {entry}...")
+            self.build(source, entry)
+        else:
+            print(f"Loading encoded matrix from {entry}")
+        with open(os.path.join(entry, "meta.json")) as f:
+            metadata = json.load(f)
+        X = np.load(os.path.join(entry, "X.npy"), mmap_mode="r")
+        y = np.load(os.path.join(entry, "y.npy"), mmap_mode="r")
+        return X, y, metadata
+
+    def load_frame(self, source):
+        """
+        The cached matrix as a DataFrame with the encoded column names (a
+        view over the memmap) and the labels as a Series
+        """
+        X, y, metadata = self.load(source)
+        return pd.DataFrame(X, columns=metadata["feature_names"], copy=False), pd.Series(y, name=self.target), metadata
+
+    def build(self, source, entry):
+        vocabulary = learn_vocabulary(source, self.chunksize, self.target)
+        encoder = VocabularyEncoder(vocabulary)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temporary = f"{entry}.tmp{os.getpid()}"
+        shutil.rmtree(temporary, ignore_errors=True)
+        os.makedirs(temporary)
+
+        rows = vocabulary["rows"]
+        X = np.lib.format.open_memmap(
+            os.path.join(temporary, "X.npy"), mode="w+", dtype=np.float64,
+            shape=(rows, len(encoder.feature_names))
+        )
+        labels = []
+        offset = 0
+        for chunk in iter_typed_chunks(source, vocabulary, self.chunksize):
+            X[offset:offset + len(chunk)] = encoder.encode_array(chunk.drop(columns=[self.target]))
+            labels.append(chunk[self.target].to_numpy())
+            offset += len(chunk)
+        X.flush()
+        del X
+        np.save(os.path.join(temporary, "y.npy"), np.concatenate(labels))
+
+        with open(os.path.join(temporary, "meta.json"), "w") as f:
+            json.dump({
+                "source": source,
+                "rows": rows,
+                "feature_names": encoder.feature_names,
+                "column_info": encoder.column_info,
+                "vocabulary": vocabulary
+            }, f, indent=2)
+
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(temporary, entry)
@@ -0,0 +1,300 @@
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Written next to the model by the exporter
+REFERENCE_PROFILE = "reference_profile.json"
+
+# Numeric features are binned at these quantiles of the training data
+REFERENCE_QUANTILES = tuple(q / 20 for q in range(1, 20))
+
+# Profiles need enough training rows for the quantiles to mean anything
+MIN_PROFILE_ROWS = 100
+
+# Categorical bucket for levels without a dummy column: the level dropped by
+# drop_first and any level unseen in training, which the model treats alike
+OTHER = "(other)"
+
+# Usual PSI reading: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+# Proportions are floored at this before taking logs in PSI
+PSI_EPSILON = 1e-4
+
+# Below this many live samples drift scores are reported as insufficient
+MIN_DRIFT_SAMPLES = 100
+
+def _number(value):
+    # Anything but a finite-as-float number counts as missing; ints too large
+    # for a float would overflow the float64 array
+    if type(value) is float or (type(value) is int and -sys.float_info.max <= value <= sys.float_info.max):
+        return value
+    return math.nan
+
+def build_reference_profile(X, column_info):
+    """
+    Training-time distribution of every model input, from the encoded
+    feature frame: bin edges at REFERENCE_QUANTILES and the share of rows per
+    bin for numeric columns, and the share per level (dummy column, or OTHER
+    for rows with none set) for categorical columns
+    """
+    profile = {"rows": len(X), "numeric": {}, "categorical": {}}
+    for col in column_info.get("numeric_columns", []):
+        if col not in X.columns:
+            continue
+        values = X[col].to_numpy(dtype=np.float64)
+        values = values[np.isfinite(values)]
+        edges = np.unique(np.quantile(values, REFERENCE_QUANTILES))
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        profile["numeric"][col] = {
+            "edges": edges.tolist(),
+            "proportions": (counts / len(values)).tolist()
+        }
+
+    for col in column_info.get("categorical_columns", []):
+        prefix = col + "_"
+        dummies = [name for name in X.columns if name.startswith(prefix)]
+        if not dummies:
+            continue
+        hits = X[dummies].to_numpy(dtype=np.float64)
+        proportions = {name[len(prefix):]: float(share) for name, share in zip(dummies, hits.mean(axis=0))}
+        proportions[OTHER] = float(np.mean(hits.sum(axis=1) == 0))
+        profile["categorical"][col] = {"proportions": proportions}
+    return profile
+
+def save_reference_profile(X, column_info, model_dir="ml_model"):
+    """
+    Write the reference profile the server's drift monitor compares against
+    """
+    if len(X) < MIN_PROFILE_ROWS:
+        print(f"Reference profile skipped: {len(X)} rows (at least {MIN_PROFILE_ROWS} needed)")
+        return None
+    path = os.path.join(model_dir, REFERENCE_PROFILE)
+    with open(path, "w") as f:
+        json.dump(build_reference_profile(X, column_info), f, indent=2)
+    print(f"Reference profile saved to {os.path.abspath(path)}")
+    return path
+
+def psi(expected, actual):
+    """
+    Population stability index between two proportion vectors
+    """
+    expected = np.maximum(np.asarray(expected, dtype=np.float64), PSI_EPSILON)
+    actual = np.maximum(np.asarray(actual, dtype=np.float64), PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+def drift_status(score, samples):
+    if samples < MIN_DRIFT_SAMPLES:
+        return "insufficient_data"
+    if score >= PSI_SIGNIFICANT:
+        return "significant"
+    if score >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+class Sketch:
+    """
+    Fixed-size counts per feature: one bin count per reference bin (plus
+    missing) for numeric features and one per reference level (plus OTHER)
+    for categoricals. Memory depends on the profile, not on traffic
+    """
+
+    def __init__(self, profile):
+        self.samples = 0
+        self.numeric = {
+            col: np.zeros(len(spec["edges"]) + 2, dtype=np.int64)  # last slot counts missing values
+            for col, spec in profile["numeric"].items()
+        }
+        self.categorical = {
+            col: np.zeros(len(spec["proportions"]), dtype=np.int64)
+            for col, spec in profile["categorical"].items()
+        }
+
+    def merge(self, other):
+        merged = Sketch.__new__(Sketch)
+        merged.samples = self.samples + other.samples
+        merged.numeric = {col: counts + other.numeric[col] for col, counts in self.numeric.items()}
+        merged.categorical = {col: counts + other.categorical[col] for col, counts in self.categorical.items()}
+        return merged
+
+class DriftMonitor:
+    """
+    Streams live applicants into per-feature sketches and scores them
+    against the model's reference profile.
+
+    Request threads only enqueue the applicant (a non-blocking put, dropped
+    and counted when the queue is full); a background thread folds queued
+    applicants into the sketches in vectorized batches. Besides the totals
+    since the model was loaded, counts are kept for the current and the
+    previous window of window_size applicants, so recent drift is visible
+    even after a long stable period. Each process keeps its own sketches
+    """
+
+    def __init__(self, profile, window_size=10000, max_queue=10000, batch_size=1024, flush_interval=0.5):
+        self.profile = profile
+        self.window_size = window_size
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.pid = None
+
+        # Bin lookups compiled once: numeric edges and level -> slot
+        self.edges = {col: np.asarray(spec["edges"]) for col, spec in profile["numeric"].items()}
+        self.levels = {
+            col: {level: i for i, level in enumerate(spec["proportions"])}
+            for col, spec in profile["categorical"].items()
+        }
+
+    def _start(self):
+        # Started lazily in the recording process, like AuditLog
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.queue = queue.Queue(self.max_queue)
+            self.dropped = 0
+            self.total = Sketch(self.profile)
+            self.current = Sketch(self.profile)
+            self.previous = None
+            thread = threading.Thread(target=self._run, name="drift-monitor", daemon=True)
+            thread.start()
+            self.pid = os.getpid()
+
+    def record(self, data):
+        """
+        Queue one applicant dict; never blocks
+        """
+        if self.pid != os.getpid():
+            self._start()
+        try:
+            self.queue.put_nowait(data)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            # None is the stop signal from close()
+            stop = None in batch
+            batch = [row for row in batch if row is not None]
+            if batch:
+                try:
+                    self._update(batch)
+                except Exception as e:
+                    # Losing one batch beats losing the monitor
+                    print(f"Drift monitor update failed: {str(e)}")
+            if stop:
+                return
+            # Once caught up, let requests accumulate so most updates are
+            # vectorized batches; a backlog is drained without pausing
+            if self.queue.empty():
+                time.sleep(self.flush_interval)
+
+    def close(self):
+        """
+        Stop the background thread, e.g. when a new model replaces this one
+        """
+        if self.pid == os.getpid():
+            self.queue.put(None)
+            self.pid = None
+
+    def _counts(self, rows):
+        """
+        Per-feature bin counts of a batch of applicant dicts
+        """
+        n = len(rows)
+        numeric = {}
+        for col, edges in self.edges.items():
+            values = np.fromiter((_number(row.get(col)) for row in rows), np.float64, n)
+            missing = ~np.isfinite(values)
+            counts = np.bincount(np.searchsorted(edges, values[~missing], side="right"), minlength=len(edges) + 2)
+            counts[-1] = missing.sum()
+            numeric[col] = counts
+        categorical = {}
+        for col, levels in self.levels.items():
+            other = levels[OTHER]
+            # Non-string values (possibly unhashable) count as OTHER, like unseen levels
+            slots = np.fromiter(
+                (levels.get(v, other) if type(v) is str else other for v in (row.get(col) for row in rows)),
+                np.int64, n
+            )
+            categorical[col] = np.bincount(slots, minlength=len(levels))
+        return numeric, categorical
+
+    def _update(self, rows):
+        numeric, categorical = self._counts(rows)
+        with self.lock:
+            for sketch in (self.total, self.current):
+                sketch.samples += len(rows)
+                for col, counts in numeric.items():
+                    sketch.numeric[col] += counts
+                for col, counts in categorical.items():
+                    sketch.categorical[col] += counts
+            if self.current.samples >= self.window_size:
+                self.previous = self.current
+                self.current = Sketch(self.profile)
+
+    def _scores(self, sketch):
+        features = {}
+        for col, spec in self.profile["numeric"].items():
+            counts = sketch.numeric[col]
+            observed = counts[:-1].sum()
+            expected = np.asarray(spec["proportions"])
+            actual = counts[:-1] / observed if observed else np.zeros_like(expected)
+            score = psi(expected, actual) if observed else 0.0
+            features[col] = {
+                "type": "numeric",
+                "psi": round(score, 6),
+                # KS statistic between the binned CDFs, evaluated at the reference quantiles
+                "ks": round(float(np.abs(np.cumsum(actual) - np.cumsum(expected)).max()), 6) if observed else 0.0,
+                "missingRate": round(float(counts[-1] / sketch.samples), 6) if sketch.samples else 0.0,
+                "status": drift_status(score, observed)
+            }
+        for col, spec in self.profile["categorical"].items():
+            counts = sketch.categorical[col]
+            expected = np.asarray(list(spec["proportions"].values()))
+            actual = counts / sketch.samples if sketch.samples else np.zeros_like(expected)
+            score = psi(expected, actual) if sketch.samples else 0.0
+            features[col] = {
+                "type": "categorical",
+                "psi": round(score, 6),
+                "proportions": dict(zip(spec["proportions"], np.round(actual, 6).tolist())),
+                "status": drift_status(score, sketch.samples)
+            }
+        return features
+
+    def report(self):
+        """
+        Drift scores per feature since the model was loaded ("total") and
+        over the last one to two windows ("recent")
+        """
+        if self.pid != os.getpid():
+            return {"samples": 0, "recentSamples": 0, "dropped": 0, "queued": 0,
+                    "referenceRows": self.profile["rows"], "total": {}, "recent": {}}
+        with self.lock:
+            # Copies, since the background thread updates the counts in place
+            total = self.total.merge(Sketch(self.profile))
+            recent = self.current.merge(self.previous or Sketch(self.profile))
+            dropped = self.dropped
+        return {
+            "samples": total.samples,
+            "recentSamples": recent.samples,
+            "dropped": dropped,
+            "queued": self.queue.qsize(),
+            "referenceRows": self.profile["rows"],
+            "total": self._scores(total),
+            "recent": self._scores(recent)
+        }
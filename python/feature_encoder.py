@@ -0,0 +1,140 @@
+import sys
+
+import numpy as np
+
+# Largest magnitude a numeric field may have; larger ints cannot be stored as float64
+MAX_NUMERIC = sys.float_info.max
+
+class FeatureEncoder:
+    """
+    One-hot encoder compiled once from feature_names.pkl / column_info.pkl.
+
+    Produces the same matrix as pd.get_dummies(drop_first=True) followed by a
+    reindex on the training feature names, but writes straight into a
+    preallocated float array instead of building DataFrames per request.
+    """
+
+    def __init__(self, feature_names, column_info=None):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        column_index = {name: i for i, name in enumerate(self.feature_names)}
+
+        column_info = column_info or {}
+        self.categorical_columns = list(column_info.get("categorical_columns", []))
+        numeric_columns = column_info.get("numeric_columns")
+        if numeric_columns is None:
+            # Without column info every non-dummy training column is numeric
+            numeric_columns = [
+                name for name in self.feature_names
+                if not any(name.startswith(col + "_") for col in self.categorical_columns)
+            ]
+
+        # (input field, output position) for numeric columns present in training
+        self.numeric_positions = [
+            (col, column_index[col]) for col in numeric_columns if col in column_index
+        ]
+
+        # input field -> {category value -> output position}; the dropped
+        # (first) level and unseen values have no entry and stay all-zero
+        self.category_positions = {}
+        for col in self.categorical_columns:
+            prefix = col + "_"
+            self.category_positions[col] = {
+                name[len(prefix):]: i
+                for name, i in column_index.items()
+                if name.startswith(prefix)
+            }
+
+    def encode(self, data, out=None):
+        """
+        Encode a single applicant dict into a (1, n_features) float array
+        """
+        if out is None:
+            out = np.zeros((1, self.n_features), dtype=np.float64)
+        else:
+            out.fill(0.0)
+        self._encode_row(data, out[0])
+        return out
+
+    def encode_batch(self, rows, out=None):
+        """
+        Encode a list of applicant dicts into an (n_rows, n_features) float array
+        """
+        if out is None:
+            out = np.zeros((len(rows), self.n_features), dtype=np.float64)
+        else:
+            out.fill(0.0)
+        for row, data in zip(out, rows):
+            self._encode_row(data, row)
+        return out
+
+    def encode_variants(self, data, overrides, n):
+        """
+        Encode n variants of one applicant into an (n, n_features) array: the
+        applicant is encoded once and overrides maps numeric fields to
+        length-n value arrays written over its columns
+        """
+        out = np.repeat(self.encode(data), n, axis=0)
+        positions = dict(self.numeric_positions)
+        for col, values in overrides.items():
+            if col in positions:
+                out[:, positions[col]] = values
+        return out
+
+    def validate(self, data):
+        """
+        Error message for an applicant dict the encoder cannot encode, or
+        None: a categorical field that is not a string, or an int too large
+        for a float. Callers check rows first so one bad row is reported on
+        its own instead of failing a whole batch
+        """
+        for col, _ in self.numeric_positions:
+            value = data.get(col)
+            if isinstance(value, int) and not -MAX_NUMERIC <= value <= MAX_NUMERIC:
+                return f"Invalid value for {col}: number out of range"
+        for col in self.category_positions:
+            value = data.get(col)
+            if value is not None and not isinstance(value, str):
+                return f"Invalid value for {col}: expected a string"
+        return None
+
+    def _encode_row(self, data, row):
+        for col, i in self.numeric_positions:
+            value = data.get(col, 0)
+            # Non-numeric values are one-hot encoded and then dropped by pandas,
+            # which leaves the training column at 0
+            if isinstance(value, (int, float)):
+                row[i] = value
+        for col, positions in self.category_positions.items():
+            i = positions.get(data.get(col, "Unknown"))
+            if i is not None:
+                row[i] = 1.0
+
+
+def encode_with_pandas(rows, feature_names, column_info):
+    """
+    Reference pandas encoding, matching the export scripts: every categorical
+    column carries its full training vocabulary so drop_first drops the same
+    level it did at training time
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(rows)
+    numeric_columns = column_info.get("numeric_columns", [])
+    for col in numeric_columns:
+        if col not in df.columns:
+            df[col] = 0
+        df[col] = df[col].map(lambda v: v if isinstance(v, (int, float)) else 0).fillna(0)
+
+    for col in column_info.get("categorical_columns", []):
+        prefix = col + "_"
+        levels = [name[len(prefix):] for name in feature_names if name.startswith(prefix)]
+        # The dropped reference level never appears in feature_names, so add
+        # a placeholder first level for drop_first to remove
+        categories = ["\0reference"] + levels
+        values = df[col] if col in df.columns else pd.Series("Unknown", index=df.index)
+        df[col] = pd.Categorical(values.where(values.isin(levels)), categories=categories)
+
+    encoded = pd.get_dummies(df, drop_first=True)
+    return encoded.reindex(columns=feature_names, fill_value=0).astype(np.float64).values
+
@@ -0,0 +1,223 @@
+import itertools
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+from model_training import build_model
+
+# Defaults for the search grid; gamma "scale" is SVC's own default
+DEFAULT_C = (0.1, 1.0, 10.0, 100.0)
+DEFAULT_GAMMA = ("scale", 0.01, 0.1, 1.0)
+DEFAULT_CLASS_WEIGHT = (None, "balanced")
+
+# Successive halving: each round keeps the best 1/HALVING_FACTOR candidates
+# and gives them HALVING_FACTOR times as many training rows
+HALVING_FACTOR = 3
+MIN_TRAINING_ROWS = 500
+
+# Set in each worker by load_shared(): the memory-mapped matrix and the folds
+shared = {}
+
+def parse_grid_values(text, parse=float):
+    """
+    "0.1,1,scale,none" -> [0.1, 1.0, "scale", None]
+    """
+    values = []
+    for item in text.split(","):
+        item = item.strip()
+        if item.lower() == "none":
+            values.append(None)
+        else:
+            try:
+                values.append(parse(item))
+            except ValueError:
+                values.append(item)
+    return values
+
+def candidate_grid(C=DEFAULT_C, gamma=DEFAULT_GAMMA, class_weight=DEFAULT_CLASS_WEIGHT):
+    return [
+        {"C": c, "gamma": g, "class_weight": w}
+        for c, g, w in itertools.product(C, gamma, class_weight)
+    ]
+
+def load_shared(x_path, y_path, rows_path, n_folds, random_state):
+    """
+    Pool initializer: every worker memory-maps the same read-only matrix, so
+    the data is shared through the page cache instead of pickled per task.
+    Folds are over the matrix rows listed in rows_path
+    """
+    X = np.load(x_path, mmap_mode="r")
+    y = np.load(y_path, mmap_mode="r")
+    rows = np.load(rows_path)
+    folds = StratifiedKFold(n_folds, shuffle=True, random_state=random_state).split(rows, y[rows])
+    # Shuffle each fold's training rows once; a round with a row budget
+    # trains on a prefix, so larger budgets extend smaller ones
+    rng = np.random.default_rng(random_state)
+    folds = [(rows[rng.permutation(train)], rows[test]) for train, test in folds]
+    shared.update(X=X, y=y, folds=folds)
+
+def score_candidate(params, n_rows):
+    """
+    Mean k-fold AUC of one candidate trained on at most n_rows rows per fold
+    """
+    X, y = shared["X"], shared["y"]
+    scores, fit_seconds, support_vectors = [], [], []
+    for train, test in shared["folds"]:
+        train = np.sort(train[:n_rows])
+        model = build_model("svc")
+        # Decision values rank as well as Platt probabilities for AUC, and
+        # skip the internal 5-fold calibration probability=True runs
+        model.set_params(svm__probability=False, **{f"svm__{key}": value for key, value in params.items()})
+        start = time.perf_counter()
+        model.fit(X[train], y[train])
+        fit_seconds.append(time.perf_counter() - start)
+        scores.append(roc_auc_score(y[test], model.decision_function(X[test])))
+        support_vectors.append(model.named_steps["svm"].support_vectors_.shape[0])
+    return {
+        "auc": float(np.mean(scores)),
+        "auc_std": float(np.std(scores)),
+        "fit_seconds": float(np.mean(fit_seconds)),
+        "support_vectors": float(np.mean(support_vectors)),
+        "rows": int(min(n_rows, len(shared["folds"][0][0])))
+    }
+
+def shared_matrix_paths(X, y, rows, scratch_dir):
+    """
+    .npy paths the workers can memory-map. A matrix already loaded from the
+    encoded-matrix cache is reused in place; anything else is written once
+    to scratch_dir
+    """
+    X = X.to_numpy() if hasattr(X, "to_numpy") else X
+    X_base = X
+    while getattr(X_base, "base", None) is not None and not isinstance(X_base, np.memmap):
+        X_base = X_base.base
+    if isinstance(X_base, np.memmap) and X_base.shape == np.shape(X) and X_base.filename:
+        x_path = X_base.filename
+    else:
+        x_path = os.path.join(scratch_dir, "X.npy")
+        np.save(x_path, np.asarray(X, dtype=np.float64))
+    y_path = os.path.join(scratch_dir, "y.npy")
+    np.save(y_path, np.asarray(y))
+    rows_path = os.path.join(scratch_dir, "rows.npy")
+    np.save(rows_path, np.arange(len(y)) if rows is None else np.asarray(rows))
+    return x_path, y_path, rows_path
+
+def successive_halving(X, y, candidates, rows=None, n_folds=5, workers=None, random_state=42,
+                       min_rows=MIN_TRAINING_ROWS, factor=HALVING_FACTOR):
+    """
+    Cross-validate candidates in parallel on the given rows of X (all rows by
+    default), dropping all but the best 1/factor after each round while
+    multiplying the training rows by factor. Returns one result per
+    candidate (from its last round), best first
+    """
+    scratch_dir = tempfile.mkdtemp(prefix="svm_search_")
+    try:
+        x_path, y_path, rows_path = shared_matrix_paths(X, y, rows, scratch_dir)
+        n_samples = len(y) if rows is None else len(rows)
+        train_rows = n_samples - n_samples // n_folds
+
+        # Enough rounds that the last one trains on every row
+        rounds = 1
+        while len(candidates) > factor ** (rounds - 1) and min_rows * factor ** (rounds - 1) < train_rows:
+            rounds += 1
+
+        results = {}
+        survivors = list(range(len(candidates)))
+        with ProcessPoolExecutor(workers, initializer=load_shared,
+                                 initargs=(x_path, y_path, rows_path, n_folds, random_state)) as pool:
+            for round_index in range(rounds):
+                last = round_index == rounds - 1
+                n_rows = train_rows if last else min(train_rows, min_rows * factor ** round_index)
+                print(f"Round {round_index + 1}/{rounds}: {len(survivors)} candidates on {n_rows} rows per fold")
+                futures = {i: pool.submit(score_candidate, candidates[i], n_rows) for i in survivors}
+                for i, future in futures.items():
+                    results[i] = {**candidates[i], **future.result(), "round": round_index + 1}
+                survivors.sort(key=lambda i: results[i]["auc"], reverse=True)
+                if not last:
+                    survivors = survivors[:max(1, len(survivors) // factor)]
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    # Candidates that reached later rounds rank first, then by score
+    return sorted(results.values(), key=lambda r: (r["round"], r["auc"]), reverse=True)
+
+def print_results(results):
+    """
+    Print the search results table: score vs fit time vs support vectors
+    """
+    columns = ["C", "gamma", "class_weight", "round", "rows", "auc", "auc_std", "fit_seconds", "support_vectors"]
+    print("".join(f"{column:>16}" for column in columns))
+    for result in results:
+        cells = []
+        for column in columns:
+            value = result[column]
+            cells.append(f"{value:>16.4f}" if isinstance(value, float) else f"{str(value):>16}")
+        print("".join(cells))
+
+def search_and_fit(X, y, train_rows, candidates, n_folds=5, workers=None):
+    """
+    Run the search on the training rows of X, then refit the winner (with
+    probability estimates) on all of them
+    """
+    start = time.perf_counter()
+    results = successive_halving(X, y, candidates, train_rows, n_folds, workers)
+    search_seconds = time.perf_counter() - start
+    print_results(results)
+
+    best = {key: results[0][key] for key in ("C", "gamma", "class_weight")}
+    print(f"Best parameters: {best} (search took {search_seconds:.1f}s)")
+    model = build_model("svc")
+    model.set_params(**{f"svm__{key}": value for key, value in best.items()})
+    start = time.perf_counter()
+    model.fit(X.iloc[train_rows] if hasattr(X, "iloc") else X[train_rows], np.asarray(y)[train_rows])
+    return model, {
+        "best": best,
+        "results": results,
+        "search_seconds": search_seconds,
+        "refit_seconds": time.perf_counter() - start
+    }
+
+def run_search(X, y, candidates, n_folds=5, workers=None):
+    """
+    Search on the same 80/20 split the export scripts use, and evaluate the
+    refitted winner on the held-out 20%. Returns the model, its report in
+    the export_report.json format and the search results
+    """
+    from sklearn.model_selection import train_test_split
+    from model_training import evaluate_model
+
+    y = np.asarray(y)
+    # Splitting row numbers rather than X keeps a memory-mapped X shared
+    train_rows, test_rows = train_test_split(
+        np.arange(len(y)), test_size=0.2, random_state=42, stratify=y
+    )
+    model, search = search_and_fit(X, y, train_rows, candidates, n_folds, workers)
+    X_test = X.iloc[test_rows] if hasattr(X, "iloc") else X[test_rows]
+    report = {"svc": {
+        **evaluate_model(model, X_test, y[test_rows]),
+        "fit_seconds": search["refit_seconds"],
+        "support_vectors": int(model.named_steps["svm"].support_vectors_.shape[0])
+    }}
+    return model, report, search
+
+def add_search_arguments(parser):
+    parser.add_argument("--search", action="store_true",
+                        help="Tune C, gamma and class_weight with cross-validated successive halving")
+    parser.add_argument("--C", default=",".join(str(c) for c in DEFAULT_C))
+    parser.add_argument("--gamma", default=",".join(str(g) for g in DEFAULT_GAMMA))
+    parser.add_argument("--class-weight", default=",".join(str(w).lower() for w in DEFAULT_CLASS_WEIGHT))
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None, help="Search processes (default: CPU count)")
+
+def candidates_from_args(args):
+    return candidate_grid(
+        parse_grid_values(args.C),
+        parse_grid_values(args.gamma),
+        parse_grid_values(args.class_weight, parse=str)
+    )
@@ -0,0 +1,240 @@
+import argparse
+import os
+import pickle
+import resource
+import time
+
+import numpy as np
+from sklearn.kernel_approximation import RBFSampler
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from data_sources import TARGET, data_fingerprint, iter_chunks, iter_typed_chunks, learn_vocabulary, VocabularyEncoder
+from model_training import save_artifacts, write_report
+
+# Every HOLDOUT_EVERY-th row (by position in the source) is held out for evaluation
+HOLDOUT_EVERY = 10
+
+class IncrementalTrainer:
+    """
+    Out-of-core training: streams a CSV/Parquet source chunk by chunk so
+    peak memory is bounded by the chunk size, not the dataset size.
+
+    1. learn the category vocabulary (first pass)
+    2. fit the scaler with partial_fit (second pass)
+    3. fit an SGD logistic-regression classifier on a random Fourier
+       approximation of the RBF kernel, for a number of epochs
+
+    State is checkpointed after every chunk, so an interrupted run resumes
+    from the last completed chunk. A checkpoint is only resumed by a run on
+    the same data, columns and hyperparameters.
+    """
+
+    def __init__(self, source, chunksize=100000, epochs=3, n_components=500,
+                 alpha=1e-4, random_state=42, checkpoint_path=None):
+        self.source = source
+        self.chunksize = chunksize
+        self.epochs = epochs
+        self.checkpoint_path = checkpoint_path
+        self.state = {
+            "stage": "vocabulary",
+            "epoch": 0,
+            "chunks_done": 0,
+            "vocabulary": None,
+            "scaler": StandardScaler(),
+            "feature_map": None,
+            "n_components": n_components,
+            "random_state": random_state,
+            "classifier": SGDClassifier(loss="log_loss", alpha=alpha, random_state=random_state),
+            "classes": set(),
+            "rows_seen": 0,
+            "fingerprint": self.fingerprint(n_components, alpha, random_state)
+        }
+
+    def fingerprint(self, n_components, alpha, random_state):
+        """
+        What a checkpoint must match to be resumed: the source files, their
+        columns, and every setting that changes the chunks or the fitted
+        model. The epoch count is left out, so a run can be resumed with
+        more epochs
+        """
+        return {
+            "source": data_fingerprint(self.source),
+            "columns": list(next(iter_chunks(self.source, 1)).columns),
+            "target": TARGET,
+            "chunksize": self.chunksize,
+            "holdout_every": HOLDOUT_EVERY,
+            "n_components": n_components,
+            "alpha": alpha,
+            "random_state": random_state
+        }
+
+    def load_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "rb") as f:
+                state = pickle.load(f)
+            if state.get("fingerprint") != self.state["fingerprint"]:
+                raise ValueError(
+                    f"{self.checkpoint_path} is a checkpoint of a different run "
+                    "(source, columns or hyperparameters changed); remove it to start over"
+                )
+            self.state = state
+            print(f"Resuming from checkpoint: stage={self.state['stage']}, "
+                  f"epoch={self.state['epoch']}, chunks done={self.state['chunks_done']}")
+
+    def save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        # Write then rename so an interruption never leaves a torn checkpoint
+        temporary = self.checkpoint_path + ".tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump(self.state, f)
+        os.replace(temporary, self.checkpoint_path)
+
+    def chunks(self):
+        """
+        Yield (chunk index, encoded features, labels, holdout mask), skipping
+        chunks already processed in the current stage
+        """
+        encoder = VocabularyEncoder(self.state["vocabulary"])
+        offset = 0
+        chunks = iter_typed_chunks(self.source, self.state["vocabulary"], self.chunksize)
+        for index, chunk in enumerate(chunks):
+            rows = np.arange(offset, offset + len(chunk))
+            offset += len(chunk)
+            if index < self.state["chunks_done"]:
+                continue
+            X = encoder.encode(chunk.drop(columns=[TARGET]))
+            y = chunk[TARGET].to_numpy()
+            yield index, X, y, rows % HOLDOUT_EVERY == 0
+
+    def advance(self, stage):
+        self.state["stage"] = stage
+        self.state["chunks_done"] = 0
+        self.save_checkpoint()
+
+    def fit(self):
+        state = self.state
+
+        if state["stage"] == "vocabulary":
+            print("Pass 1: learning category vocabulary...")
+            state["vocabulary"] = learn_vocabulary(self.source, self.chunksize)
+            self.advance("scaler")
+
+        if state["stage"] == "scaler":
+            print("Pass 2: fitting scaler...")
+            for index, X, y, holdout in self.chunks():
+                state["scaler"].partial_fit(X[~holdout])
+                state["classes"].update(np.unique(y).tolist())
+                state["chunks_done"] = index + 1
+                self.save_checkpoint()
+            n_features = len(VocabularyEncoder(state["vocabulary"]).feature_names)
+            # Random Fourier features for SVC's gamma="scale" on standardised data
+            state["feature_map"] = RBFSampler(
+                gamma=1.0 / n_features,
+                n_components=state["n_components"],
+                random_state=state["random_state"]
+            ).fit(np.zeros((1, n_features)))
+            self.advance("train")
+
+        while state["stage"] == "train" and state["epoch"] < self.epochs:
+            print(f"Epoch {state['epoch'] + 1}/{self.epochs}...")
+            for index, X, y, holdout in self.chunks():
+                Z = state["feature_map"].transform(state["scaler"].transform(X[~holdout]))
+                labels = y[~holdout]
+                # Shuffle within the chunk, seeded per (epoch, chunk) so resumed runs match
+                rng = np.random.default_rng([state["random_state"], state["epoch"], index])
+                order = rng.permutation(len(labels))
+                state["classifier"].partial_fit(Z[order], labels[order], classes=np.array(sorted(state["classes"])))
+                state["rows_seen"] += len(labels)
+                state["chunks_done"] = index + 1
+                self.save_checkpoint()
+            state["epoch"] += 1
+            state["chunks_done"] = 0
+            self.save_checkpoint()
+
+        state["stage"] = "done"
+        self.save_checkpoint()
+        return self.model()
+
+    def model(self):
+        """
+        The fitted steps as one pipeline with the usual predict/predict_proba
+        """
+        return Pipeline([
+            ("scaler", self.state["scaler"]),
+            ("features", self.state["feature_map"]),
+            ("classifier", self.state["classifier"])
+        ])
+
+    def evaluate(self, model):
+        """
+        Accuracy and AUC on the held-out rows, streamed chunk by chunk
+        """
+        self.state["chunks_done"] = 0
+        scores = []
+        labels = []
+        for index, X, y, holdout in self.chunks():
+            if holdout.any():
+                scores.append(model.predict_proba(X[holdout])[:, 1])
+                labels.append(y[holdout])
+        scores = np.concatenate(scores)
+        labels = np.concatenate(labels)
+        return {
+            "accuracy": float(accuracy_score(labels, scores >= 0.5)),
+            "auc": float(roc_auc_score(labels, scores)),
+            "holdout_rows": int(len(labels))
+        }
+
+    def sample(self):
+        """
+        First encoded row, saved as sample_input.pkl for the server's checks
+        """
+        encoder = VocabularyEncoder(self.state["vocabulary"])
+        chunk = next(iter_chunks(self.source, 1))
+        return encoder.encode(chunk.drop(columns=[TARGET]))
+
+def peak_memory_mb():
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def train_incremental(source, model_dir="ml_model", chunksize=100000, epochs=3,
+                      n_components=500, checkpoint_path=None):
+    start = time.perf_counter()
+    trainer = IncrementalTrainer(source, chunksize, epochs, n_components, checkpoint_path=checkpoint_path)
+    trainer.load_checkpoint()
+    model = trainer.fit()
+
+    print("Evaluating on held-out rows...")
+    report = {"incremental": {
+        **trainer.evaluate(model),
+        "rows_trained": trainer.state["rows_seen"],
+        "fit_seconds": time.perf_counter() - start,
+        "peak_memory_mb": peak_memory_mb()
+    }}
+    print(report)
+
+    print("Saving model and feature information...")
+    encoder = VocabularyEncoder(trainer.state["vocabulary"])
+    save_artifacts(model, trainer.sample(), encoder.column_info, model_dir)
+    write_report(report, model_dir)
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return model
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train out of core on CSV/Parquet data too large for memory")
+    parser.add_argument("source", help="CSV/Parquet file, directory of part files, or glob")
+    parser.add_argument("--model-dir", default="ml_model")
+    parser.add_argument("--chunksize", type=int, default=100000)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--components", type=int, default=500)
+    parser.add_argument("--checkpoint", default="incremental_checkpoint.pkl",
+                        help="Checkpoint file used to resume an interrupted run")
+    args = parser.parse_args()
+
+    train_incremental(args.source, args.model_dir, args.chunksize, args.epochs,
+                      args.components, args.checkpoint)
@@ -0,0 +1,247 @@
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from synthetic_data import generate_applicants
+
+# Header set by app/api/predict/route.ts: "model", "rules" (degraded by the
+# ML server's admission control) or "fallback"
+SOURCE_HEADER = "X-Prediction-Source"
+
+def parse_stages(text):
+    """
+    "50:30,50-200:60" -> [(50, 50, 30), (50, 200, 60)]: requests/sec at the
+    start and end of each stage (linear ramp) and its duration in seconds
+    """
+    stages = []
+    for item in text.split(","):
+        rates, seconds = item.split(":")
+        start_rate, _, end_rate = rates.partition("-")
+        stages.append((float(start_rate), float(end_rate or start_rate), float(seconds)))
+    return stages
+
+def arrival_times(stages, poisson=False, seed=42):
+    """
+    Scheduled send times (seconds from the start) and stage index of every
+    request. The k-th request of a stage is sent when the integrated rate
+    reaches k, so ramps (including ones from 0 rps) get the right count at
+    every point. With poisson, the integrated gaps are exponential instead
+    """
+    rng = np.random.default_rng(seed)
+    times, stage_of = [], []
+    offset = 0.0
+    for index, (start_rate, end_rate, seconds) in enumerate(stages):
+        # Requests expected by time t: start_rate * t + slope * t^2
+        slope = (end_rate - start_rate) / (2 * seconds)
+        total = start_rate * seconds + slope * seconds ** 2
+        count = 0.0
+        while True:
+            count += rng.exponential() if poisson else 1.0
+            if count >= total:
+                break
+            # Root of slope * t^2 + start_rate * t = count, in a form that
+            # also holds for a constant rate (slope 0)
+            t = 2 * count / (start_rate + np.sqrt(start_rate ** 2 + 4 * slope * count))
+            times.append(offset + t)
+            stage_of.append(index)
+        offset += seconds
+    return times, stage_of
+
+def applicant_mix(n, seed=42):
+    """
+    Realistic applicants (the notebook distributions) as JSON bodies, with
+    loan_percent_income in percent as the frontend sends it
+    """
+    df = generate_applicants(n, np.random.default_rng(seed)).drop(columns=["loan_status"])
+    df["loan_percent_income"] = (df["loan_percent_income"] * 100).round(1)
+    return [json.dumps(row).encode() for row in df.to_dict("records")]
+
+class Client:
+    """
+    One keep-alive HTTP connection per thread, reopened when the server
+    closes it
+    """
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path or "/"
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def post(self, body):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request("POST", self.path, body, {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()
+            if response.will_close:
+                connection.close()
+                self.local.connection = None
+            return response.status, response.getheader(SOURCE_HEADER)
+        except Exception:
+            connection.close()
+            self.local.connection = None
+            raise
+
+def run_load(url, stages, poisson=False, max_inflight=256, timeout=10.0, seed=42):
+    """
+    Open-loop load: requests are sent on a fixed schedule whether or not
+    earlier ones have finished, and latency is measured from the scheduled
+    send time, so queueing anywhere (including in this client) is counted
+    """
+    times, stage_of = arrival_times(stages, poisson, seed)
+    bodies = applicant_mix(min(len(times), 10000) or 1, seed)
+    client = Client(url, timeout)
+
+    results = [None] * len(times)
+    inflight = threading.Semaphore(max_inflight)
+
+    def send(i, scheduled):
+        try:
+            status, source = client.post(bodies[i % len(bodies)])
+            results[i] = (time.perf_counter() - scheduled, status, source)
+        except Exception as e:
+            results[i] = (time.perf_counter() - scheduled, None, type(e).__name__)
+        finally:
+            inflight.release()
+
+    print(f"Sending {len(times)} requests to {url} over {sum(s[2] for s in stages):.0f}s")
+    with ThreadPoolExecutor(max_inflight) as pool:
+        start = time.perf_counter()
+        for i, offset in enumerate(times):
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            # If the client itself is saturated the request is dropped and
+            # reported, rather than silently delaying the schedule
+            if not inflight.acquire(blocking=False):
+                results[i] = (None, None, "dropped")
+                continue
+            pool.submit(send, i, scheduled)
+    return summarize(results, stage_of, stages)
+
+def latency_summary(latencies):
+    if not latencies:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    values = np.array(latencies) * 1000
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max())
+    }
+
+def summarize(results, stage_of, stages):
+    """
+    Per-stage and overall latency, throughput, error, fallback and degraded
+    (rules-only) rates.
+    Each result is (latency, HTTP status, source header) or, for requests
+    that failed or were dropped, (latency or None, None, reason)
+    """
+    groups = [
+        (f"stage {index + 1}", [r for r, s in zip(results, stage_of) if s == index], seconds, [start_rate, end_rate])
+        for index, (start_rate, end_rate, seconds) in enumerate(stages)
+    ]
+    groups.append(("total", results, sum(stage[2] for stage in stages), None))
+
+    report = {"stages": []}
+    for label, group, seconds, rates in groups:
+        ok = [latency for latency, status, _ in group if status is not None and 200 <= status < 300]
+        errors = sum(1 for latency, status, _ in group if latency is not None and (status is None or status >= 300))
+        dropped = sum(1 for _, _, source in group if source == "dropped")
+        fallbacks = sum(1 for _, status, source in group if status is not None and source == "fallback")
+        degraded = sum(1 for _, status, source in group if status is not None and source == "rules")
+        sent = len(group) - dropped
+        report["stages"].append({
+            "stage": label,
+            "offered_rps": rates,
+            "sent": sent,
+            "succeeded": len(ok),
+            "errors": errors,
+            "dropped": dropped,
+            "error_rate": errors / sent if sent else 0.0,
+            "fallbacks": fallbacks,
+            "fallback_rate": fallbacks / len(ok) if ok else 0.0,
+            "degraded": degraded,
+            "degraded_rate": degraded / len(ok) if ok else 0.0,
+            "throughput_rps": len(ok) / seconds if seconds else 0.0,
+            **latency_summary(ok)
+        })
+    return report
+
+def print_report(report):
+    columns = ["sent", "succeeded", "error_rate", "fallback_rate", "degraded_rate", "dropped", "throughput_rps",
+               "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    print(f"{'stage':<10}" + "".join(f"{column:>15}" for column in columns))
+    for stage in report["stages"]:
+        cells = []
+        for column in columns:
+            value = stage[column]
+            cells.append(f"{value:>15.3f}" if isinstance(value, float) else f"{str(value):>15}")
+        print(f"{stage['stage']:<10}" + "".join(cells))
+
+def start_server(port, workers):
+    """
+    Start serve.py on port and wait for /health
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(here, "serve.py"), "--port", str(port), "--workers", str(workers)]
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if process.poll() is not None:
+            sys.exit("serve.py exited before becoming healthy")
+        try:
+            connection = http.client.HTTPConnection("localhost", port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    sys.exit("serve.py did not become healthy in time")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Open-loop load test of /predict or the Next.js /api/predict route")
+    parser.add_argument("--url", default="http://localhost:8000/predict",
+                        help="Target, e.g. http://localhost:3000/api/predict for the Next.js route")
+    parser.add_argument("--stages", default="20:10,20-100:30,100:20",
+                        help="Comma-separated RATE:SECONDS or START-END:SECONDS (linear ramp) stages")
+    parser.add_argument("--poisson", action="store_true", help="Exponential inter-arrival times")
+    parser.add_argument("--max-inflight", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start-server", action="store_true",
+                        help="Start serve.py on the --url port for the duration of the test")
+    parser.add_argument("--server-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    server = start_server(urlsplit(args.url).port or 80, args.server_workers) if args.start_server else None
+    try:
+        report = run_load(args.url, parse_stages(args.stages), args.poisson, args.max_inflight, args.timeout, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
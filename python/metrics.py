@@ -0,0 +1,133 @@
+import bisect
+import json
+import logging
+import random
+import threading
+
+# Latency buckets in seconds, from 50 microseconds to 2.5 seconds
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+class Histogram:
+    """
+    Fixed-bucket histogram; observe() is a bisect and a few increments
+    """
+
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                # Per-bucket counts (the last slot is +Inf), sum, count
+                series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            snapshot = {labels: (list(counts), total, count) for labels, (counts, total, count) in self.series.items()}
+        for label_values, (counts, total, count) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                labels = format_labels(self.label_names + ("le",), label_values + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class Gauge:
+    """
+    Gauge read from a callback at scrape time; the callback returns a number
+    or a dict of {label values tuple: number}
+    """
+
+    TYPE = "gauge"
+
+    def __init__(self, name, help_text, callback, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.callback = callback
+        self.label_names = tuple(label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.TYPE}"]
+        values = self.callback()
+        if values is None:
+            return lines
+        if not isinstance(values, dict):
+            values = {(): values}
+        for label_values, value in sorted(values.items()):
+            lines.append(f"{self.name}{format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+class CallbackCounter(Gauge):
+    """
+    Counter read from a callback at scrape time, for running totals another
+    component already keeps (e.g. cache hits); the callback returns values
+    like a Gauge's
+    """
+
+    TYPE = "counter"
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered in the Prometheus text exposition format
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help_text, label_names, buckets))
+
+    def gauge(self, name, help_text, callback, label_names=()):
+        return self.register(Gauge(name, help_text, callback, label_names))
+
+    def callback_counter(self, name, help_text, callback, label_names=()):
+        return self.register(CallbackCounter(name, help_text, callback, label_names))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+class SampledLogger:
+    """
+    Structured (JSON) logging for the request path: nothing is formatted
+    unless the level is enabled, and only a sample of events is emitted
+    """
+
+    def __init__(self, logger, sample_rate):
+        self.logger = logger
+        self.sample_rate = sample_rate
+
+    def debug(self, event, **fields):
+        if self.logger.isEnabledFor(logging.DEBUG) and random.random() < self.sample_rate:
+            self.logger.debug(json.dumps({"event": event, **fields}, default=str))
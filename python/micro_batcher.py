@@ -0,0 +1,129 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+class QueueFullError(Exception):
+    """
+    Raised when the batcher's queue is at its configured depth
+    """
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item requests into batches.
+
+    Items arriving within max_wait_ms of the first item in a batch (or until
+    max_batch_size items are waiting) are scored together with one call to
+    score_fn, which takes a list of items and returns a list of results in
+    the same order. Each caller blocks only on its own result. An item whose
+    caller stopped waiting before its batch started is dropped unscored.
+    """
+
+    # Upper bounds of the batch-size histogram buckets
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+    def __init__(self, score_fn, max_batch_size=32, max_wait_ms=2.0, max_queue_depth=1024):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = queue.Queue(maxsize=max_queue_depth)
+
+        self.lock = threading.Lock()
+        self.batch_size_counts = [0] * (len(self.BATCH_SIZE_BUCKETS) + 1)
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.total_wait = 0.0
+        self.max_observed_wait = 0.0
+
+        self.worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self.worker.start()
+
+    def submit(self, item, timeout=None):
+        """
+        Queue an item and block until its result is ready. On timeout the
+        item is cancelled so it is never scored, and TimeoutError is raised;
+        if its batch has already started, its result is waited for instead
+        """
+        future = Future()
+        try:
+            self.queue.put_nowait((item, future, time.perf_counter()))
+        except queue.Full:
+            with self.lock:
+                self.rejected += 1
+            raise QueueFullError("Prediction queue is full")
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            if not future.cancel():
+                return future.result()
+            with self.lock:
+                self.cancelled += 1
+            raise
+
+    def _collect(self):
+        """
+        Block for the first item, then gather more until the window closes
+        """
+        batch = [self.queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # Marks the futures running, so callers can no longer cancel them
+            batch = [entry for entry in self._collect() if entry[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            started = time.perf_counter()
+            items = [item for item, _, _ in batch]
+            try:
+                results = self.score_fn(items)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            self._record(batch, started)
+
+    def _record(self, batch, started):
+        waits = [started - enqueued for _, _, enqueued in batch]
+        bucket = len(self.BATCH_SIZE_BUCKETS)
+        for i, bound in enumerate(self.BATCH_SIZE_BUCKETS):
+            if len(batch) <= bound:
+                bucket = i
+                break
+        with self.lock:
+            self.batch_size_counts[bucket] += 1
+            self.batches += 1
+            self.items += len(batch)
+            self.total_wait += sum(waits)
+            self.max_observed_wait = max(self.max_observed_wait, max(waits))
+
+    def stats(self):
+        """
+        Snapshot of batch-size distribution, queue depth and added latency
+        """
+        with self.lock:
+            labels = [f"<={bound}" for bound in self.BATCH_SIZE_BUCKETS] + [f">{self.BATCH_SIZE_BUCKETS[-1]}"]
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "rejected": self.rejected,
+                "cancelled": self.cancelled,
+                "queueDepth": self.queue.qsize(),
+                "meanBatchSize": self.items / self.batches if self.batches else 0.0,
+                "batchSizeHistogram": dict(zip(labels, self.batch_size_counts)),
+                "meanAddedLatencyMs": 1000 * self.total_wait / self.items if self.items else 0.0,
+                "maxAddedLatencyMs": 1000 * self.max_observed_wait
+            }
@@ -0,0 +1,112 @@
+import os
+
+from model_store import RUNTIME_DIRS, ModelBundle
+from svm_inference import FusedSVMPredictor
+
+def parse_model_list(spec):
+    """
+    {name: model_dir} from "name=dir,name=dir" (an empty string gives {})
+    """
+    models = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, separator, model_dir = entry.partition("=")
+        if not separator or not name.strip() or not model_dir.strip():
+            raise ValueError(f"Expected name=dir in the model list, got {entry!r}")
+        models[name.strip()] = model_dir.strip()
+    return models
+
+class ModelRegistry:
+    """
+    Several exported models loaded side by side under a name, one of which is
+    the champion that answers requests; the others are challengers.
+
+    The champion's name and the loaded bundles are kept in one tuple that is
+    replaced as a whole, so a request reading it never sees a promotion or a
+    reload half applied
+    """
+
+    def __init__(self, model_dirs, champion, use_float32=False, runtime="pickle"):
+        if champion not in model_dirs:
+            raise ValueError(f"Champion {champion!r} is not one of the registered models: {', '.join(model_dirs)}")
+        self.model_dirs = dict(model_dirs)
+        self.use_float32 = use_float32
+        self.runtime = runtime
+        self.state = (champion, {})
+        self.errors = {}
+
+    def _load_bundle(self, name, model_dir):
+        # Only the RBF SVC has NumPy exports, so other model kinds fall back
+        # to the pickle. An SVC without the export is an error rather than
+        # silently served by a different runtime
+        subdir = RUNTIME_DIRS.get(self.runtime)
+        if subdir is None or os.path.exists(os.path.join(model_dir, subdir, "meta.json")):
+            return ModelBundle(model_dir, self.use_float32, self.runtime, name)
+        bundle = ModelBundle(model_dir, self.use_float32, "pickle", name)
+        if FusedSVMPredictor.supports(bundle.model):
+            raise ValueError(f"{os.path.join(model_dir, subdir)} is missing; export it to serve "
+                             f"this SVC with the {self.runtime} runtime")
+        print(f"Model {name} has no {self.runtime} export; serving it from the pickle")
+        return bundle
+
+    def load(self):
+        """
+        Load and check every registered model. A model that fails keeps its
+        previously loaded bundle, if any, and its error is kept in errors.
+        Returns True when the champion is loaded
+        """
+        champion, bundles = self.state
+        bundles = dict(bundles)
+        errors = {}
+        for name, model_dir in self.model_dirs.items():
+            try:
+                bundle = self._load_bundle(name, model_dir)
+                bundle.check()
+            except Exception as e:
+                errors[name] = str(e)
+                print(f"Error loading model {name} from {model_dir}: {str(e)}")
+                continue
+            bundles[name] = bundle
+        self.state = (champion, bundles)
+        self.errors = errors
+        return champion in bundles and champion not in errors
+
+    @property
+    def champion_name(self):
+        return self.state[0]
+
+    @property
+    def champion(self):
+        name, bundles = self.state
+        return bundles.get(name)
+
+    def challengers(self):
+        """
+        (name, bundle) of every loaded model other than the champion
+        """
+        champion, bundles = self.state
+        return [(name, bundle) for name, bundle in bundles.items() if name != champion]
+
+    def promote(self, name):
+        """
+        Make a loaded challenger the champion; the old champion becomes a
+        challenger. Returns the new champion's bundle
+        """
+        champion, bundles = self.state
+        if name not in bundles:
+            raise KeyError(name)
+        self.state = (name, bundles)
+        return bundles[name]
+
+    def describe(self):
+        champion, bundles = self.state
+        models = {}
+        for name, model_dir in self.model_dirs.items():
+            bundle = bundles.get(name)
+            models[name] = {
+                "role": "champion" if name == champion else "challenger",
+                "directory": model_dir,
+                "loaded": bundle is not None,
+                **(bundle.describe() if bundle is not None else {}),
+                **({"error": self.errors[name]} if name in self.errors else {})
+            }
+        return {"champion": champion, "models": models}
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+
+from applicant_schema import compile_decoder
+from drift_monitor import REFERENCE_PROFILE
+from feature_encoder import FeatureEncoder
+from numpy_model import NUMPY_MODEL_DIR, NumpyModel
+from svm_compression import COMPRESSED_MODEL_DIR
+from svm_inference import build_predictor
+
+# Files making up one exported model; column_info.pkl and sample_input.pkl are optional
+MODEL_ARTIFACTS = ("svm_model.pkl", "feature_names.pkl", "column_info.pkl", "sample_input.pkl")
+
+# Written last by the NumPy export, so it also marks a new export for the watcher
+NUMPY_META = os.path.join(NUMPY_MODEL_DIR, "meta.json")
+COMPRESSED_META = os.path.join(COMPRESSED_MODEL_DIR, "meta.json")
+
+# "pickle" unpickles the sklearn pipeline; "numpy" memory-maps the NumPy
+# export and never imports sklearn or pandas; "compressed" does the same
+# with the reduced support-vector set written by svm_compression.py
+RUNTIMES = ("pickle", "numpy", "compressed")
+
+# NumPy export subdirectory per runtime
+RUNTIME_DIRS = {"numpy": NUMPY_MODEL_DIR, "compressed": COMPRESSED_MODEL_DIR}
+
+class ModelBundle:
+    """
+    Everything needed to score requests with one exported model. A bundle is
+    never modified after loading, so swapping the server's reference to a new
+    bundle is atomic for requests already holding the old one
+    """
+
+    def __init__(self, model_dir, use_float32=False, runtime="pickle", name=None):
+        start = time.perf_counter()
+        self.model_dir = model_dir
+        # Name under which the model registry serves it
+        self.name = name or os.path.basename(os.path.normpath(model_dir))
+        self.runtime = runtime
+        if runtime not in RUNTIMES:
+            raise ValueError(f"Unknown model runtime {runtime!r}; expected one of {RUNTIMES}")
+        if runtime in RUNTIME_DIRS:
+            self._load_numpy(use_float32, RUNTIME_DIRS[runtime])
+        else:
+            self._load_pickle(use_float32)
+        # Validates /predict bodies and encodes them in the same pass
+        self.decoder = compile_decoder(self.encoder)
+        # Training distribution the drift monitor compares live inputs with
+        self.reference_profile = None
+        profile_path = os.path.join(model_dir, REFERENCE_PROFILE)
+        if os.path.exists(profile_path):
+            with open(profile_path) as f:
+                self.reference_profile = json.load(f)
+        self.loaded_at = time.time()
+        self.load_seconds = time.perf_counter() - start
+
+    def _load_pickle(self, use_float32):
+        model_dir = self.model_dir
+        self.numpy_model = None
+        self.artifact_hashes = {}
+        contents = {}
+        for name in MODEL_ARTIFACTS:
+            path = os.path.join(model_dir, name)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    contents[name] = f.read()
+                self.artifact_hashes[name] = hashlib.sha256(contents[name]).hexdigest()
+
+        self.model = pickle.loads(contents["svm_model.pkl"])
+        self.feature_names = pickle.loads(contents["feature_names.pkl"])
+        self.column_info = pickle.loads(contents["column_info.pkl"]) if "column_info.pkl" in contents else None
+        self.sample_input = pickle.loads(contents["sample_input.pkl"]) if "sample_input.pkl" in contents else None
+        self.version = self.artifact_hashes["svm_model.pkl"][:12]
+
+        # Compiled once per model: feature encoder and single-pass predictor
+        self.encoder = FeatureEncoder(self.feature_names, self.column_info)
+        self.predictor = build_predictor(self.model, use_float32)
+
+    def _load_numpy(self, use_float32, subdir):
+        self.numpy_model = NumpyModel(self.model_dir, use_float32, subdir)
+        meta = os.path.join(subdir, "meta.json")
+        with open(os.path.join(self.model_dir, meta), "rb") as f:
+            self.artifact_hashes = {meta: hashlib.sha256(f.read()).hexdigest()}
+        # No sklearn pipeline or pandas sample in this runtime
+        self.model = None
+        self.sample_input = None
+        self.feature_names = self.numpy_model.feature_names
+        self.column_info = self.numpy_model.column_info
+        self.version = self.numpy_model.version
+        self.encoder = self.numpy_model.encoder
+        self.predictor = self.numpy_model.predictor
+
+    def check(self):
+        """
+        Warm the bundle and sanity-check it before it serves traffic: the fast
+        predictor must agree with the pipeline on sample_input.pkl, and an
+        applicant must encode and score to finite probabilities
+        """
+        if self.numpy_model is not None:
+            self.numpy_model.check()
+        elif self.sample_input is not None:
+            sample = self.sample_input[self.feature_names]
+            expected = self.model.predict_proba(sample)
+            _, probabilities, _ = self.predictor.predict(sample.to_numpy(dtype=np.float64))
+            if not np.allclose(probabilities, expected, atol=1e-4):
+                raise ValueError("Predictor disagrees with the model on sample_input.pkl")
+
+        _, probabilities, _ = self.predictor.predict(self.encoder.encode({}))
+        if not np.all(np.isfinite(probabilities)):
+            raise ValueError("Model produced non-finite probabilities")
+
+    def describe(self):
+        return {
+            "name": self.name,
+            "version": self.version,
+            "runtime": self.runtime,
+            "loadedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.loaded_at)),
+            "loadSeconds": round(self.load_seconds, 4),
+            "artifacts": self.artifact_hashes,
+            **({"compression": self.numpy_model.compression["fidelity"]}
+               if self.numpy_model is not None and self.numpy_model.compression else {})
+        }
+
+def artifact_signature(model_dir):
+    """
+    Cheap fingerprint of the artifact files used to detect a new export
+    """
+    signature = []
+    for name in MODEL_ARTIFACTS + (NUMPY_META, COMPRESSED_META):
+        try:
+            stat = os.stat(os.path.join(model_dir, name))
+            signature.append((name, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((name, None, None))
+    return tuple(signature)
+
+class ModelWatcher:
+    """
+    Polls the model directory and calls on_change once the artifacts have
+    changed and then stayed unchanged for one more interval, so a reload
+    does not start while an export is still writing files
+    """
+
+    def __init__(self, model_dir, interval, on_change):
+        self.model_dir = model_dir
+        self.interval = interval
+        self.on_change = on_change
+        self.signature = artifact_signature(model_dir)
+        self.thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        pending = None
+        while True:
+            time.sleep(self.interval)
+            current = artifact_signature(self.model_dir)
+            if current == self.signature:
+                pending = None
+            elif current != pending:
+                pending = current
+            else:
+                self.signature = current
+                pending = None
+                self.on_change()
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC, LinearSVC
+
+from drift_monitor import save_reference_profile
+from numpy_model import export_numpy_model
+
+# "svc" is the exact RBF SVM; "rff" and "nystroem" approximate the same kernel
+# with an explicit feature map and a linear classifier. The challenger kinds are
+# the model families compared on the analysis page, to be served side by side
+# with the SVM through the model registry
+MODEL_KINDS = ("svc", "rff", "nystroem", "logreg", "forest", "boosting")
+
+def build_model(kind="svc", n_features=None, n_components=500, random_state=42):
+    """
+    Create an unfitted model pipeline. Every kind exposes predict and
+    predict_proba, so the API server serves them through the same interface
+    """
+    if kind == "svc":
+        return Pipeline([
+            ("scaler", StandardScaler()),
+            ("svm", SVC(kernel="rbf", probability=True, random_state=random_state))
+        ])
+
+    if kind not in MODEL_KINDS:
+        raise ValueError(f"Unknown model kind {kind!r}; expected one of {MODEL_KINDS}")
+
+    if kind == "logreg":
+        return Pipeline([
+            ("scaler", StandardScaler()),
+            ("classifier", LogisticRegression(max_iter=1000, random_state=random_state))
+        ])
+    if kind == "forest":
+        return Pipeline([
+            ("classifier", RandomForestClassifier(n_estimators=200, min_samples_leaf=2, random_state=random_state))
+        ])
+    if kind == "boosting":
+        # Gradient-boosted trees in scikit-learn itself, standing in for XGBoost
+        return Pipeline([
+            ("classifier", HistGradientBoostingClassifier(random_state=random_state))
+        ])
+
+    # SVC's default gamma="scale" is 1 / (n_features * X.var()), and the
+    # variance of standardised features is 1
+    gamma = 1.0 / n_features
+    if kind == "rff":
+        feature_map = RBFSampler(gamma=gamma, n_components=n_components, random_state=random_state)
+    else:
+        feature_map = Nystroem(kernel="rbf", gamma=gamma, n_components=n_components, random_state=random_state)
+
+    # Sigmoid calibration of a linear SVM mirrors SVC's Platt scaling;
+    # ensemble=False keeps a single classifier so inference stays one pass
+    classifier = CalibratedClassifierCV(
+        LinearSVC(dual="auto", random_state=random_state),
+        method="sigmoid",
+        cv=3,
+        ensemble=False
+    )
+    return Pipeline([
+        ("scaler", StandardScaler()),
+        ("features", feature_map),
+        ("classifier", classifier)
+    ])
+
+def evaluate_model(model, X_test, y_test, n_latency_samples=200):
+    """
+    Accuracy, AUC, single-row p50/p99 predict_proba latency and pickled size
+    """
+    # Score plain arrays, as the API server does
+    X_test = np.asarray(X_test, dtype=np.float64)
+    y_test = np.asarray(y_test)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        probabilities = model.predict_proba(X_test)[:, 1]
+        predictions = model.classes_[(probabilities >= 0.5).astype(int)]
+
+        latencies = []
+        for row in X_test[:n_latency_samples]:
+            start = time.perf_counter()
+            model.predict_proba(row.reshape(1, -1))
+            latencies.append(time.perf_counter() - start)
+
+    return {
+        "accuracy": float(accuracy_score(y_test, predictions)),
+        "auc": float(roc_auc_score(y_test, probabilities)),
+        "p50_latency_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_latency_ms": float(np.percentile(latencies, 99) * 1000),
+        "model_size_bytes": len(pickle.dumps(model))
+    }
+
+def print_report(report):
+    """
+    Print an evaluation report as a table, one row per model
+    """
+    columns = ["accuracy", "auc", "p50_latency_ms", "p99_latency_ms", "model_size_bytes", "fit_seconds"]
+    print(f"{'model':<10}" + "".join(f"{column:>18}" for column in columns))
+    for name, metrics in report.items():
+        cells = []
+        for column in columns:
+            value = metrics.get(column)
+            cells.append(f"{value:>18.4f}" if isinstance(value, float) else f"{str(value):>18}")
+        print(f"{name:<10}" + "".join(cells))
+
+def write_report(report, model_dir="ml_model"):
+    """
+    Save the comparison report next to the exported model
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    path = os.path.join(model_dir, "export_report.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Export report saved to {os.path.abspath(path)}")
+
+def column_info_for(X_raw):
+    """
+    Categorical and numeric input columns of the raw (unencoded) features
+    """
+    # Booleans count as numeric
+    categorical = [col for col in X_raw.columns if not pd.api.types.is_numeric_dtype(X_raw[col])]
+    numeric = [col for col in X_raw.columns if col not in categorical]
+    return {"categorical_columns": categorical, "numeric_columns": numeric}
+
+def save_artifacts(model, X, column_info, model_dir="ml_model"):
+    """
+    Write the artifacts the API server loads from model_dir
+    """
+    os.makedirs(model_dir, exist_ok=True)
+
+    # Save the model to a pickle file
+    with open(os.path.join(model_dir, "svm_model.pkl"), "wb") as f:
+        pickle.dump(model, f)
+
+    # Save feature names for preprocessing
+    with open(os.path.join(model_dir, "feature_names.pkl"), "wb") as f:
+        pickle.dump(list(X.columns), f)
+
+    # Save column information for input processing
+    with open(os.path.join(model_dir, "column_info.pkl"), "wb") as f:
+        pickle.dump(column_info, f)
+
+    # Save a sample for testing
+    sample = X.iloc[0:1].copy()
+    with open(os.path.join(model_dir, "sample_input.pkl"), "wb") as f:
+        pickle.dump(sample, f)
+
+    print(f"Model saved to {os.path.abspath(model_dir)}/svm_model.pkl")
+    print(f"Feature names saved to {os.path.abspath(model_dir)}/feature_names.pkl")
+
+    # Training distribution of every input, for the server's drift monitor
+    save_reference_profile(X, column_info, model_dir)
+
+    # Plain NumPy copy of the same model for the sklearn-free runtime, with
+    # the version the server derives from svm_model.pkl
+    with open(os.path.join(model_dir, "svm_model.pkl"), "rb") as f:
+        version = hashlib.sha256(f.read()).hexdigest()[:12]
+    export_numpy_model(model, list(X.columns), column_info, model_dir, version,
+                       X.iloc[:100].to_numpy(dtype=np.float64))
+
+def fit_and_compare(kind, X_train, X_test, y_train, y_test, n_components=500):
+    """
+    Fit the requested model kind. For every other kind, also fit the exact
+    SVC on the same split and return a report comparing the two
+    """
+    report = {}
+    fitted = {}
+    kinds = [kind] if kind == "svc" else [kind, "svc"]
+    for name in kinds:
+        model = build_model(name, n_features=X_train.shape[1], n_components=n_components)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+        fitted[name] = model
+        report[name] = {**evaluate_model(model, X_test, y_test), "fit_seconds": fit_seconds}
+        if name == "svc":
+            report[name]["support_vectors"] = int(model.named_steps["svm"].support_vectors_.shape[0])
+    return fitted[kind], report
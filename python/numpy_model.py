@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import warnings
+
+import numpy as np
+
+from feature_encoder import FeatureEncoder
+from svm_inference import FusedSVMPredictor, svm_parameters
+
+# Subdirectory of the model directory holding the NumPy export
+NUMPY_MODEL_DIR = "svm_numpy"
+
+# Bump when the files or meta.json fields change
+FORMAT_VERSION = 1
+
+# One .npy file per array, so each can be memory-mapped on load
+ARRAYS = ("classes", "mean", "scale", "support_vectors", "dual_coef", "sample_X", "sample_probabilities")
+SCALARS = ("intercept", "gamma", "prob_a", "prob_b")
+
+def compute_dtype(stored_dtype, use_float32=False):
+    """
+    Type the predictor scores in: float32 with use_float32, and also for
+    support vectors stored below float64 (compressed exports), so they are
+    not widened back to float64 in memory
+    """
+    return np.float32 if use_float32 or np.dtype(stored_dtype).itemsize < 8 else np.float64
+
+def export_numpy_model(model, feature_names, column_info, model_dir="ml_model", version=None, sample_X=None):
+    """
+    Write the scaler + RBF SVC parameters of model as plain .npy files and a
+    meta.json under model_dir/svm_numpy, so the server can score without
+    sklearn, pandas or pickle. sample_X (encoded rows) is stored with the
+    pipeline's own probabilities for the loader's self-check. Returns the
+    directory, or None for models the fused predictor does not cover
+    """
+    if not FusedSVMPredictor.supports(model):
+        print("NumPy export skipped: only scaler + binary RBF SVC pipelines are supported")
+        return None
+
+    params = svm_parameters(model)
+    if sample_X is None:
+        sample_X = np.empty((0, len(feature_names)))
+    params["sample_X"] = np.asarray(sample_X, dtype=np.float64)
+    with warnings.catch_warnings():
+        # The pipeline was fitted on a DataFrame; the sample is a plain array
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        params["sample_probabilities"] = (
+            model.predict_proba(params["sample_X"]) if len(params["sample_X"]) else np.empty((0, 2))
+        )
+    return write_numpy_model(params, feature_names, column_info, os.path.join(model_dir, NUMPY_MODEL_DIR), version)
+
+def write_numpy_model(params, feature_names, column_info, path, version=None, extra_meta=None):
+    """
+    Write svm_parameters()-style params, plus sample_X and the probabilities
+    the loader's self-check expects for it, to the directory path. Arrays
+    keep their dtype, so e.g. float16 support vectors are stored as such
+    """
+    temporary = path + ".tmp"
+    shutil.rmtree(temporary, ignore_errors=True)
+    os.makedirs(temporary)
+    for name in ARRAYS:
+        np.save(os.path.join(temporary, name + ".npy"), np.ascontiguousarray(params[name]))
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "version": version,
+        "feature_names": list(feature_names),
+        "column_info": column_info,
+        **{name: params[name] for name in SCALARS},
+        **(extra_meta or {})
+    }
+    with open(os.path.join(temporary, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    # Swap the finished directory in so a reader never sees a partial export
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(temporary, path)
+    print(f"NumPy model saved to {os.path.abspath(path)}")
+    return path
+
+class NumpyModel:
+    """
+    Scores with the NumPy export alone: only numpy is imported, and the
+    arrays are memory-mapped read-only, so loading costs a few page faults
+    instead of an unpickle and pre-forked workers share the same pages
+    """
+
+    def __init__(self, model_dir="ml_model", use_float32=False, subdir=NUMPY_MODEL_DIR):
+        start = time.perf_counter()
+        path = os.path.join(model_dir, subdir)
+        with open(os.path.join(path, "meta.json"), "rb") as f:
+            raw_meta = f.read()
+        meta = json.loads(raw_meta)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"{path} has format version {meta.get('format_version')}, expected {FORMAT_VERSION}")
+
+        arrays = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in ARRAYS}
+        self.sample_X = arrays.pop("sample_X")
+        self.sample_probabilities = arrays.pop("sample_probabilities")
+        self.feature_names = meta["feature_names"]
+        self.column_info = meta["column_info"]
+        self.version = meta.get("version") or hashlib.sha256(raw_meta).hexdigest()[:12]
+        # Set by svm_compression.py for reduced or quantized exports
+        self.compression = meta.get("compression")
+
+        self.encoder = FeatureEncoder(self.feature_names, self.column_info)
+        self.predictor = FusedSVMPredictor.from_parameters(
+            {**arrays, **{name: meta[name] for name in SCALARS}},
+            compute_dtype(arrays["support_vectors"].dtype, use_float32)
+        )
+        self.classes_ = self.predictor.classes_
+        self.load_seconds = time.perf_counter() - start
+
+    def check(self):
+        """
+        The probabilities must match those the pipeline gave for the stored
+        sample at export time
+        """
+        if len(self.sample_X):
+            _, probabilities, _ = self.predictor.predict(self.sample_X)
+            if not np.allclose(probabilities, self.sample_probabilities, atol=1e-4):
+                raise ValueError("NumPy model disagrees with the exported pipeline on its sample")
+
+    def predict(self, rows):
+        """
+        (labels, probabilities, decision values) for a list of applicant dicts
+        """
+        return self.predictor.predict(self.encoder.encode_batch(rows))
+
+# Child process for the cold-start comparison: time from interpreter start to
+# the first prediction, and whether sklearn/pandas ended up imported
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {here!r})
+if {runtime!r} == "numpy":
+    from numpy_model import NumpyModel
+    model = NumpyModel({model_dir!r})
+    loaded = time.perf_counter()
+    probabilities = model.predict([{{}}])[1]
+else:
+    from model_store import ModelBundle
+    bundle = ModelBundle({model_dir!r})
+    loaded = time.perf_counter()
+    probabilities = bundle.predictor.predict(bundle.encoder.encode({{}}))[1]
+first = time.perf_counter()
+# VmHWM, unlike ru_maxrss, is not inherited from the parent across exec
+with open("/proc/self/status") as f:
+    peak_kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+print(json.dumps({{
+    "load_seconds": loaded - start,
+    "first_prediction_seconds": first - start,
+    "sklearn_imported": "sklearn" in sys.modules,
+    "pandas_imported": "pandas" in sys.modules,
+    "max_rss_mb": peak_kb / 1024
+}}))
+"""
+
+def cold_start(runtime, model_dir, runs):
+    """
+    Median timings of fresh interpreters loading the model and scoring one
+    applicant; process_seconds includes interpreter startup
+    """
+    import statistics
+    import subprocess
+    import sys
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    script = COLD_START.format(here=here, runtime=runtime, model_dir=model_dir)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result["process_seconds"] = time.perf_counter() - start
+        samples.append(result)
+    summary = {key: samples[0][key] for key in ("sklearn_imported", "pandas_imported")}
+    for key in ("process_seconds", "load_seconds", "first_prediction_seconds", "max_rss_mb"):
+        summary[key] = statistics.median(sample[key] for sample in samples)
+    return summary
+
+if __name__ == "__main__":
+    # Export the NumPy model for an existing pickle export, then compare cold
+    # start of the two runtimes; outputs are checked in tests/test_numpy_model.py
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export and check the NumPy inference runtime")
+    parser.add_argument("--model-dir", default="ml_model")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts timed per runtime")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    from model_store import ModelBundle
+
+    bundle = ModelBundle(args.model_dir)
+    rng = np.random.default_rng(42)
+    scaler = bundle.model.named_steps["scaler"]
+    X = rng.normal(scaler.mean_, scaler.scale_, size=(100, len(bundle.feature_names)))
+    export_numpy_model(bundle.model, bundle.feature_names, bundle.column_info, args.model_dir, bundle.version, X)
+    NumpyModel(args.model_dir).check()
+
+    print(f"{'runtime':<8}{'process s':>12}{'load s':>10}{'first s':>10}{'RSS MB':>10}{'sklearn':>9}{'pandas':>8}")
+    for runtime in ("pickle", "numpy"):
+        result = cold_start(runtime, os.path.abspath(args.model_dir), args.runs)
+        print(f"{runtime:<8}{result['process_seconds']:>12.3f}{result['load_seconds']:>10.3f}"
+              f"{result['first_prediction_seconds']:>10.3f}{result['max_rss_mb']:>10.0f}"
+              f"{str(result['sklearn_imported']):>9}{str(result['pandas_imported']):>8}")
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+class PredictionCache:
+    """
+    LRU cache of prediction results with a time-to-live.
+
+    Keys are a hash of the canonicalised applicant fields plus the model
+    version, so a new model never serves results computed by the old one.
+    Cached results are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=300):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def canonical(value):
+        """
+        Normalise values that score identically: ints and floats compare
+        equal in the encoder and the business rules, so 28 and 28.0 share a key
+        """
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return value
+        return float(value)
+
+    def key(self, data, model_version):
+        canonical = {field: self.canonical(value) for field, value in data.items()}
+        payload = json.dumps([model_version, canonical], sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, result = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "maxEntries": self.max_entries,
+                "ttlSeconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
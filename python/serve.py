@@ -0,0 +1,240 @@
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+import api_server
+
+# Dummy applicant used to warm every worker before it accepts traffic
+WARMUP_APPLICANT = {
+    "person_age": 28.0,
+    "person_gender": "male",
+    "person_education": "Bachelor",
+    "person_income": 50000.0,
+    "person_emp_exp": 3,
+    "person_home_ownership": "RENT",
+    "loan_amnt": 15000.0,
+    "loan_intent": "EDUCATION",
+    "loan_int_rate": 12.5,
+    "loan_percent_income": 30.0,
+    "cb_person_cred_hist_length": 5.0,
+    "credit_score": 700,
+    "previous_loan_defaults_on_file": "No"
+}
+
+# A worker that dies is restarted at once if it had run for
+# STABLE_WORKER_SECONDS, else after a delay that doubles with each such early
+# death in a row, up to the maximum
+RESTART_BACKOFF_SECONDS = 1.0
+MAX_RESTART_BACKOFF_SECONDS = 60.0
+STABLE_WORKER_SECONDS = 60.0
+
+def memory_usage_kb(pid):
+    """
+    Resident and proportional set size of a process in KB. PSS splits pages
+    shared copy-on-write with the parent across the processes sharing them,
+    so it is the better number for sizing instances
+    """
+    usage = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    usage["rss"] = int(line.split()[1])
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    usage["pss"] = int(line.split()[1])
+    except OSError:
+        # Not on Linux: fall back to this process's peak RSS
+        if pid == os.getpid():
+            import resource
+            usage["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage
+
+def format_memory(usage):
+    return ", ".join(f"{key.upper()} {value / 1024:.1f} MB" for key, value in usage.items()) or "unknown"
+
+def warm_up():
+    """
+    Run a dummy prediction through the full request path, with auditing and
+    drift monitoring off since it is neither a real decision nor live input
+    """
+    audit_log, api_server.audit_log = api_server.audit_log, None
+    drift_monitor, api_server.drift_monitor = api_server.drift_monitor, None
+    try:
+        client = api_server.app.test_client()
+        response = client.post("/predict", json=WARMUP_APPLICANT)
+    finally:
+        api_server.audit_log = audit_log
+        api_server.drift_monitor = drift_monitor
+    if response.status_code != 200:
+        raise RuntimeError(f"Warm-up prediction failed: {response.get_data(as_text=True)}")
+
+def run_worker(sock, ready_fd):
+    """
+    Worker process: warm up, report readiness to the parent, then serve
+    requests on the inherited listening socket until SIGTERM
+    """
+    warm_up()
+    api_server.start_model_watcher()
+
+    host, port = sock.getsockname()[:2]
+    server = make_server(host, port, api_server.app, threaded=True, fd=sock.fileno())
+    # Let in-flight requests finish when shutting down
+    server.daemon_threads = False
+    server.block_on_close = True
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    os.write(ready_fd, f"{os.getpid()}\n".encode())
+    os.close(ready_fd)
+
+    server.serve_forever()
+    server.server_close()
+    # Workers exit with os._exit, which skips atexit handlers
+    api_server.close_audit_log()
+
+def spawn_worker(sock):
+    """
+    Fork a worker; returns (pid, read end of its readiness pipe)
+    """
+    ready_read, ready_write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Drop the parent's handlers; run_worker installs its own once warm
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        os.close(ready_read)
+        code = 0
+        try:
+            run_worker(sock, ready_write)
+        except Exception as e:
+            print(f"Worker {os.getpid()} failed: {e}", file=sys.stderr)
+            code = 1
+        finally:
+            os._exit(code)
+    os.close(ready_write)
+    return pid, ready_read
+
+def wait_ready(pid, ready_read):
+    with os.fdopen(ready_read) as f:
+        return f.readline().strip() == str(pid)
+
+def reap(children):
+    """
+    Wait for every pid in children to exit
+    """
+    for pid in list(children):
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+        children.pop(pid, None)
+
+def serve(host, port, workers):
+    start = time.perf_counter()
+
+    # Load once in the parent so forked workers share the support vectors
+    # copy-on-write instead of each unpickling its own copy
+    if not api_server.load_model():
+        sys.exit("Model could not be loaded")
+    load_seconds = time.perf_counter() - start
+
+    sock = socket.create_server((host, port), backlog=1024)
+    sock.set_inheritable(True)
+
+    children = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    # Installed before forking so a signal during startup also stops the workers
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    pipes = {}
+    for _ in range(workers):
+        pid, ready_read = spawn_worker(sock)
+        pipes[pid] = ready_read
+        children[pid] = time.monotonic()
+    for pid, ready_read in pipes.items():
+        if not wait_ready(pid, ready_read) and not stopping:
+            print(f"Worker {pid} failed to start; stopping the others", file=sys.stderr)
+            stop(signal.SIGTERM, None)
+            reap(children)
+            sock.close()
+            sys.exit(f"Worker {pid} failed to start")
+
+    if not stopping:
+        startup_seconds = time.perf_counter() - start
+        print(f"Model loaded in {load_seconds * 1000:.0f} ms; "
+              f"{workers} workers ready in {startup_seconds * 1000:.0f} ms on http://{host}:{port}")
+        print(f"Parent {os.getpid()}: {format_memory(memory_usage_kb(os.getpid()))}")
+        for pid in children:
+            print(f"Worker {pid}: {format_memory(memory_usage_kb(pid))}")
+
+    # Reap workers; replace any that die unexpectedly, backing off while
+    # they keep dying soon after starting
+    failures = 0
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        if pid not in children:
+            continue
+        started = children.pop(pid)
+        if stopping:
+            continue
+        failures = failures + 1 if time.monotonic() - started < STABLE_WORKER_SECONDS else 0
+        delay = min(RESTART_BACKOFF_SECONDS * 2 ** (failures - 1), MAX_RESTART_BACKOFF_SECONDS) if failures else 0.0
+        print(f"Worker {pid} exited with status {status}; restarting in {delay:.0f} s")
+        resume = time.monotonic() + delay
+        while not stopping and time.monotonic() < resume:
+            time.sleep(0.1)
+        if stopping:
+            continue
+        new_pid, ready_read = spawn_worker(sock)
+        children[new_pid] = time.monotonic()
+        if not wait_ready(new_pid, ready_read):
+            print(f"Worker {new_pid} failed to start", file=sys.stderr)
+
+    sock.close()
+    print("All workers stopped.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the prediction API with pre-forked workers")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logging.basicConfig(format="%(message)s")
+
+    if not hasattr(os, "fork"):
+        # No fork (Windows): a single threaded server with the model preloaded
+        api_server.load_model()
+        warm_up()
+        api_server.app.run(host=args.host, port=args.port, threaded=True)
+    else:
+        serve(args.host, args.port, args.workers)
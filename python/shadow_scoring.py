@@ -0,0 +1,217 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+class ShadowScorer:
+    """
+    Scores challenger models on the same applicants as the champion, on a
+    pool of background threads, after the champion's result is already
+    computed, so the champion's response never waits for them.
+
+    Request threads only enqueue the rows with the champion's encoding,
+    output and predict time (a non-blocking put, dropped and counted when
+    max_pending jobs are waiting). Each worker drains up to batch_size queued
+    rows and scores them with every challenger in one call, which keeps the
+    CPU the shadows take from the request threads small. The champion is not
+    scored again: its time is what the request path spent on the same rows.
+
+    Per challenger it keeps the rows scored, how often its predicted label
+    agrees with the champion's, both approval rates over the same rows, the
+    mean absolute difference in approval probability and predict time. Each
+    process keeps its own workers and counts
+    """
+
+    def __init__(self, workers=2, max_pending=1000, batch_size=256, flush_interval=0.05,
+                 approve_label=1, latency_histogram=None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.approve_label = approve_label
+        self.latency_histogram = latency_histogram
+        self.lock = threading.Lock()
+        self.pid = None
+        self.generation = 0
+        self.reset()
+
+    def _start(self):
+        # Started lazily in the scoring process, since threads do not survive a fork
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.queue = queue.Queue(self.max_pending)
+            for i in range(self.workers):
+                threading.Thread(target=self._run, name=f"shadow-{i}", daemon=True).start()
+            self.pid = os.getpid()
+
+    def reset(self):
+        """
+        Forget all comparisons, e.g. when the champion changes
+        """
+        with self.lock:
+            # Jobs queued before the reset compared against the old champion
+            self.generation += 1
+            self.submitted = 0
+            self.dropped = 0
+            self.models = {}
+
+    def submit(self, rows, X, champion, labels, probabilities, challengers, champion_seconds):
+        """
+        Queue (name, bundle) challengers to score rows (applicant dicts),
+        given the champion bundle's encoding X, its labels and probabilities
+        for them and the seconds it took to predict them. Never blocks
+        """
+        if not challengers or not rows:
+            return
+        if self.pid != os.getpid():
+            self._start()
+        job = (self.generation, rows, X, champion, labels, probabilities, challengers, champion_seconds)
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return
+        with self.lock:
+            self.submitted += 1
+
+    def _run(self):
+        while True:
+            jobs = [self.queue.get()]
+            rows = len(jobs[0][1])
+            while rows < self.batch_size:
+                try:
+                    jobs.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+                rows += len(jobs[-1][1])
+            # Jobs from before a reset have a different champion; score the
+            # current generation's jobs together
+            generation = max(job[0] for job in jobs)
+            jobs = [job for job in jobs if job[0] == generation]
+            try:
+                self._score(generation, jobs)
+            except Exception as e:
+                print(f"Shadow scoring failed: {str(e)}")
+            # Let requests accumulate so most shadow calls are batches
+            time.sleep(self.flush_interval)
+
+    def _score(self, generation, jobs):
+        _, _, _, champion, _, _, challengers, _ = jobs[-1]
+        rows = [row for job in jobs for row in job[1]]
+        X = np.concatenate([job[2] for job in jobs])
+        labels = np.concatenate([job[4] for job in jobs])
+        approve = self._approve_probability(np.concatenate([job[5] for job in jobs]), champion.predictor.classes_)
+        champion_approvals = int(np.sum(labels == self.approve_label))
+        champion_seconds = sum(job[7] for job in jobs)
+
+        for name, bundle in challengers:
+            try:
+                # Reuse the champion's encoding when the inputs are the same
+                if bundle.feature_names == champion.feature_names:
+                    X_challenger = X
+                else:
+                    X_challenger = bundle.encoder.encode_batch(rows)
+                start = time.perf_counter()
+                challenger_labels, challenger_probabilities, _ = bundle.predictor.predict(X_challenger)
+                seconds = time.perf_counter() - start
+            except Exception as e:
+                self._record_error(generation, name, bundle.version, e)
+                continue
+            if self.latency_histogram is not None:
+                self.latency_histogram.observe(seconds, name, "shadow")
+
+            challenger_approve = self._approve_probability(challenger_probabilities, bundle.predictor.classes_)
+            self._record(generation, name, bundle.version, {
+                "rows": len(rows),
+                "calls": 1,
+                "seconds": seconds,
+                "championSeconds": champion_seconds,
+                "agreements": int(np.sum(challenger_labels == labels)),
+                "championApprovals": champion_approvals,
+                "challengerApprovals": int(np.sum(challenger_labels == self.approve_label)),
+                "probabilityDiff": float(np.abs(challenger_approve - approve).sum())
+            })
+
+    def _approve_probability(self, probabilities, classes):
+        # Same convention as /what-if: the approve label's column, else the last one
+        classes = list(classes)
+        column = classes.index(self.approve_label) if self.approve_label in classes else len(classes) - 1
+        return probabilities[:, column]
+
+    def _model_stats(self, name, version):
+        # Callers hold the lock
+        stats = self.models.get(name)
+        if stats is None or stats["version"] != version:
+            stats = self.models[name] = {
+                "version": version, "rows": 0, "calls": 0, "seconds": 0.0, "championSeconds": 0.0,
+                "agreements": 0, "championApprovals": 0, "challengerApprovals": 0, "probabilityDiff": 0.0,
+                "errors": 0
+            }
+        return stats
+
+    def _record(self, generation, name, version, counts):
+        with self.lock:
+            if generation != self.generation:
+                return
+            stats = self._model_stats(name, version)
+            for key, value in counts.items():
+                stats[key] += value
+
+    def _record_error(self, generation, name, version, error):
+        with self.lock:
+            if generation != self.generation:
+                return
+            stats = self._model_stats(name, version)
+            stats["errors"] += 1
+            stats["lastError"] = str(error)
+
+    def comparisons(self):
+        """
+        Per challenger: rows compared, label agreement rate, approval rates
+        of both models and their difference (challenger minus champion),
+        mean absolute approval-probability difference, and predict time per
+        row of challenger (in shadow batches) and champion (on the request
+        path) over the same rows
+        """
+        with self.lock:
+            models = {name: dict(stats) for name, stats in self.models.items()}
+        report = {}
+        for name, stats in models.items():
+            rows = stats["rows"]
+            champion_rate = stats["championApprovals"] / rows if rows else 0.0
+            challenger_rate = stats["challengerApprovals"] / rows if rows else 0.0
+            report[name] = {
+                "version": stats["version"],
+                "rows": rows,
+                "calls": stats["calls"],
+                "agreementRate": round(stats["agreements"] / rows, 6) if rows else None,
+                "championApprovalRate": round(champion_rate, 6),
+                "challengerApprovalRate": round(challenger_rate, 6),
+                "approvalRateDelta": round(challenger_rate - champion_rate, 6),
+                "meanAbsProbabilityDiff": round(stats["probabilityDiff"] / rows, 6) if rows else None,
+                "meanRowMs": round(stats["seconds"] / rows * 1000, 4) if rows else None,
+                "championMeanRowMs": round(stats["championSeconds"] / rows * 1000, 4) if rows else None,
+                "latencyRatio": (
+                    round(stats["seconds"] / stats["championSeconds"], 4) if stats["championSeconds"] else None
+                ),
+                "errors": stats["errors"],
+                **({"lastError": stats["lastError"]} if "lastError" in stats else {})
+            }
+        return report
+
+    def stats(self):
+        with self.lock:
+            submitted, dropped = self.submitted, self.dropped
+        return {
+            "workers": self.workers,
+            "maxPending": self.max_pending,
+            "batchSize": self.batch_size,
+            "pending": self.queue.qsize() if self.pid == os.getpid() else 0,
+            "submitted": submitted,
+            "dropped": dropped,
+            "challengers": self.comparisons()
+        }
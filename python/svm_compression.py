@@ -0,0 +1,200 @@
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from numpy_model import compute_dtype, write_numpy_model
+from svm_inference import FusedSVMPredictor, svm_parameters
+
+# Subdirectory of the model directory holding the compressed NumPy export;
+# served with MODEL_RUNTIME=compressed
+COMPRESSED_MODEL_DIR = "svm_compressed"
+
+# "prune" drops support vectors with near-zero dual coefficients; "reduced"
+# replaces them with k-means centres (a reduced-set approximation)
+METHODS = ("prune", "reduced")
+STORAGE_DTYPES = ("float64", "float32", "float16")
+
+# Rows of the fitting set the coefficients are refitted on, to bound export time
+MAX_FIT_ROWS = 20000
+
+# Ridge term of the coefficient refit, relative to the mean diagonal of the normal equations
+RIDGE = 1e-8
+
+def rbf_kernel(A, B, gamma):
+    sq_dist = np.einsum("ij,ij->i", A, A)[:, None] + np.einsum("ij,ij->i", B, B)[None, :] - 2.0 * (A @ B.T)
+    return np.exp(-gamma * np.maximum(sq_dist, 0.0))
+
+def scale_rows(params, X):
+    return (np.asarray(X, dtype=np.float64) - params["mean"]) / params["scale"]
+
+def prune_centers(params, tolerance):
+    """
+    Support vectors whose |dual coefficient| is at least tolerance times the largest
+    """
+    weights = np.abs(params["dual_coef"])
+    return params["support_vectors"][weights >= tolerance * weights.max()]
+
+def reduced_centers(params, n_centers, random_state=42):
+    """
+    n_centers k-means centres of the support vectors, weighted by |dual
+    coefficient|, as the expansion points of a reduced-set approximation
+    """
+    from sklearn.cluster import KMeans
+
+    support_vectors = params["support_vectors"]
+    if n_centers >= len(support_vectors):
+        return support_vectors
+    kmeans = KMeans(n_clusters=n_centers, n_init=3, random_state=random_state)
+    kmeans.fit(support_vectors, sample_weight=np.abs(params["dual_coef"]))
+    return kmeans.cluster_centers_
+
+def refit_coefficients(params, centers, X_fit):
+    """
+    Dual coefficients and intercept for centers, fitted by ridge least
+    squares so their decision values on X_fit match the full model's
+    """
+    X = scale_rows(params, X_fit)
+    target = rbf_kernel(X, params["support_vectors"], params["gamma"]) @ params["dual_coef"] + params["intercept"]
+    A = np.hstack([rbf_kernel(X, centers, params["gamma"]), np.ones((len(X), 1))])
+    normal = A.T @ A
+    normal[np.diag_indices_from(normal)] += RIDGE * np.trace(normal) / len(normal)
+    solution = np.linalg.solve(normal, A.T @ target)
+    return solution[:-1], float(solution[-1])
+
+def compress_svm(params, X_fit=None, method="reduced", n_centers=None, tolerance=1e-3,
+                 storage_dtype="float32", random_state=42):
+    """
+    Compressed copy of svm_parameters() output: fewer support vectors, stored
+    in storage_dtype. Centres are rounded to the storage dtype before the
+    coefficients are refitted on X_fit (encoded, unscaled rows), so the refit
+    also absorbs the rounding. Pruning without X_fit keeps the original
+    coefficients of the remaining vectors
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown compression method {method!r}; expected one of {METHODS}")
+    if storage_dtype not in STORAGE_DTYPES:
+        raise ValueError(f"Unknown storage dtype {storage_dtype!r}; expected one of {STORAGE_DTYPES}")
+
+    if method == "prune":
+        centers = prune_centers(params, tolerance)
+    else:
+        if X_fit is None:
+            raise ValueError("The reduced-set approximation needs rows to fit its coefficients on")
+        n_centers = n_centers or max(1, len(params["support_vectors"]) // 4)
+        centers = reduced_centers(params, n_centers, random_state)
+    centers = centers.astype(storage_dtype)
+
+    compressed = dict(params)
+    compressed["support_vectors"] = centers
+    if X_fit is not None:
+        X_fit = np.asarray(X_fit, dtype=np.float64)
+        if len(X_fit) > MAX_FIT_ROWS:
+            X_fit = X_fit[np.random.default_rng(random_state).choice(len(X_fit), MAX_FIT_ROWS, replace=False)]
+        compressed["dual_coef"], compressed["intercept"] = refit_coefficients(
+            params, centers.astype(np.float64), X_fit
+        )
+    else:
+        keep = np.abs(params["dual_coef"]) >= tolerance * np.abs(params["dual_coef"]).max()
+        compressed["dual_coef"] = params["dual_coef"][keep]
+    return compressed
+
+def _latency(predictor, X, n_single=200):
+    """
+    Median single-row and whole-batch predict time in milliseconds
+    """
+    single = []
+    for row in X[:n_single]:
+        start = time.perf_counter()
+        predictor.predict(row[None, :])
+        single.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    predictor.predict(X)
+    return float(np.median(single) * 1000), (time.perf_counter() - start) * 1000
+
+def fidelity_report(params, compressed, X_holdout, use_float32=False):
+    """
+    How far the compressed model's outputs are from the original's on
+    X_holdout (encoded, unscaled rows): probability deviation and label
+    flips, plus latency and support-vector memory for both
+    """
+    X_holdout = np.asarray(X_holdout, dtype=np.float64)
+    original = FusedSVMPredictor.from_parameters(params)
+    # Scored in the type NumpyModel loads it in
+    reduced = FusedSVMPredictor.from_parameters(
+        compressed, compute_dtype(compressed["support_vectors"].dtype, use_float32)
+    )
+    labels, probabilities, _ = original.predict(X_holdout)
+    compressed_labels, compressed_probabilities, _ = reduced.predict(X_holdout)
+    deviation = np.abs(compressed_probabilities - probabilities).max(axis=1)
+    flips = int(np.sum(compressed_labels != labels))
+
+    report = {"rows": len(X_holdout)}
+    for name, predictor, model_params in (("original", original, params), ("compressed", reduced, compressed)):
+        single_ms, batch_ms = _latency(predictor, X_holdout)
+        report[name] = {
+            "support_vectors": int(len(model_params["support_vectors"])),
+            "storage_dtype": str(model_params["support_vectors"].dtype),
+            "stored_bytes": int(model_params["support_vectors"].nbytes + np.asarray(model_params["dual_coef"]).nbytes),
+            "loaded_bytes": int(predictor.support_vectors.nbytes + predictor.dual_coef.nbytes),
+            "p50_single_row_ms": single_ms,
+            "batch_ms": batch_ms
+        }
+    report["fidelity"] = {
+        "max_probability_diff": float(deviation.max()) if len(deviation) else 0.0,
+        "mean_probability_diff": float(deviation.mean()) if len(deviation) else 0.0,
+        "decision_flips": flips,
+        "flip_rate": flips / len(X_holdout) if len(X_holdout) else 0.0
+    }
+    return report
+
+def print_compression_report(report):
+    columns = ["support_vectors", "storage_dtype", "stored_bytes", "loaded_bytes", "p50_single_row_ms", "batch_ms"]
+    print(f"{'model':<12}" + "".join(f"{column:>19}" for column in columns))
+    for name in ("original", "compressed"):
+        cells = []
+        for column in columns:
+            value = report[name][column]
+            cells.append(f"{value:>19.4f}" if isinstance(value, float) else f"{str(value):>19}")
+        print(f"{name:<12}" + "".join(cells))
+    fidelity = report["fidelity"]
+    print(f"On {report['rows']} held-out rows: max |probability diff| {fidelity['max_probability_diff']:.2e}, "
+          f"mean {fidelity['mean_probability_diff']:.2e}, "
+          f"{fidelity['decision_flips']} decision flips ({fidelity['flip_rate']:.2%})")
+
+def export_compressed_model(model, feature_names, column_info, X_fit, X_holdout, model_dir="ml_model",
+                            version=None, method="reduced", n_centers=None, tolerance=1e-3,
+                            storage_dtype="float32"):
+    """
+    Compress the scaler + RBF SVC model, report its fidelity on X_holdout
+    and write it to model_dir/svm_compressed in the NumPy export format,
+    with the report in its meta.json. Returns the report, or None for
+    models the fused predictor does not cover
+    """
+    if not FusedSVMPredictor.supports(model):
+        print("Compression skipped: only scaler + binary RBF SVC pipelines are supported")
+        return None
+
+    params = svm_parameters(model)
+    start = time.perf_counter()
+    compressed = compress_svm(params, X_fit, method, n_centers, tolerance, storage_dtype)
+    report = {
+        "method": method,
+        "tolerance": tolerance if method == "prune" else None,
+        "compress_seconds": time.perf_counter() - start,
+        **fidelity_report(params, compressed, X_holdout)
+    }
+    print_compression_report(report)
+
+    # Outputs differ from the full model's, so cached results must not be shared
+    digest = hashlib.sha256(np.ascontiguousarray(compressed["support_vectors"]).tobytes()
+                            + np.asarray(compressed["dual_coef"]).tobytes()).hexdigest()[:8]
+    X_holdout = np.asarray(X_holdout, dtype=np.float64)
+    compressed["sample_X"] = X_holdout[:100]
+    _, compressed["sample_probabilities"], _ = FusedSVMPredictor.from_parameters(
+        compressed, compute_dtype(compressed["support_vectors"].dtype)
+    ).predict(compressed["sample_X"])
+    write_numpy_model(compressed, feature_names, column_info, os.path.join(model_dir, COMPRESSED_MODEL_DIR),
+                      f"{version}-{digest}" if version else digest, {"compression": report})
+    return report
@@ -0,0 +1,115 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Categorical levels and their probabilities, as in the original notebook
+CATEGORIES = {
+    "person_gender": (["male", "female"], [0.52, 0.48]),
+    "person_education": (
+        ["High School", "Bachelor", "Associate", "Master", "Doctorate"],
+        [0.3, 0.4, 0.15, 0.1, 0.05]
+    ),
+    "person_home_ownership": (["RENT", "OWN", "MORTGAGE", "OTHER"], [0.4, 0.2, 0.35, 0.05]),
+    "loan_intent": (
+        ["EDUCATION", "PERSONAL", "MEDICAL", "VENTURE", "HOMEIMPROVEMENT", "DEBTCONSOLIDATION"],
+        [0.15, 0.3, 0.15, 0.1, 0.2, 0.1]
+    ),
+    "previous_loan_defaults_on_file": (["Yes", "No"], [0.2, 0.8])
+}
+
+def generate_applicants(n_samples, random_state):
+    """
+    Synthetic applicants with the notebook's distributions and approval
+    logic. random_state is a numpy Generator or a legacy RandomState; both
+    draw the same columns in the same order
+    """
+    # Create base dataframe with numerical features
+    data = {
+        'person_age': random_state.normal(35, 12, n_samples).clip(18, 80).round(),
+        'person_income': random_state.lognormal(10.5, 0.6, n_samples).round(),
+        'person_emp_exp': random_state.normal(5, 4, n_samples).clip(0, 30).round(),
+        'loan_amnt': random_state.lognormal(9.5, 0.8, n_samples).round(),
+        'loan_int_rate': (random_state.normal(12, 3, n_samples).clip(5, 25) * 10).round() / 10,
+        'loan_percent_income': (random_state.normal(0.2, 0.1, n_samples).clip(0.01, 0.5) * 100).round() / 100,
+        'cb_person_cred_hist_length': random_state.normal(8, 6, n_samples).clip(0, 30).round(),
+        'credit_score': random_state.normal(680, 80, n_samples).clip(300, 850).round()
+    }
+
+    df = pd.DataFrame(data)
+
+    # Add categorical variables
+    for column, (levels, probabilities) in CATEGORIES.items():
+        df[column] = random_state.choice(levels, size=n_samples, p=probabilities)
+
+    # Higher probability of approval for higher income, better credit score, etc.
+    prob_approval = 0.5 + 0.2 * (df['credit_score'] > 700) \
+                  - 0.3 * (df['previous_loan_defaults_on_file'] == 'Yes') \
+                  + 0.2 * (df['person_income'] > 75000) \
+                  - 0.1 * (df['loan_percent_income'] > 0.3) \
+                  + 0.1 * (df['person_education'].isin(['Bachelor', 'Master', 'Doctorate']))
+
+    # Clip probabilities to [0.1, 0.9] range to maintain some randomness
+    prob_approval = prob_approval.clip(0.1, 0.9)
+
+    # Generate target (1=approved, 0=rejected)
+    df['loan_status'] = random_state.binomial(1, prob_approval)
+    return df
+
+def notebook_dataset(n_samples=1000, seed=42):
+    """
+    The in-memory dataset notebook_model_export.py has always trained on
+    (same seed, same global-RandomState stream)
+    """
+    return generate_applicants(n_samples, np.random.RandomState(seed))
+
+def part_path(out_dir, index, file_format):
+    return os.path.join(out_dir, f"part-{index:05d}.{file_format}")
+
+def write_part(out_dir, index, n_rows, seed_sequence, file_format):
+    """
+    Generate and write one part file. Each part has its own child
+    SeedSequence, so its contents depend only on the seed and the part
+    index, not on which worker wrote it
+    """
+    df = generate_applicants(n_rows, np.random.default_rng(seed_sequence))
+    path = part_path(out_dir, index, file_format)
+    temporary = path + ".tmp"
+    if file_format == "parquet":
+        df.to_parquet(temporary, index=False)
+    else:
+        df.to_csv(temporary, index=False)
+    os.replace(temporary, path)
+    return n_rows
+
+def write_synthetic(out_dir, rows, part_rows=1000000, seed=42, workers=None, file_format="parquet"):
+    """
+    Stream rows synthetic applicants to part files in out_dir, generated in
+    parallel across processes. Existing parts are kept, so an interrupted
+    run can be continued with the same arguments
+    """
+    if file_format not in ("parquet", "csv"):
+        raise ValueError(f"Unknown format {file_format!r}; expected parquet or csv")
+    os.makedirs(out_dir, exist_ok=True)
+    n_parts = (rows + part_rows - 1) // part_rows
+    seeds = np.random.SeedSequence(seed).spawn(n_parts)
+
+    start = time.perf_counter()
+    written = 0
+    with ProcessPoolExecutor(workers) as pool:
+        futures = []
+        for index in range(n_parts):
+            n_rows = min(part_rows, rows - index * part_rows)
+            if os.path.exists(part_path(out_dir, index, file_format)):
+                continue
+            futures.append(pool.submit(write_part, out_dir, index, n_rows, seeds[index], file_format))
+        for future in futures:
+            written += future.result()
+
+    seconds = time.perf_counter() - start
+    print(f"Wrote {written} rows in {len(futures)} parts to {os.path.abspath(out_dir)} "
+          f"({n_parts - len(futures)} parts already present) in {seconds:.1f}s "
+          f"({written / max(seconds, 1e-9):.0f} rows/s)")
+    return written
@@ -0,0 +1,48 @@
+import os
+import pickle
+import sys
+
+import pytest
+
+# The server modules are flat scripts in python/, imported by name
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PYTHON_DIR)
+
+MODEL_DIR = os.path.join(PYTHON_DIR, "ml_model")
+
+def _load(name):
+    with open(os.path.join(MODEL_DIR, name), "rb") as f:
+        return pickle.load(f)
+
+@pytest.fixture(scope="session")
+def model_dir():
+    if not os.path.exists(os.path.join(MODEL_DIR, "svm_model.pkl")):
+        pytest.skip("No exported model in ml_model; run train.py first")
+    return MODEL_DIR
+
+@pytest.fixture(scope="session")
+def feature_names(model_dir):
+    return _load("feature_names.pkl")
+
+@pytest.fixture(scope="session")
+def column_info(model_dir):
+    return _load("column_info.pkl")
+
+@pytest.fixture(scope="session")
+def svm_model(model_dir):
+    return _load("svm_model.pkl")
+
+@pytest.fixture(scope="session")
+def api_server(model_dir):
+    """
+    The api_server module with auditing, drift monitoring and the prediction
+    cache off, imported from python/ since its paths are relative
+    """
+    os.environ.update(AUDIT_LOG_DIR="", DRIFT_MONITOR="0", PREDICTION_CACHE_SIZE="0")
+    os.chdir(PYTHON_DIR)
+    import api_server
+    return api_server
+
+@pytest.fixture
+def client(api_server):
+    return api_server.app.test_client()
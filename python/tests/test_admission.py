@@ -0,0 +1,26 @@
+from admission import AdmissionController
+
+def test_stale_estimate_lets_a_probe_through():
+    control = AdmissionController(4, probe_interval=1.0)
+    admission = control.admit("single", 0.0)
+    control.release(admission, 0.5)
+    refreshed = control.refreshed["single"]
+
+    # A 100 ms budget is below the 500 ms estimate
+    assert control.admit("single", refreshed + 0.1, deadline=refreshed + 0.2).action == "degrade"
+    probe = control.admit("single", refreshed + 1.5, deadline=refreshed + 1.6)
+    assert (probe.action, probe.reason) == ("model", "probe")
+    # Only one probe per interval
+    assert control.admit("single", refreshed + 1.6, deadline=refreshed + 1.7).action == "degrade"
+
+    control.release(probe, 0.002)
+    assert control.estimate("single") == 0.002
+    assert control.admit("single", refreshed + 1.7, deadline=refreshed + 1.8).action == "model"
+    assert control.stats()["probes"] == 1
+
+def test_requests_without_a_rules_only_answer_are_rejected():
+    control = AdmissionController(1)
+    control.admit("single", 0.0)
+    admission = control.admit("what_if", 0.0, degradable=False)
+    assert (admission.action, admission.reason) == ("reject", "overload")
+    assert control.stats()["rejected"] == {"overload": 1}
@@ -0,0 +1,141 @@
+import json
+
+from test_feature_encoder import SAMPLE_APPLICANTS
+
+def test_batch_reports_unencodable_rows_individually(client):
+    rows = [
+        SAMPLE_APPLICANTS[0],
+        {**SAMPLE_APPLICANTS[0], "person_gender": ["male"]},
+        {**SAMPLE_APPLICANTS[0], "person_income": 10 ** 400},
+        SAMPLE_APPLICANTS[1]
+    ]
+    response = client.post("/predict/batch", data=json.dumps(rows), content_type="application/json")
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert "approvalStatus" in results[0] and "approvalStatus" in results[3]
+    assert results[1] == {"error": "Invalid value for person_gender: expected a string"}
+    assert results[2] == {"error": "Invalid value for person_income: number out of range"}
+
+def test_ndjson_stream_reports_unencodable_rows_individually(client):
+    rows = [SAMPLE_APPLICANTS[0], {**SAMPLE_APPLICANTS[0], "loan_intent": {"a": 1}}, SAMPLE_APPLICANTS[1]]
+    body = "\n".join(json.dumps(row) for row in rows)
+    response = client.post("/predict/batch", data=body, content_type="application/x-ndjson")
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert results[-1]["summary"]["errors"] == 1
+    assert "error" not in results[0] and "error" not in results[2]
+    assert results[1]["error"] == "Invalid value for loan_intent: expected a string"
+
+def test_what_if_rejects_unencodable_applicant(client):
+    body = {
+        "applicant": {**SAMPLE_APPLICANTS[0], "person_education": 3},
+        "ranges": {"loan_amnt": {"min": 1000, "max": 5000, "step": 1000}}
+    }
+    response = client.post("/what-if", json=body)
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid value for person_education: expected a string"
+
+class Recorder:
+    """
+    Stands in for the audit log or the drift monitor and keeps what it is given
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def record(self, event):
+        self.records.append(event)
+
+def test_predict_audits_each_decision_once(api_server, client, monkeypatch):
+    audit_log = Recorder()
+    monkeypatch.setattr(api_server, "audit_log", audit_log)
+    response = client.post("/predict", json=SAMPLE_APPLICANTS[0])
+    assert response.status_code == 200
+    assert [record["path"] for record in audit_log.records] == ["single"]
+    assert audit_log.records[0]["modelProbabilities"] is not None
+
+def test_format_result_and_warm_up_do_not_audit(api_server, monkeypatch):
+    import serve
+
+    audit_log = Recorder()
+    monkeypatch.setattr(api_server, "audit_log", audit_log)
+    api_server.format_result(None, None, SAMPLE_APPLICANTS[0])
+    serve.warm_up()
+    assert audit_log.records == []
+    assert api_server.audit_log is audit_log
+
+def test_warm_up_and_test_cases_are_not_counted_for_drift(api_server, client, monkeypatch):
+    import serve
+
+    drift_monitor = Recorder()
+    monkeypatch.setattr(api_server, "drift_monitor", drift_monitor)
+    serve.warm_up()
+    assert client.get("/test-cases").status_code == 200
+    assert drift_monitor.records == []
+    assert api_server.drift_monitor is drift_monitor
+    client.post("/predict", json=SAMPLE_APPLICANTS[0])
+    assert drift_monitor.records == [SAMPLE_APPLICANTS[0]]
+
+WHAT_IF_BODY = {
+    "applicant": SAMPLE_APPLICANTS[0],
+    "ranges": {"loan_amnt": {"min": 1000, "max": 20000, "step": 1000}}
+}
+
+def test_what_if_is_admission_controlled(api_server, client, monkeypatch):
+    assert client.post("/what-if", json=WHAT_IF_BODY).status_code == 200
+    assert api_server.admission_control.estimate("what_if") > 0
+
+    monkeypatch.setattr(api_server.admission_control, "max_inflight", 0)
+    response = client.post("/what-if", json=WHAT_IF_BODY)
+    assert response.status_code == 503
+    assert response.get_json()["reason"] == "overload"
+    assert "Retry-After" in response.headers
+
+def test_what_if_with_expired_deadline_is_rejected(client):
+    response = client.post("/what-if", json=WHAT_IF_BODY, headers={"X-Request-Deadline-Ms": "0"})
+    assert response.status_code == 503
+
+def test_running_totals_are_exported_as_counters(client):
+    client.post("/predict", json=SAMPLE_APPLICANTS[0])
+    text = client.get("/metrics").get_data(as_text=True)
+    assert "# TYPE admission_decisions_total counter" in text
+    assert 'admission_decisions_total{outcome="admitted",reason="model"}' in text
+    assert "# TYPE admission_inflight gauge" in text
+    assert "# TYPE admission_decisions gauge" not in text
+
+def test_reload_with_unchanged_champion_keeps_its_state(api_server, monkeypatch):
+    installs = []
+    monkeypatch.setattr(api_server, "install_champion", installs.append)
+    active_model = api_server.active_model
+    assert api_server.load_model()
+    assert installs == []
+    assert api_server.active_model is active_model
+
+def test_micro_batched_predict_scores_with_the_request_bundle(api_server, client, monkeypatch):
+    audit_log = Recorder()
+    monkeypatch.setattr(api_server, "audit_log", audit_log)
+    monkeypatch.setattr(api_server, "MICRO_BATCH", True)
+    bundle = api_server.active_model
+    # Without the schema decoder, rows are only validated by score_batch
+    monkeypatch.setattr(bundle, "decoder", None)
+
+    response = client.post("/predict", json=SAMPLE_APPLICANTS[0])
+    assert response.status_code == 200
+    assert [record["path"] for record in audit_log.records] == ["single"]
+
+    response = client.post("/predict", json={**SAMPLE_APPLICANTS[0], "person_gender": ["male"]})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid value for person_gender: expected a string"}
+
+    # A reload during the window must not move queued requests to the new bundle
+    calls = []
+
+    def score_batch(rows, **kwargs):
+        calls.append((kwargs["bundle"], rows))
+        return [{"row": row["id"]} for row in rows]
+
+    monkeypatch.setattr(api_server, "score_batch", score_batch)
+    other = object()
+    items = [(bundle, {"id": 0}), (other, {"id": 1}), (bundle, {"id": 2})]
+    assert api_server.score_micro_batch(items) == [{"row": 0}, {"row": 1}, {"row": 2}]
+    assert calls == [(bundle, [{"id": 0}, {"id": 2}]), (other, [{"id": 1}])]
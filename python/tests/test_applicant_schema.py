@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from applicant_schema import ApplicantDecoder, SchemaError
+from feature_encoder import FeatureEncoder
+from test_feature_encoder import SAMPLE_APPLICANTS
+
+@pytest.fixture
+def decoder(feature_names, column_info):
+    return ApplicantDecoder(FeatureEncoder(feature_names, column_info))
+
+def field_errors(decoder, data):
+    with pytest.raises(SchemaError) as error:
+        decoder.decode(data)
+    return {detail["field"]: detail["error"] for detail in error.value.errors}
+
+def test_decode_matches_encoder(decoder, feature_names, column_info):
+    applicant, row = decoder.decode(SAMPLE_APPLICANTS[0])
+    assert applicant == SAMPLE_APPLICANTS[0]
+    assert np.array_equal(row, FeatureEncoder(feature_names, column_info).encode(SAMPLE_APPLICANTS[0]))
+
+@pytest.mark.parametrize("value", [10 ** 400, -10 ** 400], ids=["huge", "huge_negative"])
+def test_int_too_large_for_a_float_is_a_field_error(decoder, value):
+    errors = field_errors(decoder, {**SAMPLE_APPLICANTS[0], "loan_amnt": value})
+    assert list(errors) == ["loan_amnt"]
+    assert errors["loan_amnt"].startswith("Must be")
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf")])
+def test_non_finite_number_is_a_field_error(decoder, value):
+    errors = field_errors(decoder, {**SAMPLE_APPLICANTS[0], "credit_score": value})
+    assert errors == {"credit_score": "Expected a finite number"}
@@ -0,0 +1,33 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import bulk_score
+from test_feature_encoder import SAMPLE_APPLICANTS
+
+@pytest.fixture
+def worker(model_dir, monkeypatch):
+    monkeypatch.setattr(bulk_score, "worker", {})
+    bulk_score.load_worker(model_dir, os.path.join(os.path.dirname(model_dir), "business_rules.json"), False)
+
+def test_unencodable_rows_get_an_error_and_the_rest_are_scored(worker):
+    chunk = pd.DataFrame([SAMPLE_APPLICANTS[0], {**SAMPLE_APPLICANTS[1], "person_gender": 3},
+                          SAMPLE_APPLICANTS[1]])
+    results = bulk_score.score_chunk(10, chunk)
+    assert results["row"].tolist() == [10, 11, 12]
+    errors = results["error"]
+    assert errors.isna().tolist() == [True, False, True]
+    assert errors[1] == "Invalid value for person_gender: expected a string"
+    assert results["status"].notna().tolist() == [True, False, True]
+    assert results["model_probability"].notna().tolist() == [True, False, True]
+
+def test_resuming_with_another_float32_setting_is_refused(tmp_path):
+    manifest = {"source": "a", "model": "b", "rules": "c", "chunksize": 10, "use_float32": False}
+    bulk_score.check_manifest(str(tmp_path), manifest)
+    bulk_score.check_manifest(str(tmp_path), manifest)
+    with pytest.raises(ValueError, match="float32"):
+        bulk_score.check_manifest(str(tmp_path), {**manifest, "use_float32": True})
+    with open(tmp_path / "manifest.json") as f:
+        assert json.load(f) == manifest
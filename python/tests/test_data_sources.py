@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from data_sources import TARGET, learn_vocabulary
+
+def write_csv(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+def test_levels_are_collected_from_every_chunk(tmp_path):
+    source = write_csv(tmp_path / "data.csv", [
+        {"grade": None, "income": 1.0, TARGET: 0},
+        {"grade": "A", "income": 2.0, TARGET: 1},
+        {"grade": "B", "income": None, TARGET: 0}
+    ])
+    vocabulary = learn_vocabulary(source, chunksize=1)
+    assert vocabulary["numeric_columns"] == ["income"]
+    assert vocabulary["categorical_columns"] == ["grade"]
+    assert vocabulary["levels"] == {"grade": ["A", "B"]}
+    assert vocabulary["rows"] == 3
+
+def test_column_changing_type_between_chunks_is_an_error(tmp_path):
+    source = write_csv(tmp_path / "data.csv", [
+        {"term": 36, TARGET: 0}, {"term": 60, TARGET: 1}, {"term": "long", TARGET: 0}
+    ])
+    with pytest.raises(ValueError, match="Column term is numeric in earlier rows but categorical from row 2"):
+        learn_vocabulary(source, chunksize=2)
+    # Read as one chunk, the column is categorical throughout
+    assert learn_vocabulary(source, chunksize=3)["levels"] == {"term": ["36", "60", "long"]}
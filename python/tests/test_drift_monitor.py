@@ -0,0 +1,57 @@
+import json
+import os
+import time
+
+import pytest
+
+from drift_monitor import OTHER, REFERENCE_PROFILE, DriftMonitor
+from test_feature_encoder import SAMPLE_APPLICANTS
+
+@pytest.fixture
+def profile(model_dir):
+    with open(os.path.join(model_dir, REFERENCE_PROFILE)) as f:
+        return json.load(f)
+
+def wait_for_samples(monitor, samples, timeout=5):
+    deadline = time.monotonic() + timeout
+    while monitor.report()["samples"] < samples and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return monitor.report()
+
+def test_unusual_values_are_counted_as_other_or_missing(profile):
+    monitor = DriftMonitor(profile)
+    rows = [
+        {**SAMPLE_APPLICANTS[0], "person_gender": ["male"], "loan_amnt": 10 ** 400},
+        {**SAMPLE_APPLICANTS[0], "person_gender": {"a": 1}, "loan_amnt": "a lot"},
+        {**SAMPLE_APPLICANTS[0], "person_gender": 3, "loan_amnt": True}
+    ]
+    numeric, categorical = monitor._counts(rows)
+    assert categorical["person_gender"][monitor.levels["person_gender"][OTHER]] == 3
+    assert numeric["loan_amnt"][-1] == 3
+
+def test_background_thread_survives_a_bad_batch(profile, monkeypatch):
+    monitor = DriftMonitor(profile, flush_interval=0.01)
+    update = monitor._update
+    calls = []
+
+    def fail_once(rows):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise ValueError("bad batch")
+        update(rows)
+
+    monkeypatch.setattr(monitor, "_update", fail_once)
+    monitor.record(SAMPLE_APPLICANTS[0])
+    while not calls:
+        time.sleep(0.01)
+    monitor.record(SAMPLE_APPLICANTS[1])
+    assert wait_for_samples(monitor, 1)["samples"] == 1
+    monitor.close()
+
+def test_backlog_is_drained_without_pausing_between_batches(profile):
+    # At one batch per flush interval this backlog would take 20 s
+    monitor = DriftMonitor(profile, max_queue=20000, batch_size=100, flush_interval=0.1)
+    for _ in range(20000):
+        monitor.record(SAMPLE_APPLICANTS[0])
+    assert wait_for_samples(monitor, 20000, timeout=10)["samples"] == 20000
+    monitor.close()
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from feature_encoder import FeatureEncoder, encode_with_pandas
+
+@pytest.fixture
+def encoder(feature_names, column_info):
+    return FeatureEncoder(feature_names, column_info)
+
+def random_applicants(encoder, column_info, n=1000, seed=42):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n):
+        row = {col: float(rng.normal(100, 50)) for col in column_info["numeric_columns"]}
+        for col, positions in encoder.category_positions.items():
+            choices = list(positions) + ["Unknown"]
+            row[col] = choices[rng.integers(len(choices))]
+        # Randomly omit a field to exercise the defaults
+        if rng.random() < 0.2:
+            del row[list(row)[rng.integers(len(row))]]
+        rows.append(row)
+    return rows
+
+SAMPLE_APPLICANTS = [
+    {
+        "person_age": 35, "person_gender": "male", "person_education": "Bachelor",
+        "person_income": 85000, "person_emp_exp": 10, "person_home_ownership": "MORTGAGE",
+        "loan_amnt": 15000, "loan_intent": "HOMEIMPROVEMENT", "loan_int_rate": 7.5,
+        "loan_percent_income": 0.18, "cb_person_cred_hist_length": 12, "credit_score": 750,
+        "previous_loan_defaults_on_file": "No"
+    },
+    {
+        "person_age": 22, "person_gender": "female", "person_education": "High School",
+        "person_income": 18000, "person_emp_exp": 0, "person_home_ownership": "RENT",
+        "loan_amnt": 9000, "loan_intent": "PERSONAL", "loan_int_rate": 18.9,
+        "loan_percent_income": 0.5, "cb_person_cred_hist_length": 1, "credit_score": 540,
+        "previous_loan_defaults_on_file": "Yes"
+    },
+    # Missing fields, an unseen category and a non-numeric numeric field
+    {"person_age": 40, "loan_intent": "VACATION", "person_income": "unknown"},
+    {}
+]
+
+def test_sample_applicants_match_pandas(encoder, feature_names, column_info):
+    expected = encode_with_pandas(SAMPLE_APPLICANTS, feature_names, column_info)
+    assert np.array_equal(encoder.encode_batch(SAMPLE_APPLICANTS), expected)
+
+def test_batch_matches_pandas(encoder, feature_names, column_info):
+    rows = random_applicants(encoder, column_info)
+    expected = encode_with_pandas(rows, feature_names, column_info)
+    assert np.array_equal(encoder.encode_batch(rows), expected)
+
+def test_single_row_matches_pandas(encoder, feature_names, column_info):
+    rows = random_applicants(encoder, column_info, n=200, seed=7)
+    expected = encode_with_pandas(rows, feature_names, column_info)
+    assert np.array_equal(np.vstack([encoder.encode(row) for row in rows]), expected)
+
+def test_reused_output_buffer_is_cleared(encoder, feature_names, column_info):
+    out = np.full((len(SAMPLE_APPLICANTS), encoder.n_features), 9.0)
+    encoder.encode_batch(SAMPLE_APPLICANTS, out)
+    assert np.array_equal(out, encode_with_pandas(SAMPLE_APPLICANTS, feature_names, column_info))
+
+@pytest.mark.parametrize("field, value, message", [
+    ("person_gender", ["male"], "expected a string"),
+    ("loan_intent", {"value": "PERSONAL"}, "expected a string"),
+    ("person_income", 10 ** 400, "number out of range"),
+    ("loan_amnt", -10 ** 400, "number out of range"),
+])
+def test_validate_rejects_unencodable_values(encoder, field, value, message):
+    error = encoder.validate({**SAMPLE_APPLICANTS[0], field: value})
+    assert error == f"Invalid value for {field}: {message}"
+
+def test_validate_accepts_sample_applicants(encoder):
+    assert all(encoder.validate(row) is None for row in SAMPLE_APPLICANTS)
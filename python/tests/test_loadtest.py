@@ -0,0 +1,25 @@
+import numpy as np
+
+from loadtest import arrival_times
+
+def test_ramp_from_zero_schedules_the_integrated_count():
+    times, stage_of = arrival_times([(0, 100, 10)])
+    # 0 -> 100 rps over 10 s is 500 requests, 125 of them in the first half
+    assert len(times) == 499
+    assert set(stage_of) == {0}
+    assert np.all(np.diff(times) > 0)
+    assert 0 < times[0] and times[-1] < 10
+    assert sum(t < 5 for t in times) == 124
+
+def test_constant_rate_and_stage_offsets():
+    times, stage_of = arrival_times([(50, 50, 2), (0, 0, 1), (10, 10, 1)])
+    assert stage_of.count(0) == 99
+    assert stage_of.count(1) == 0
+    assert np.allclose(times[:3], [0.02, 0.04, 0.06])
+    assert np.allclose(times[99:], np.arange(1, 10) / 10 + 3)
+
+def test_poisson_ramp_down_stays_in_the_stage():
+    times, _ = arrival_times([(100, 0, 10)], poisson=True)
+    assert abs(len(times) - 500) < 100
+    assert np.all(np.diff(times) > 0) and times[-1] < 10
+    assert sum(t < 5 for t in times) > 2 * sum(t >= 5 for t in times)
@@ -0,0 +1,37 @@
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from micro_batcher import MicroBatcher
+
+def slow_batcher(scored, release, started=None):
+    def score(items):
+        scored.extend(items)
+        if started is not None:
+            started.set()
+        release.wait(5)
+        return [item * 2 for item in items]
+    return MicroBatcher(score, max_batch_size=1, max_wait_ms=0)
+
+def test_timed_out_item_is_never_scored():
+    scored, release, started = [], threading.Event(), threading.Event()
+    batcher = slow_batcher(scored, release, started)
+    first = threading.Thread(target=batcher.submit, args=(1,))
+    first.start()
+    started.wait(5)
+    # The worker is busy with the first item, so the second waits in the queue
+    with pytest.raises(FutureTimeoutError):
+        batcher.submit(2, timeout=0.05)
+    release.set()
+    first.join()
+    assert batcher.submit(3, timeout=5) == 6
+    assert scored == [1, 3]
+    assert batcher.stats()["cancelled"] == 1
+
+def test_item_already_being_scored_returns_its_result():
+    scored, release = [], threading.Event()
+    batcher = slow_batcher(scored, release)
+    threading.Timer(0.3, release.set).start()
+    assert batcher.submit(4, timeout=0.05) == 8
+    assert batcher.stats()["cancelled"] == 0
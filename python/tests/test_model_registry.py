@@ -0,0 +1,46 @@
+import shutil
+
+import pytest
+
+from model_registry import ModelRegistry
+from numpy_model import NUMPY_MODEL_DIR
+
+@pytest.fixture
+def svc_without_numpy_export(model_dir, tmp_path):
+    copy = tmp_path / "svm"
+    shutil.copytree(model_dir, copy)
+    shutil.rmtree(copy / NUMPY_MODEL_DIR)
+    return str(copy)
+
+def test_svc_without_numpy_export_fails_to_load(svc_without_numpy_export):
+    registry = ModelRegistry({"svm": svc_without_numpy_export}, "svm", runtime="numpy")
+    assert not registry.load()
+    assert NUMPY_MODEL_DIR in registry.errors["svm"]
+    assert registry.champion is None
+
+def test_svc_without_export_fails_as_challenger_too(model_dir, svc_without_numpy_export):
+    registry = ModelRegistry({"svm": model_dir, "copy": svc_without_numpy_export}, "svm", runtime="numpy")
+    assert registry.load()
+    assert registry.champion.runtime == "numpy"
+    assert "copy" in registry.errors
+    assert registry.challengers() == []
+
+@pytest.fixture
+def logreg_model_dir(feature_names, column_info, tmp_path):
+    import numpy as np
+    import pandas as pd
+
+    from model_training import build_model, save_artifacts
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, len(feature_names))), columns=feature_names)
+    y = (X[feature_names[0]] > 0).astype(int)
+    model_dir = str(tmp_path / "logreg")
+    save_artifacts(build_model("logreg").fit(X, y), X, column_info, model_dir)
+    return model_dir
+
+def test_non_svc_challenger_falls_back_to_pickle(model_dir, logreg_model_dir):
+    registry = ModelRegistry({"svm": model_dir, "logreg": logreg_model_dir}, "svm", runtime="numpy")
+    assert registry.load()
+    assert registry.errors == {}
+    assert dict(registry.challengers())["logreg"].runtime == "pickle"
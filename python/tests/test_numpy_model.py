@@ -0,0 +1,45 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from model_store import ModelBundle
+from numpy_model import NumpyModel, export_numpy_model
+from test_feature_encoder import SAMPLE_APPLICANTS
+
+@pytest.fixture(scope="module")
+def X(svm_model):
+    scaler = svm_model.named_steps["scaler"]
+    rng = np.random.default_rng(42)
+    return rng.normal(scaler.mean_, scaler.scale_, size=(10000, scaler.n_features_in_))
+
+@pytest.fixture
+def exported(svm_model, feature_names, column_info, X, tmp_path):
+    export_numpy_model(svm_model, feature_names, column_info, str(tmp_path), "test", X[:100])
+    return NumpyModel(str(tmp_path))
+
+def test_export_matches_sklearn(svm_model, exported, X):
+    exported.check()
+    labels, probabilities, _ = exported.predictor.predict(X)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        expected = svm_model.predict_proba(X)
+    assert np.abs(probabilities - expected).max() < 1e-9
+    assert np.array_equal(labels, svm_model.classes_[expected.argmax(axis=1)])
+
+def test_applicants_score_like_the_pickle_runtime(model_dir, exported):
+    bundle = ModelBundle(model_dir)
+    _, expected, _ = bundle.predictor.predict(bundle.encoder.encode_batch(SAMPLE_APPLICANTS))
+    _, probabilities, _ = exported.predict(SAMPLE_APPLICANTS)
+    assert np.abs(probabilities - expected).max() < 1e-9
+
+def test_bundled_export_matches_the_pickle(model_dir):
+    numpy_model = NumpyModel(model_dir)
+    numpy_model.check()
+    assert numpy_model.version == ModelBundle(model_dir).version
+
+def test_bundled_compressed_export_stays_float32(model_dir):
+    bundle = ModelBundle(model_dir, runtime="compressed")
+    bundle.check()
+    assert bundle.predictor.support_vectors.dtype == np.float32
+    assert bundle.predictor.support_vectors.nbytes < ModelBundle(model_dir).predictor.support_vectors.nbytes
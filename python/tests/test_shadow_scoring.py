@@ -0,0 +1,43 @@
+import numpy as np
+
+from shadow_scoring import ShadowScorer
+
+class Predictor:
+    classes_ = np.array([0, 1])
+
+    def __init__(self, approve):
+        self.approve = approve
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        probabilities = np.tile([1 - self.approve, self.approve], (len(X), 1))
+        return (probabilities[:, 1] > 0.5).astype(int), probabilities, None
+
+class Bundle:
+    feature_names = ["x"]
+
+    def __init__(self, approve, version):
+        self.predictor = Predictor(approve)
+        self.version = version
+
+def test_champion_is_timed_from_the_request_path_not_rescored():
+    scorer = ShadowScorer()
+    champion, challenger = Bundle(0.9, "a"), Bundle(0.2, "b")
+    labels, probabilities, _ = champion.predictor.predict(np.zeros((4, 1)))
+    champion.predictor.calls = 0
+    jobs = [
+        (scorer.generation, [{}] * 2, np.zeros((2, 1)), champion, labels[:2], probabilities[:2],
+         [("challenger", challenger)], 0.004),
+        (scorer.generation, [{}] * 2, np.zeros((2, 1)), champion, labels[2:], probabilities[2:],
+         [("challenger", challenger)], 0.002)
+    ]
+    scorer._score(scorer.generation, jobs)
+
+    assert champion.predictor.calls == 0
+    assert challenger.predictor.calls == 1
+    report = scorer.comparisons()["challenger"]
+    assert report["rows"] == 4
+    assert report["agreementRate"] == 0.0
+    assert report["championMeanRowMs"] == 1.5
+    assert report["approvalRateDelta"] == -1.0
@@ -0,0 +1,38 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from svm_inference import FusedSVMPredictor, build_predictor
+
+@pytest.fixture(scope="module")
+def X(svm_model):
+    scaler = svm_model.named_steps["scaler"]
+    rng = np.random.default_rng(42)
+    return rng.normal(scaler.mean_, scaler.scale_, size=(1000, scaler.n_features_in_))
+
+@pytest.fixture(scope="module")
+def sklearn_outputs(svm_model, X):
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        return svm_model.predict_proba(X), svm_model.decision_function(X)
+
+def test_model_uses_fused_path(svm_model):
+    assert isinstance(build_predictor(svm_model), FusedSVMPredictor)
+
+@pytest.mark.parametrize("use_float32, tolerance", [(False, 1e-9), (True, 1e-4)])
+def test_fused_matches_sklearn(svm_model, X, sklearn_outputs, use_float32, tolerance):
+    sk_probabilities, sk_decision = sklearn_outputs
+    labels, probabilities, decision = build_predictor(svm_model, use_float32).predict(X)
+    assert np.abs(probabilities - sk_probabilities).max() < tolerance
+    assert np.abs(decision - sk_decision).max() < tolerance * 10
+    # Labels follow the calibrated probabilities, not the sign of the decision value
+    assert np.array_equal(labels, svm_model.classes_[probabilities.argmax(axis=1)])
+
+@pytest.mark.parametrize("batch_size", [1, 7, 100])
+def test_fused_batch_sizes_agree(svm_model, X, sklearn_outputs, batch_size):
+    predictor = build_predictor(svm_model)
+    probabilities = np.vstack([
+        predictor.predict(X[start:start + batch_size])[1] for start in range(0, 200, batch_size)
+    ])
+    assert np.abs(probabilities - sklearn_outputs[0][:len(probabilities)]).max() < 1e-9
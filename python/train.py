@@ -0,0 +1,248 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.model_selection import train_test_split
+
+from data_sources import TARGET, EncodedMatrixCache
+from hyperparameter_search import add_search_arguments, candidates_from_args, run_search
+from model_training import MODEL_KINDS, fit_and_compare, print_report, write_report, column_info_for, save_artifacts
+from svm_compression import METHODS, STORAGE_DTYPES, export_compressed_model
+from synthetic_data import generate_applicants, notebook_dataset, write_synthetic
+
+def encode_frame(df, target=TARGET):
+    """
+    Split a raw DataFrame into one-hot encoded features, labels and the
+    column information the API server needs
+    """
+    X = df.drop(columns=[target])
+    y = df[target]
+    column_info = column_info_for(X)
+
+    # Handle categorical variables with one-hot encoding
+    X = pd.get_dummies(X, drop_first=True)
+
+    # Handle missing values
+    X = X.fillna(0)
+    return X, y, column_info
+
+def load_hugging_face(args):
+    from datasets import load_dataset
+
+    print("Loading dataset from Hugging Face...")
+    ds = load_dataset("thomask1018/credit_card_approval")
+    return encode_frame(ds["train"].to_pandas())
+
+def load_files(args):
+    """
+    Local CSV/Parquet files, through the memory-mapped matrix cache so
+    repeat runs skip parsing and encoding
+    """
+    X, y, metadata = EncodedMatrixCache(args.cache_dir).load_frame(args.data)
+    return X, y, metadata["column_info"]
+
+def load_synthetic(args):
+    print(f"Generating {args.rows} synthetic applicants (seed {args.seed})...")
+    df = generate_applicants(args.rows, np.random.default_rng(args.seed))
+    print("Approval rate:", df[TARGET].mean())
+    return encode_frame(df)
+
+def load_notebook(args):
+    print("Creating dataset with structure matching the original notebook...")
+    df = notebook_dataset()
+    print("Dataset created with shape:", df.shape)
+    print("Approval rate:", df[TARGET].mean())
+    return encode_frame(df)
+
+def load_classification(args):
+    """
+    sklearn's make_classification with applicant column names and random
+    categoricals; needs nothing beyond scikit-learn
+    """
+    from sklearn.datasets import make_classification
+
+    print("Generating synthetic classification dataset...")
+    X, y = make_classification(n_samples=1000, n_features=12, n_informative=8,
+                               n_redundant=2, random_state=args.seed)
+    feature_names = [
+        "person_age", "person_income", "person_emp_exp", "credit_score",
+        "cb_person_cred_hist_length", "loan_amnt", "loan_int_rate",
+        "loan_percent_income", "feature9", "feature10", "feature11", "feature12"
+    ]
+    df = pd.DataFrame(X, columns=feature_names)
+    random_state = np.random.RandomState(args.seed)
+    df["person_gender"] = random_state.choice(["male", "female"], size=1000)
+    df["person_education"] = random_state.choice(["High School", "Bachelor", "Master", "Doctorate"], size=1000)
+    df["person_home_ownership"] = random_state.choice(["RENT", "OWN", "MORTGAGE", "OTHER"], size=1000)
+    df["loan_intent"] = random_state.choice(
+        ["EDUCATION", "PERSONAL", "MEDICAL", "VENTURE", "HOMEIMPROVEMENT", "DEBTCONSOLIDATION"], size=1000
+    )
+    df["previous_loan_defaults_on_file"] = random_state.choice(["Yes", "No"], size=1000, p=[0.2, 0.8])
+    df[TARGET] = y
+    return encode_frame(df)
+
+# Data sources for `train.py fit --source`; each returns (X encoded, y, column_info)
+SOURCES = {
+    "huggingface": load_hugging_face,
+    "files": load_files,
+    "synthetic": load_synthetic,
+    "notebook": load_notebook,
+    "classification": load_classification
+}
+
+def train_and_save(X, y, column_info, kind="svc", n_components=500, candidates=None,
+                   n_folds=5, workers=None, model_dir="ml_model"):
+    """
+    Fit (or search for) the model, print the evaluation and write the
+    artifacts the API server loads
+    """
+    print("Features shape after preprocessing:", X.shape)
+    if candidates:
+        print(f"Searching {len(candidates)} SVC candidates...")
+        model, report, search = run_search(X, y, candidates, n_folds, workers)
+        print_report(report)
+        report["search"] = search
+    else:
+        # Train-test split
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
+
+        print(f"Training {kind} model...")
+        # Scaling + exact RBF SVM, or an approximate-kernel model compared against it
+        model, report = fit_and_compare(kind, X_train, X_test, y_train, y_test, n_components)
+
+        print("Evaluating model...")
+        print_report(report)
+        y_pred = model.predict(X_test)
+        print("\nConfusion Matrix:\n", confusion_matrix(y_test, y_pred))
+        print("\nClassification Report:\n", classification_report(y_test, y_pred))
+    print(f"Model accuracy: {report[kind]['accuracy']:.4f}")
+
+    print("Saving model and feature information...")
+    save_artifacts(model, X, column_info, model_dir)
+    write_report(report, model_dir)
+    return model, list(X.columns)
+
+def compress_export(X, y, model_dir="ml_model", method="reduced", n_centers=None, tolerance=1e-3,
+                    storage_dtype="float32"):
+    """
+    Compress the SVC exported in model_dir: coefficients are refitted on the
+    training split and fidelity is reported on the held-out split, the same
+    split fit uses
+    """
+    from model_store import ModelBundle
+
+    bundle = ModelBundle(model_dir)
+    # Columns as the model was trained on, in case the data lacks a category level
+    X = X.reindex(columns=bundle.feature_names, fill_value=0)
+    X_train, X_test, _, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    print(f"Compressing the support vectors ({method}, {storage_dtype} storage)...")
+    return export_compressed_model(
+        bundle.model, bundle.feature_names, bundle.column_info,
+        X_train.to_numpy(dtype=np.float64), X_test.to_numpy(dtype=np.float64),
+        model_dir, bundle.version, method, n_centers, tolerance, storage_dtype
+    )
+
+def fit_command(args):
+    if args.incremental:
+        from incremental_train import train_incremental
+
+        return train_incremental(args.data, args.model_dir, args.chunksize, args.epochs,
+                                 args.components, args.checkpoint)
+
+    X, y, column_info = SOURCES[args.source](args)
+    candidates = candidates_from_args(args) if args.search else None
+    result = train_and_save(X, y, column_info, args.model, args.components, candidates,
+                            args.folds, args.workers, args.model_dir)
+    if args.compress:
+        compress_export(X, y, args.model_dir, args.compress, args.compress_centers,
+                        args.compress_tolerance, args.compress_dtype)
+    return result
+
+def compress_command(args):
+    X, y, _ = SOURCES[args.source](args)
+    return compress_export(X, y, args.model_dir, args.method, args.centers, args.tolerance, args.dtype)
+
+def generate_command(args):
+    return write_synthetic(args.out_dir, args.rows, args.part_rows, args.seed, args.workers, args.format)
+
+def add_data_arguments(parser):
+    parser.add_argument("--source", choices=sorted(SOURCES),
+                        help="Training data (default: files when --data is given, else huggingface)")
+    parser.add_argument("--data", help="Local CSV/Parquet file, directory of part files or glob")
+    parser.add_argument("--cache-dir", default="data_cache", help="Where encoded matrices of --data are cached")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows for --source synthetic")
+    parser.add_argument("--seed", type=int, default=42)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Train and export the credit approval model")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fit = commands.add_parser("fit", help="Train a model and export it to --model-dir")
+    add_data_arguments(fit)
+    fit.add_argument("--model", choices=MODEL_KINDS, default="svc",
+                     help="svc: exact RBF SVM; rff/nystroem: approximate kernel + calibrated linear SVM; "
+                          "logreg/forest/boosting: challenger models for the server's model registry")
+    fit.add_argument("--components", type=int, default=500,
+                     help="Feature map size for the approximate-kernel models")
+    fit.add_argument("--model-dir", default="ml_model")
+    add_search_arguments(fit)
+    fit.add_argument("--incremental", action="store_true",
+                     help="Out-of-core SGD training that streams --data in chunks")
+    fit.add_argument("--chunksize", type=int, default=100000)
+    fit.add_argument("--epochs", type=int, default=3)
+    fit.add_argument("--checkpoint", default="incremental_checkpoint.pkl")
+    fit.add_argument("--compress", choices=METHODS,
+                     help="Also write a compressed copy of the SVC to svm_compressed (see the compress command)")
+    fit.add_argument("--compress-centers", type=int, help="Support vectors kept by --compress reduced")
+    fit.add_argument("--compress-tolerance", type=float, default=1e-3)
+    fit.add_argument("--compress-dtype", choices=STORAGE_DTYPES, default="float32")
+    fit.set_defaults(handler=fit_command)
+
+    compress = commands.add_parser(
+        "compress",
+        help="Reduce the support vectors of the SVC in --model-dir and write it to svm_compressed"
+    )
+    add_data_arguments(compress)
+    compress.add_argument("--model-dir", default="ml_model")
+    compress.add_argument("--method", choices=METHODS, default="reduced",
+                          help="prune: drop near-zero dual coefficients; reduced: k-means reduced-set approximation")
+    compress.add_argument("--centers", type=int,
+                          help="Support vectors kept by the reduced method (default: a quarter of them)")
+    compress.add_argument("--tolerance", type=float, default=1e-3,
+                          help="prune drops |dual coefficient| below this fraction of the largest")
+    compress.add_argument("--dtype", choices=STORAGE_DTYPES, default="float32",
+                          help="Storage type of the support vectors")
+    compress.set_defaults(handler=compress_command)
+
+    generate = commands.add_parser("generate", help="Write synthetic applicants to part files")
+    generate.add_argument("out_dir")
+    generate.add_argument("--rows", type=int, default=1000000)
+    generate.add_argument("--part-rows", type=int, default=1000000)
+    generate.add_argument("--seed", type=int, default=42)
+    generate.add_argument("--workers", type=int, default=None, help="Processes (default: CPU count)")
+    generate.add_argument("--format", choices=("parquet", "csv"), default="parquet")
+    generate.set_defaults(handler=generate_command)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command in ("fit", "compress"):
+        if args.source is None:
+            args.source = "files" if args.data else "huggingface"
+        if args.source == "files" and not args.data:
+            parser.error("--source files needs --data")
+    if args.command == "fit":
+        if args.incremental and args.source != "files":
+            parser.error("--incremental streams local files; use it with --data")
+        if args.search and args.model != "svc":
+            parser.error("--search tunes the exact SVC; use it with --model svc")
+        if args.compress and (args.incremental or args.model != "svc"):
+            parser.error("--compress reduces the exact SVC's support vectors; use it with --model svc")
+    return args.handler(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import numpy as np
+
+# Fields a what-if request may vary by default
+ADJUSTABLE_FIELDS = ("loan_amnt", "loan_int_rate", "loan_percent_income")
+
+# Values allowed along one axis, so a single range cannot dominate the cap
+MAX_AXIS_VALUES = 1000
+
+def axis_values(field, spec):
+    """
+    Values of one axis: {"values": [...]} or {"min", "max", "step"}
+    (max included when it falls on a step)
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f"Range for {field} must be an object")
+    if "values" in spec:
+        values = spec["values"]
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"values for {field} must be a non-empty list")
+        if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            raise ValueError(f"values for {field} must be numbers")
+        return np.array(values, dtype=np.float64)
+
+    try:
+        low, high, step = (float(spec[key]) for key in ("min", "max", "step"))
+    except KeyError as e:
+        raise ValueError(f"Range for {field} needs min, max and step, or values (missing {e.args[0]})")
+    except (TypeError, ValueError):
+        raise ValueError(f"min, max and step for {field} must be numbers")
+    if step <= 0 or high < low:
+        raise ValueError(f"Range for {field} needs step > 0 and max >= min")
+    count = int(np.floor((high - low) / step + 1e-9)) + 1
+    if count > MAX_AXIS_VALUES:
+        raise ValueError(f"Range for {field} has {count} values; at most {MAX_AXIS_VALUES} per field")
+    # Rounded so that e.g. 0.1 steps do not produce 12.499999999
+    return np.round(low + step * np.arange(count), 10)
+
+def build_grid(ranges, max_grid_size, allowed_fields=ADJUSTABLE_FIELDS):
+    """
+    (fields, axes, columns) for a dict of ranges: the axis values per field,
+    and every combination flattened into one length-n array per field in
+    row-major order, so index i of the grid is np.unravel_index(i, shape)
+    """
+    if not isinstance(ranges, dict) or not ranges:
+        raise ValueError("ranges must be a non-empty object of field -> range")
+    unknown = [field for field in ranges if field not in allowed_fields]
+    if unknown:
+        raise ValueError(f"Cannot vary {', '.join(unknown)}; adjustable fields are {', '.join(allowed_fields)}")
+
+    fields = list(ranges)
+    axes = [axis_values(field, ranges[field]) for field in fields]
+    size = int(np.prod([len(axis) for axis in axes]))
+    if size > max_grid_size:
+        raise ValueError(f"Grid has {size} combinations; the limit is {max_grid_size}")
+
+    mesh = np.meshgrid(*axes, indexing="ij")
+    columns = {field: values.ravel() for field, values in zip(fields, mesh)}
+    return fields, axes, columns
+
+def evaluate_grid(bundle, rules, applicant, grid, maximize=None, accept=("approved",), timings=None):
+    """
+    Score every combination of a build_grid() grid applied to one applicant
+    in a single pass: one encoding, one model call and one business-rules
+    evaluation over the whole grid. Returns the approval surface (arrays
+    shaped like the grid) and the best accepted combination, which
+    maximizes the maximize field (by default loan_amnt if it varies, else
+    the first field) with ties going to the lowest risk score
+    """
+    if not isinstance(applicant, dict):
+        raise ValueError("applicant must be a JSON object")
+    error = bundle.encoder.validate(applicant)
+    if error is not None:
+        raise ValueError(error)
+    fields, axes, columns = grid
+    columns = dict(columns)
+    shape = tuple(len(axis) for axis in axes)
+    n = int(np.prod(shape))
+
+    # The loan-to-income percentage follows the amount unless it is varied itself
+    income = applicant.get("person_income")
+    if ("loan_amnt" in columns and "loan_percent_income" not in columns
+            and isinstance(income, (int, float)) and income > 0):
+        columns["loan_percent_income"] = np.round(columns["loan_amnt"] / income * 100, 1)
+
+    X = bundle.encoder.encode_variants(applicant, columns, n)
+    model_timings = {}
+    _, probabilities, _ = bundle.predictor.predict(X, model_timings)
+    labels = list(bundle.predictor.classes_)
+    approve = labels.index(1) if 1 in labels else len(labels) - 1
+
+    evaluation = rules.evaluate_variants(applicant, columns, n)
+    if evaluation["errors"][0] is not None:
+        raise ValueError(evaluation["errors"][0])
+    if timings is not None:
+        timings.update(model_timings)
+
+    if maximize is None:
+        maximize = "loan_amnt" if "loan_amnt" in fields else fields[0]
+    if maximize not in fields:
+        raise ValueError(f"maximize must be one of the varied fields: {', '.join(fields)}")
+
+    accepted = np.isin(evaluation["status"], list(accept))
+    best = None
+    if accepted.any():
+        # Highest objective first, then lowest risk score
+        order = np.lexsort((evaluation["risk_score"], -columns[maximize]))
+        i = int(order[accepted[order]][0])
+        best = {
+            "index": list(int(k) for k in np.unravel_index(i, shape)),
+            "values": {field: float(columns[field][i]) for field in columns},
+            "modelProbability": float(probabilities[i, approve]),
+            **rules.format_row(evaluation, i)
+        }
+
+    return {
+        "fields": fields,
+        "axes": {field: axis.tolist() for field, axis in zip(fields, axes)},
+        "shape": list(shape),
+        "gridSize": n,
+        "surface": {
+            "approvalStatus": evaluation["status"].reshape(shape).tolist(),
+            "probability": evaluation["probability"].reshape(shape).tolist(),
+            "riskScore": evaluation["risk_score"].reshape(shape).tolist(),
+            "creditLimit": evaluation["credit_limit"].reshape(shape).tolist(),
+            "modelProbability": probabilities[:, approve].reshape(shape).round(6).tolist()
+        },
+        "accepted": int(accepted.sum()),
+        "maximize": maximize,
+        "best": best
+    }
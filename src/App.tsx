@@ -33,6 +33,9 @@ export interface PredictionResult {
   modelOutput?: {
     prediction: number
     probabilities: number[]
+    riskScore?: number
+    degraded?: boolean
+    degradedReason?: string
   }
 }
 